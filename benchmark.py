@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+"""Measure derivation throughput and compare it to a baseline.
+
+Each benchmark derives a fixed set of forms and reports forms per second.
+Import time is reported in milliseconds. Usage::
+
+    # Compare the working tree to the last commit.
+    python benchmark.py --compare HEAD
+
+    # Run only the subanta benchmarks.
+    python benchmark.py -k subanta
+
+    # Record a baseline on this machine, then compare to it later.
+    python benchmark.py --save-baseline
+    python benchmark.py
+
+Timings depend on the machine and vary from run to run, so the most
+reliable baseline is a git ref measured in the same run. With `--compare`,
+we export the ref to a temporary directory, start one process for the ref
+and one for the working tree, and alternate between them for every run,
+comparing each pair of runs. We report the median change over all pairs.
+A benchmark regresses only if every pair shows it more than `--threshold`
+slower than its baseline, in which case we exit with status 1.
+
+Both trees run this copy of the script, so the benchmarks use only the
+parts of padmini that every ref has: :func:`~padmini.ashtadhyayi.tinanta`,
+:func:`~padmini.ashtadhyayi.subanta`, and ``dhatupatha.load_dhatus``, all
+with their default options. A benchmark that needs a newer API is skipped
+on refs without it.
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from padmini import ashtadhyayi
+from padmini import dhatupatha
+from padmini.constants import Tag as T
+from padmini.prakarana.tin_pratyaya import PURUSHA, VACANA
+
+
+#: The directory that contains this script.
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(ROOT, "data", "benchmark_baseline.json")
+
+#: A fixed sample of dhatus across all ganas.
+DHATU_SAMPLE = [
+    "01.0001",
+    "01.0002",
+    "01.0038",
+    "01.0475",
+    "01.1033",
+    "02.0001",
+    "02.0067",
+    "03.0001",
+    "04.0095",
+    "05.0001",
+    "06.0001",
+    "07.0001",
+    "08.0010",
+    "09.0001",
+    "10.0001",
+]
+
+TINANTA_LAKARAS = ["la~w", "li~w", "lu~w", "lf~w", "lo~w", "la~N", "li~N", "lu~N"]
+
+#: Stems that cover the main stem classes.
+SUBANTA_STEMS = {
+    "a-pum": ("deva", T.PUM),
+    "i-pum": ("hari", T.PUM),
+    "u-pum": ("guru", T.PUM),
+    "f-pum": ("pitf", T.PUM),
+    "A-strI": ("ramA", T.STRI),
+    "I-strI": ("nadI", T.STRI),
+    "U-strI": ("vaDU", T.STRI),
+    "a-napuMsaka": ("Pala", T.NAPUMSAKA),
+    "sarvanama": ("sarva", T.PUM),
+}
+
+#: Roots whose derivations pass through many optional rules.
+OPTION_HEAVY = [
+    ("01.1033", "lu~N", frozenset()),
+    ("04.0095", "lu~w", frozenset()),
+    ("07.0006", "lu~N", frozenset()),
+    ("10.0155", "lu~N", frozenset()),
+    ("02.0067", "li~N", frozenset({T.ASHIH})),
+]
+
+
+class Benchmark(NamedTuple):
+    name: str
+    #: Runs the benchmark once and returns the number of forms derived.
+    func: Callable[[], int]
+    #: The unit we report.
+    unit: str = "forms/s"
+
+
+def _load_dhatus():
+    return {f"{d.gana}.{d.number}": d for d in dhatupatha.load_dhatus()}
+
+
+def _tinanta_bench(la: str) -> Callable[[], int]:
+    dhatus = _load_dhatus()
+
+    def run():
+        n = 0
+        for code in DHATU_SAMPLE:
+            dhatu = dhatus[code]
+            for purusha, vacana in itertools.product(PURUSHA, VACANA):
+                ashtadhyayi.tinanta(
+                    dhatu.upadesha,
+                    code,
+                    la,
+                    tags={purusha, vacana},
+                )
+                n += 1
+        return n
+
+    return run
+
+
+def _subanta_bench(stem: str, linga: str) -> Callable[[], int]:
+    vibhaktis = [T.V1, T.V2, T.V3, T.V4, T.V5, T.V6, T.V7]
+    vacanas = [T.EKAVACANA, T.DVIVACANA, T.BAHUVACANA]
+
+    def run():
+        n = 0
+        for vibhakti, vacana in itertools.product(vibhaktis, vacanas):
+            ashtadhyayi.subanta(stem, linga, tags={vibhakti, vacana})
+            n += 1
+        return n
+
+    return run
+
+
+def _all_tinantas_bench() -> int:
+    dhatus = _load_dhatus()
+    n = 0
+    for code, la, tags in OPTION_HEAVY:
+        dhatu = dhatus[code]
+        for purusha, vacana in itertools.product(PURUSHA, VACANA):
+            n += len(
+                ashtadhyayi.all_tinantas(
+                    dhatu.upadesha,
+                    code,
+                    la,
+                    tags={purusha, vacana} | tags,
+                )
+            )
+    return n
+
+
+def _import_time() -> float:
+    """Return the time to import padmini.ashtadhyayi in a fresh process."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import padmini.ashtadhyayi\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    return float(out.stdout)
+
+
+def all_benchmarks():
+    ret = []
+    for la in TINANTA_LAKARAS:
+        ret.append(Benchmark(f"tinanta/{la}", _tinanta_bench(la)))
+    for name, (stem, linga) in SUBANTA_STEMS.items():
+        ret.append(Benchmark(f"subanta/{name}", _subanta_bench(stem, linga)))
+    if hasattr(ashtadhyayi, "all_tinantas"):
+        ret.append(Benchmark("all_tinantas/option-heavy", _all_tinantas_bench))
+    ret.append(Benchmark("import/ashtadhyayi", _import_time, unit="ms"))
+    return ret
+
+
+def measure(
+    bench: Benchmark, repeat: int, min_time: float = 0.2, warmup: bool = True
+) -> float:
+    """Run `bench` `repeat` times and return its best result.
+
+    Each run calls `bench.func` until at least `min_time` seconds have passed,
+    so that short benchmarks are not dominated by noise.
+
+    :param warmup: if true, call `bench.func` once beforehand so that the
+        caches it uses are warm for every run.
+    """
+    if bench.unit == "ms":
+        return min(bench.func() for _ in range(repeat)) * 1000
+
+    if warmup:
+        bench.func()
+    best = 0.0
+    for _ in range(repeat):
+        n = 0
+        start = time.perf_counter()
+        while True:
+            n += bench.func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, n / elapsed)
+    return best
+
+
+def is_regression(unit: str, value: float, baseline: float, threshold: float):
+    if unit == "ms":
+        # Lower is better.
+        return value > baseline * (1 + threshold)
+    return value < baseline * (1 - threshold)
+
+
+def _export(ref: str, dest: str):
+    """Write the files at git `ref` to `dest`, along with this script."""
+    out = subprocess.run(
+        ["git", "archive", "--format=tar", ref],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+    )
+    with tarfile.open(fileobj=io.BytesIO(out.stdout)) as tar:
+        tar.extractall(dest)
+    # Use the same benchmarks on both sides.
+    shutil.copy(os.path.abspath(__file__), os.path.join(dest, "benchmark.py"))
+
+
+class _Worker:
+    """Runs benchmarks on request in a separate process in `root`."""
+
+    def __init__(self, root: str):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(root, "benchmark.py"), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=root,
+            text=True,
+        )
+
+    def _request(self, line: str) -> str:
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+        ret = self.proc.stdout.readline()
+        if not ret:
+            raise RuntimeError(f"benchmark {line} failed")
+        return ret
+
+    def names(self) -> List[str]:
+        """Return the names of the benchmarks that this tree has."""
+        return self._request("?").split()
+
+    def measure(self, name: str) -> float:
+        return float(self._request(name))
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def serve():
+    """Measure each benchmark named on stdin once and print its result.
+
+    For ``?``, we print the names of all benchmarks instead.
+    """
+    benchmarks = {b.name: b for b in all_benchmarks()}
+    seen = set()
+    for line in sys.stdin:
+        name = line.strip()
+        if name == "?":
+            print(" ".join(benchmarks), flush=True)
+            continue
+        print(measure(benchmarks[name], 1, warmup=name not in seen), flush=True)
+        seen.add(name)
+
+
+class Comparison(NamedTuple):
+    #: The result on the working tree.
+    value: float
+    #: The result on the baseline, or ``None`` if the baseline lacks this
+    #: benchmark.
+    baseline: Optional[float]
+    #: The median ratio of the working tree to the baseline over all pairs
+    #: of runs.
+    ratio: Optional[float]
+    #: The ratio from the pair that most favors the working tree.
+    best_ratio: Optional[float]
+
+
+def compare(ref: str, benchmarks, repeat: int) -> Dict[str, Comparison]:
+    """Measure `benchmarks` on `ref` and on the working tree in turn.
+
+    Each tree gets its own process, and we alternate between them for every
+    run of every benchmark. The speed of a shared machine drifts over a few
+    seconds, so we compare each run on the working tree to the run on `ref`
+    just before it. We report the median result for each tree and the
+    median of these ratios.
+    """
+    ret = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        _export(ref, tmp)
+        base_worker = _Worker(tmp)
+        worker = _Worker(ROOT)
+        try:
+            base_names = set(base_worker.names())
+            for bench in benchmarks:
+                if bench.name not in base_names:
+                    values = [worker.measure(bench.name) for _ in range(repeat)]
+                    ret[bench.name] = Comparison(
+                        statistics.median(values), None, None, None
+                    )
+                    continue
+                pairs = []
+                for _ in range(repeat):
+                    base = base_worker.measure(bench.name)
+                    pairs.append((worker.measure(bench.name), base))
+                values, bases = zip(*pairs)
+                ratios = [v / b for v, b in pairs]
+                ret[bench.name] = Comparison(
+                    value=statistics.median(values),
+                    baseline=statistics.median(bases),
+                    ratio=statistics.median(ratios),
+                    best_ratio=min(ratios) if bench.unit == "ms" else max(ratios),
+                )
+        finally:
+            base_worker.close()
+            worker.close()
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k", dest="filter", help="run only benchmarks whose name contains this"
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        help="runs per benchmark (default: 3, or 5 with --compare)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="REF",
+        help="measure git REF in the same run and use it as the baseline",
+    )
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH, help=f"default: {BASELINE_PATH}"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown as a fraction of the baseline (default: 0.2)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write the results to the baseline file",
+    )
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+
+    benchmarks = all_benchmarks()
+    if args.filter:
+        benchmarks = [b for b in benchmarks if args.filter in b.name]
+
+    if args.compare:
+        print(f"Comparing to {args.compare} ...")
+        comparisons = compare(args.compare, benchmarks, args.repeat or 5)
+        results = {k: c.value for k, c in comparisons.items()}
+        comparisons = {k: c for k, c in comparisons.items() if c.baseline}
+    else:
+        baseline: Dict[str, float] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        results = {b.name: measure(b, args.repeat or 3) for b in benchmarks}
+        comparisons = {
+            k: Comparison(v, baseline[k], v / baseline[k], v / baseline[k])
+            for k, v in results.items()
+            if baseline.get(k)
+        }
+
+    regressions = []
+    print(f"{'benchmark':<28} {'result':>12} {'baseline':>12} {'change':>8}")
+    for bench in benchmarks:
+        value = results[bench.name]
+        c = comparisons.get(bench.name)
+        if c:
+            base = c.baseline
+            change = f"{c.ratio - 1:+.1%}"
+            if is_regression(bench.unit, c.best_ratio, 1.0, args.threshold):
+                regressions.append(bench.name)
+                change += " !"
+            base_str = f"{base:.1f}"
+        else:
+            change = base_str = "-"
+        print(
+            f"{bench.name:<28} {value:>12.1f} {base_str:>12} {change:>8}  {bench.unit}"
+        )
+
+    if args.save_baseline:
+        saved: Dict[str, float] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                saved = json.load(f)
+        saved.update({k: round(v, 1) for k, v in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}.")
+    elif regressions:
+        print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,98 @@
-from typing import NamedTuple, List
+"""Generate every tinanta in the dhatupatha."""
 
-from padmini.ashtadhyayi import tinanta
-from padmini.constants import Tag as T
-from padmini.prakriya import Prakriya
-from padmini.dhatupatha import load_dhatus
-from test.utils import run_all_permutations
+import argparse
+import sys
 
+from padmini import bulk, stream
 
-def _skip_step(self, rule):
-    pass
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["xml", "tsv", "jsonl", "columns"],
+        default="xml",
+        help="output format (default: xml)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="output file, or output directory for --format=columns "
+        "(default: stdout)",
+    )
+    parser.add_argument("--start", help="first dhatu code to generate")
+    parser.add_argument("--end", help="last dhatu code to generate")
+    parser.add_argument(
+        "--lakara",
+        action="append",
+        choices=list(stream.LAKARAS),
+        help="lakara to generate. Repeat for more than one (default: all)",
+    )
+    parser.add_argument(
+        "--resume-dir",
+        help="write checkpointed output shards to this directory, resuming "
+        "any earlier run there",
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=bulk.DEFAULT_SHARD_SIZE,
+        help="dhatus per output shard with --resume-dir "
+        f"(default: {bulk.DEFAULT_SHARD_SIZE})",
+    )
+    args = parser.parse_args()
+    lakaras = args.lakara or stream.LAKARAS
 
-Prakriya.step = _skip_step
+    if args.resume_dir:
+        bulk.run(
+            args.resume_dir,
+            format=args.format,
+            shard_size=args.shard_size,
+            start=args.start,
+            end=args.end,
+            lakaras=lakaras,
+            workers=args.workers,
+        )
+        return
 
-
-LAKARA = [
-    "la~w",
-    "li~w",
-    "lu~w",
-    "lf~w",
-    "lo~w",
-    "la~N",
-    "ashir-lin",
-    "li~N",
-    "lu~N",
-    "lf~N",
-]
-
-TIN_LIST = [
-    "tip",
-    "tas",
-    "Ji",
-    "sip",
-    "Tas",
-    "Ta",
-    "mip",
-    "vas",
-    "mas",
-    "ta",
-    "AtAm",
-    "Ja",
-    "tAs",
-    "ATAm",
-    "Dvam",
-    "iw",
-    "vahi",
-    "mahiN",
-]
-
-
-def _to_xml(p: Prakriya, dhatu, la: str, tin: str) -> str:
-    form = p.text
-    root = dhatu.upadesha
-    num = f"{dhatu.gana}.{dhatu.number}"
-    if T.ASHIH in tags:
-        la = "ASIrliN"
+    if args.format == "columns":
+        if not args.output:
+            parser.error("--format=columns requires --output")
+        f = None
+        sink = stream.ColumnarSink(args.output)
     else:
-        la = la.replace("~", "")
-
-    return f'<f form="{form}"><root name="{root}" num="{num}"/><{la}/><{tin}/></f>'
+        f = open(args.output, "w") if args.output else sys.stdout
+        sink = stream.FILE_SINKS[args.format](f)
 
+    shards = stream.iter_shards(
+        start=args.start,
+        end=args.end,
+        lakaras=lakaras,
+        workers=args.workers,
+    )
+    num_errors = 0
+    sink.begin()
+    for shard in shards:
+        for record in shard.records:
+            sink.write(record)
+        for error in shard.errors:
+            print(error, file=sys.stderr)
+        num_errors += len(shard.errors)
+    sink.end()
 
-print('<!DOCTYPE forms SYSTEM "verbforms.dtd">')
-print("<forms>")
-for dhatu in load_dhatus():
-    for la in LAKARA:
-        tags = set()
-        if la == "ashir-lin":
-            la = "li~N"
-            tags = {T.ASHIH}
+    if f is not None and f is not sys.stdout:
+        f.close()
+    if num_errors:
+        print(f"{num_errors} derivations failed.", file=sys.stderr)
 
-        pairs = [
-            (T.PRATHAMA, T.EKAVACANA),
-            (T.PRATHAMA, T.DVIVACANA),
-            (T.PRATHAMA, T.BAHUVACANA),
-            (T.MADHYAMA, T.EKAVACANA),
-            (T.MADHYAMA, T.DVIVACANA),
-            (T.MADHYAMA, T.BAHUVACANA),
-            (T.UTTAMA, T.EKAVACANA),
-            (T.UTTAMA, T.DVIVACANA),
-            (T.UTTAMA, T.BAHUVACANA),
-        ]
-        for i, (purusha, vacana) in enumerate(pairs):
-            final_tags = {vacana, purusha} | tags
 
-            code = f"{dhatu.gana}.{dhatu.number}"
-            try:
-                prakriyas = run_all_permutations(code, la, final_tags)
-            except Exception:
-                print("<error/>")
-                continue
-            for p in prakriyas:
-                index = i
-                if p.terms[-1].all(T.ATMANEPADA):
-                    index += 9
-                tin = TIN_LIST[index]
-                print(_to_xml(p, dhatu, la, tin))
-print("</forms>")
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,10 @@
+import contextlib
+from functools import partial
+from typing import Callable, List, Optional
+
 from .constants import Tag
-from .prakarana import ac_sandhi
-from .prakarana import angasya
-from .prakarana import ardhadhatuka
-from .prakarana import atidesha
-from .prakarana import atmanepada
-from .prakarana import dhatu_karya
-from .prakarana import dvitva
-from .prakarana import la_karya
-from .prakarana import pratipadika_karya
-from .prakarana import samjna
-from .prakarana import samprasarana
-from .prakarana import sanadyanta
-from .prakarana import sup_karya
-from .prakarana import tin_pratyaya
-from .prakarana import tripadi
-from .prakarana import vikarana
-from .prakriya import Prakriya
+from .prakriya import HistoryLevel, Prakriya
+from .timing import Timer, stage_name
 
 
 def dhatu_samprasarana_tasks(p: Prakriya):
@@ -25,6 +14,8 @@ def dhatu_samprasarana_tasks(p: Prakriya):
 
         jha_adesha --> it_agama --> atidesha --> samprasarana
     """
+    from .prakarana import angasya, ardhadhatuka, atidesha, samprasarana
+
     # Needed transitively for dhatu-samprasarana.
     angasya.jha_adesha(p)
     # Depends on jha_adesha since it conditions on the first sound.
@@ -42,32 +33,39 @@ def dhatu_samprasarana_tasks(p: Prakriya):
     atidesha.run_after_attva(p)
 
 
-def tinanta(dhatu: str, dhatu_code: str, la: str, tags=None, options=None) -> Prakriya:
-    """Generate a tinanta (verb).
+#: A single stage of a derivation. Stages run in order, and each stage takes
+#: the prakriya as its only argument.
+Stage = Callable[[Prakriya], None]
 
-    :param dhatu: the dhātu to use. `dhatu` must include any relevant accent
-        marks. See ``dhatupatha.tsv`` for examples.
-    :param dhatu_code: the number in the Dhatupatha. This help distinguish
-        between identical roots in separate ganas.
-    :param la: the lakāra to use. This must use a nasal vowel; use ``"la~w"``,
-        not ``"law"``.
-    :param tags: extra tags to add to the derivation. For details, see
-        :class:`~Tag`.
-    :param options: enables or disables various optional rules in the
-        Ashtadhyayi. For details, see the comments in :class:`~Prakriya`.
-    :return: the complete prakriyā.
-    """
 
-    # Initialize the prakriya.
-    p = Prakriya.make()
-    p.add_tags(*(tags or []))
-    p.set_options(options or {})
+def _tinanta_stages(dhatu: str, dhatu_code: str, la: str, tags) -> List[Stage]:
+    """Return the stages that derive a tinanta.
 
-    # TODO: don't hard-code, also allow karmaNi and bhAve.
-    p.add_tags(Tag.KARTARI)
+    We return stages (instead of applying them directly) so that
+    :func:`all_tinantas` can fork the prakriya between stages. The arguments
+    match those of :func:`tinanta`.
+    """
+    # The prakaranas are imported on first use so that importing this module
+    # stays cheap, and so that subanta-only callers never load the tinanta
+    # machinery.
+    from .prakarana import ac_sandhi
+    from .prakarana import angasya
+    from .prakarana import ardhadhatuka
+    from .prakarana import atmanepada
+    from .prakarana import dhatu_karya
+    from .prakarana import dvitva
+    from .prakarana import la_karya
+    from .prakarana import samjna
+    from .prakarana import samprasarana
+    from .prakarana import sanadyanta
+    from .prakarana import tin_pratyaya
+    from .prakarana import tripadi
+    from .prakarana import vikarana
+
+    stages = []
 
     # Create the dhAtu and add any sanAdi pratyayas.
-    dhatu_karya.run(p, dhatu, dhatu_code)
+    stages.append(partial(dhatu_karya.run, dhatu=dhatu, dhatu_code=dhatu_code))
 
     # Rule 3.1.31 ("AyAdaya ArdhadhAtuke vA") makes rules 3.1.28 - 3.1.30
     # optional if ArdhadhAtuka follows. But at this stage in the prakriya, we
@@ -78,112 +76,265 @@ def tinanta(dhatu: str, dhatu_code: str, la: str, tags=None, options=None) -> Pr
     #    ārdhadhātukaviṣaye ārdhadhātukavivakṣāyām āyādayaḥ pratyayā vā
     #    bhavanti. (kāśikāvṛttiḥ)
     #
-    vidhi_lin = la == "li~N" and not p.all(Tag.ASHIH)
+    ashih = Tag.ASHIH in tags
+    vidhi_lin = la == "li~N" and not ashih
     is_sarvadhatuka = vidhi_lin or la in {"la~w", "lo~w", "la~N"}
-    sanadyanta.run(p, is_ardhadhatuka=not is_sarvadhatuka)
+    stages.append(partial(sanadyanta.run, is_ardhadhatuka=not is_sarvadhatuka))
 
     # Add the lakāra.
-    la_karya.run(p, la)
+    stages.append(partial(la_karya.run, la=la))
 
     # Base substitutions that must run before we choose the pada.
-    ardhadhatuka.dhatu_adesha_before_pada(p)
+    stages.append(ardhadhatuka.dhatu_adesha_before_pada)
 
     # Determine the pada.
-    atmanepada.run(p)
+    stages.append(atmanepada.run)
 
     # Supply the correct tiN suffix.
     #
     # `adesha` must run before `vikarana` because `vikarana` expects
     # sArvadhAtuka/ArdhatAkuka and these terms cannot be applied to the lakAra
     # directly.
-    tin_pratyaya.adesha(p)
+    stages.append(tin_pratyaya.adesha)
 
     # Apply samjnas for any new suffixes.
-    samjna.run(p)
+    stages.append(samjna.run)
 
     # Do lit-siddhi and AzIrlin-siddhi first to support the valAdi vArttika for
     # aj>vi.
-    lit_ashirlin = la == "li~w" or (la == "li~N" and p.all(Tag.ASHIH))
+    lit_ashirlin = la == "li~w" or (la == "li~N" and ashih)
     if lit_ashirlin:
-        tin_pratyaya.siddhi(p)
+        stages.append(tin_pratyaya.siddhi)
 
     # Base substitutions that must run before vikarana, e.g. "lun-sanor ghasl"
-    ardhadhatuka.run_before_vikarana(p)
+    stages.append(ardhadhatuka.run_before_vikarana)
 
     # Add the vikarana and add samjnas as necessary.
-    vikarana.run(p)
-    samjna.run(p)
+    stages.append(vikarana.run)
+    stages.append(samjna.run)
 
     # --- Code below this line has not been cleaned up. --- #
 
     if not is_sarvadhatuka:
-        dhatu_samprasarana_tasks(p)
+        stages.append(dhatu_samprasarana_tasks)
 
-    angasya.hacky_before_dvitva(p)
+    stages.append(angasya.hacky_before_dvitva)
 
     # Depends on: ardhadhatuka.run_before_siddhi (e.g. for "jagau")
-    dvitva.run(p)
+    stages.append(dvitva.run)
 
-    samprasarana.run_for_abhyasa(p)
+    stages.append(samprasarana.run_for_abhyasa)
 
     # Apply the necessary changes to the tiN suffix above.
     # Depends on: dvitva, vikarana (e.g. 3.4.109 sijabhyastavidibhyazca)
     if not lit_ashirlin:
-        tin_pratyaya.siddhi(p)
+        stages.append(tin_pratyaya.siddhi)
 
     if is_sarvadhatuka:
-        dhatu_samprasarana_tasks(p)
+        stages.append(dhatu_samprasarana_tasks)
 
-    angasya.iit_agama(p)
+    stages.append(angasya.iit_agama)
 
     # Must follow tin-siddhi (for valAdi)
-    ardhadhatuka.am_agama(p)
+    stages.append(ardhadhatuka.am_agama)
     # Finish the angasya section.
-    angasya.run_remainder(p)
+    stages.append(angasya.run_remainder)
     # Apply any remaining sandhi changes.
-    ac_sandhi.run(p)
+    stages.append(ac_sandhi.run)
     # Finally, the tripAdi.
-    tripadi.run(p)
+    stages.append(tripadi.run)
 
+    return stages
+
+
+def _subanta_stages(pratipadika: str, linga: str) -> List[Stage]:
+    """Return the stages that derive a subanta.
+
+    The arguments match those of :func:`subanta`.
+    """
+    from .prakarana import ac_sandhi
+    from .prakarana import angasya
+    from .prakarana import pratipadika_karya
+    from .prakarana import samjna
+    from .prakarana import sup_karya
+    from .prakarana import tripadi
+
+    return [
+        # Introduce the pratipadika
+        partial(pratipadika_karya.run, pratipadika=pratipadika, linga=linga),
+        # Introduce the sup-pratyaya
+        sup_karya.run,
+        # Add various samjnas
+        samjna.pratipadika_samjna,
+        ac_sandhi.sup_sandhi_before_angasya,
+        # Run the angasya section.
+        angasya.run_remainder,
+        # Apply any remaining sandhi changes.
+        ac_sandhi.sup_sandhi_after_angasya,
+        ac_sandhi.run_common,
+        # Finally, the tripAdi.
+        tripadi.run,
+    ]
+
+
+def _make_prakriya(tags, options, history_level, timer) -> Prakriya:
+    p = Prakriya.make(history_level=history_level)
+    p.add_tags(*(tags or []))
+    # Copy `options` so that forking does not write into the caller's dict.
+    p.set_options(dict(options or {}))
+    p.timer = timer
     return p
 
 
-def subanta(pratipadika: str, linga: str, tags=None, options=None) -> Prakriya:
-    """Generate a subanta (nominal).
+def _frame(timer: Optional[Timer], name: str):
+    """Time the body of a ``with`` block if `timer` is set."""
+    if timer is None:
+        return contextlib.nullcontext()
+    return timer.frame(name)
 
-    :param pratipadika: the `prAtipadika` to use.
+
+def _run_stage(p: Prakriya, stage: Stage):
+    with _frame(p.timer, stage_name(stage)):
+        stage(p)
+
+
+def _run_stages(p: Prakriya, stages: List[Stage]) -> Prakriya:
+    for stage in stages:
+        _run_stage(p, stage)
+    return p
+
+
+def _run_all_stages(p: Prakriya, stages: List[Stage]) -> List[Prakriya]:
+    """Run `stages` and return a prakriya for every combination of options.
+
+    If a stage uses an optional rule that has no entry in
+    `p.options_override`, we decline the rule, then fork a copy of the
+    prakriya from just before that stage and accept the rule there. So all of
+    the work done before the stage is shared by both branches.
+    """
+    results = []
+    stack = [(p, 0)]
+    while stack:
+        p, i = stack.pop()
+        while i < len(stages):
+            before = p.snapshot()
+            _run_stage(p, stages[i])
+            for code in p.options_pending:
+                if code in before.options_override:
+                    continue
+                branch = p.fork(before)
+                branch.options_override[code] = True
+                stack.append((branch, i))
+                # Later branches (and `p` itself) decline this rule.
+                before.options_override[code] = False
+                p.options_override[code] = False
+            p.options_pending.clear()
+            i += 1
+        results.append(p)
+    return results
+
+
+def tinanta(
+    dhatu: str,
+    dhatu_code: str,
+    la: str,
+    tags=None,
+    options=None,
+    history_level=HistoryLevel.TEXT,
+    timer: Optional[Timer] = None,
+) -> Prakriya:
+    """Generate a tinanta (verb).
+
+    :param dhatu: the dhātu to use. `dhatu` must include any relevant accent
+        marks. See ``dhatupatha.tsv`` for examples.
+    :param dhatu_code: the number in the Dhatupatha. This help distinguish
+        between identical roots in separate ganas.
+    :param la: the lakāra to use. This must use a nasal vowel; use ``"la~w"``,
+        not ``"law"``.
     :param tags: extra tags to add to the derivation. For details, see
         :class:`~Tag`.
     :param options: enables or disables various optional rules in the
         Ashtadhyayi. For details, see the comments in :class:`~Prakriya`.
+    :param history_level: how much of the derivation to record. For bulk
+        generation, use :attr:`~padmini.prakriya.HistoryLevel.NONE`.
+    :param timer: if set, a :class:`~padmini.timing.Timer` that records how
+        long each stage and rule takes.
     :return: the complete prakriyā.
     """
     # Initialize the prakriya.
-    p = Prakriya.make()
-    p.add_tags(*(tags or []))
-    p.set_options(options or {})
+    p = _make_prakriya(tags, options, history_level, timer)
 
-    # Introduce the pratipadika
-    pratipadika_karya.run(p, pratipadika, linga)
+    # TODO: don't hard-code, also allow karmaNi and bhAve.
+    p.add_tags(Tag.KARTARI)
 
-    # Introduce the sup-pratyaya
-    sup_karya.run(p)
+    with _frame(timer, "tinanta"):
+        return _run_stages(p, _tinanta_stages(dhatu, dhatu_code, la, p.tags))
 
-    # Add various samjnas
-    samjna.pratipadika_samjna(p)
 
-    ac_sandhi.sup_sandhi_before_angasya(p)
+def all_tinantas(
+    dhatu: str,
+    dhatu_code: str,
+    la: str,
+    tags=None,
+    options=None,
+    history_level=HistoryLevel.TEXT,
+    timer: Optional[Timer] = None,
+) -> List[Prakriya]:
+    """Generate all tinantas allowed by the optional rules of the grammar.
 
-    # Run the angasya section.
-    angasya.run_remainder(p)
+    Whenever the derivation reaches an optional rule, it forks in place, so
+    the work before the fork is done only once. The arguments match those of
+    :func:`tinanta`, and `options` fixes the listed rules for every branch.
 
-    # Apply any remaining sandhi changes.
-    ac_sandhi.sup_sandhi_after_angasya(p)
-    ac_sandhi.run_common(p)
+    :return: one complete prakriyā per combination of options.
+    """
+    p = _make_prakriya(tags, options, history_level, timer)
+    p.add_tags(Tag.KARTARI)
+    with _frame(timer, "all_tinantas"):
+        stages = _tinanta_stages(dhatu, dhatu_code, la, p.tags)
+        return _run_all_stages(p, stages)
+
+
+def subanta(
+    pratipadika: str,
+    linga: str,
+    tags=None,
+    options=None,
+    history_level=HistoryLevel.TEXT,
+    timer: Optional[Timer] = None,
+) -> Prakriya:
+    """Generate a subanta (nominal).
 
-    # Finally, the tripAdi.
-    tripadi.run(p)
+    :param pratipadika: the `prAtipadika` to use.
+    :param tags: extra tags to add to the derivation. For details, see
+        :class:`~Tag`.
+    :param options: enables or disables various optional rules in the
+        Ashtadhyayi. For details, see the comments in :class:`~Prakriya`.
+    :param history_level: how much of the derivation to record.
+    :param timer: if set, a :class:`~padmini.timing.Timer` that records how
+        long each stage and rule takes.
+    :return: the complete prakriyā. To read the final result, use `p.text`.
+    """
+    p = _make_prakriya(tags, options, history_level, timer)
+    with _frame(timer, "subanta"):
+        return _run_stages(p, _subanta_stages(pratipadika, linga))
 
-    # The prakriya is complete!
-    # To read the final result, use `p.text`.
-    return p
+
+def all_subantas(
+    pratipadika: str,
+    linga: str,
+    tags=None,
+    options=None,
+    history_level=HistoryLevel.TEXT,
+    timer: Optional[Timer] = None,
+) -> List[Prakriya]:
+    """Generate all subantas allowed by the optional rules of the grammar.
+
+    The arguments match those of :func:`subanta`. For details on how options
+    are explored, see :func:`all_tinantas`.
+
+    :return: one complete prakriyā per combination of options.
+    """
+    p = _make_prakriya(tags, options, history_level, timer)
+    with _frame(timer, "all_subantas"):
+        return _run_all_stages(p, _subanta_stages(pratipadika, linga))
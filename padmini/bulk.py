@@ -0,0 +1,159 @@
+"""Resumable bulk generation.
+
+A full run over the dhātupāṭha takes a long time, so :func:`run` splits the
+work into output shards of a fixed number of dhātus and records its progress
+in a checkpoint file. If the run is interrupted, calling :func:`run` again
+with the same arguments skips every shard that was already written.
+
+Each shard is written to a temporary path and then renamed into place, and
+the checkpoint is updated only after the rename. So a shard file either is
+complete or does not exist, and rewriting a shard produces the same bytes.
+
+The output directory looks like this::
+
+    out/
+        checkpoint.json
+        part-00000.tsv
+        part-00001.tsv
+        part-00001.errors.txt
+        ...
+
+``part-NNNNN.errors.txt`` exists only if some derivations in that shard
+failed.
+"""
+
+import json
+import os
+import shutil
+from typing import Iterable, Optional
+
+from padmini.stream import LAKARAS, ColumnarSink, FILE_SINKS, iter_shards
+from padmini.stream import select_dhatus, write
+
+
+#: The name of the checkpoint file in the output directory.
+CHECKPOINT = "checkpoint.json"
+
+#: The default number of dhatus per output shard.
+DEFAULT_SHARD_SIZE = 50
+
+#: All supported output formats.
+FORMATS = list(FILE_SINKS) + ["columns"]
+
+
+def _write_json(path, data):
+    """Write `data` to `path` atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _shard_path(directory, index: int, format: str) -> str:
+    name = f"part-{index:05d}"
+    if format != "columns":
+        name += f".{format}"
+    return os.path.join(directory, name)
+
+
+def _write_shard(path: str, format: str, records):
+    """Write `records` to `path` atomically."""
+    tmp = path + ".tmp"
+    if format == "columns":
+        write(records, ColumnarSink(tmp))
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+    else:
+        with open(tmp, "w") as f:
+            write(records, FILE_SINKS[format](f))
+    os.replace(tmp, path)
+
+
+def run(
+    directory,
+    format: str = "tsv",
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    dhatus=None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    lakaras: Iterable[str] = LAKARAS,
+    tags=frozenset(),
+    workers: Optional[int] = 1,
+) -> int:
+    """Generate tinantas into `directory`, resuming from its checkpoint.
+
+    The generation arguments are the same as for
+    :func:`~padmini.stream.iter_shards`.
+
+    :param directory: the output directory.
+    :param format: the output format, as in :data:`FORMATS`.
+    :param shard_size: the number of dhatus per output shard.
+    :return: the number of shards written by this call.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}")
+    dhatus = select_dhatus(dhatus, start, end)
+    lakaras = list(lakaras)
+
+    # The shards depend on all of these, so a checkpoint is valid only if
+    # they have not changed.
+    params = {
+        "format": format,
+        "shard_size": shard_size,
+        "dhatus": [d.code for d in dhatus],
+        "lakaras": lakaras,
+        "tags": sorted(tags),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    checkpoint_path = os.path.join(directory, CHECKPOINT)
+    completed = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["params"] != params:
+            raise ValueError(
+                f"{checkpoint_path} was created with different arguments."
+            )
+        completed = set(checkpoint["completed"])
+
+    chunks = [dhatus[i : i + shard_size] for i in range(0, len(dhatus), shard_size)]
+    pending = []
+    for i, chunk in enumerate(chunks):
+        if not all(d.code in completed for d in chunk):
+            pending.append((i, chunk))
+
+    shards = iter_shards(
+        [d for _, chunk in pending for d in chunk],
+        lakaras=lakaras,
+        tags=tags,
+        workers=workers,
+    )
+    for i, chunk in pending:
+        records = []
+        errors = []
+        codes = []
+        for _ in chunk:
+            shard = next(shards)
+            records.extend(shard.records)
+            errors.extend(shard.errors)
+            codes.append(shard.code)
+
+        path = _shard_path(directory, i, format)
+        _write_shard(path, format, records)
+
+        errors_path = _shard_path(directory, i, "errors.txt")
+        if errors:
+            tmp = errors_path + ".tmp"
+            with open(tmp, "w") as f:
+                f.write("".join(e + "\n" for e in errors))
+            os.replace(tmp, errors_path)
+        elif os.path.exists(errors_path):
+            os.remove(errors_path)
+
+        completed.update(codes)
+        _write_json(
+            checkpoint_path,
+            {"params": params, "completed": sorted(completed)},
+        )
+    return len(pending)
@@ -0,0 +1,276 @@
+"""A persistent on-disk cache for derived forms.
+
+Deriving a form runs hundreds of rules, but the result depends only on the
+derivation inputs and on the grammar itself. So :class:`FormCache` stores
+final forms in a local SQLite file, keyed on the inputs and on a hash of the
+grammar's source code. Warm lookups return the stored forms without running
+any rules, and any change to the grammar invalidates old entries
+automatically.
+
+Usage::
+
+    cache = FormCache("forms.db")
+    forms = cache.all_tinantas("BU", "01.0001", "la~w", tags={"prathama", "ekavacana"})
+    print([f.text for f in forms])
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from padmini import ashtadhyayi
+from padmini.prakriya import HistoryLevel, Prakriya
+
+
+#: The default maximum number of entries in the cache.
+DEFAULT_MAX_ENTRIES = 100_000
+#: The number of warm hits to batch before we write their `last_used` times.
+FLUSH_EVERY = 1000
+
+
+class CachedForm(NamedTuple):
+    """A derived form as stored in the cache."""
+
+    #: The final text of the derivation.
+    text: str
+    #: The optional rules seen during the derivation, as (rule, accepted)
+    #: pairs.
+    options: Tuple[Tuple[str, bool], ...]
+    #: The derivation history as (text, rule) pairs, or ``None`` if history
+    #: was not requested.
+    history: Optional[Tuple[Tuple[str, str], ...]]
+
+
+@functools.cache
+def grammar_version() -> str:
+    """Return a hash of the grammar's source code.
+
+    Any change to a module in the ``padmini`` package produces a new hash.
+    """
+    root = Path(__file__).parent
+    h = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        h.update(str(path.relative_to(root)).encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _to_cached(p: Prakriya, history: bool) -> CachedForm:
+    return CachedForm(
+        text=p.text,
+        options=tuple(tuple(x) for x in p.options_seen),
+        history=tuple(tuple(x) for x in p.history) if history else None,
+    )
+
+
+def _encode(forms: List[CachedForm]) -> str:
+    return json.dumps([f._asdict() for f in forms], ensure_ascii=False)
+
+
+def _decode(value: str) -> List[CachedForm]:
+    ret = []
+    for f in json.loads(value):
+        history = f["history"]
+        if history is not None:
+            history = tuple(tuple(x) for x in history)
+        options = tuple(tuple(x) for x in f["options"])
+        ret.append(CachedForm(f["text"], options, history))
+    return ret
+
+
+class FormCache:
+    """A size-bounded, persistent cache around :mod:`padmini.ashtadhyayi`.
+
+    When the cache holds more than `max_entries` entries, it evicts the
+    entries that were used least recently.
+
+    Warm hits do not write to the database. Instead, we batch their
+    `last_used` times and write them on the next miss, every
+    :data:`FLUSH_EVERY` hits, and on :meth:`close`.
+
+    A :class:`FormCache` holds a single SQLite connection, so use it from
+    one thread only. A multi-threaded service should open one
+    :class:`FormCache` per thread. These may share the same file.
+
+    :param path: the SQLite file to use. Use ``":memory:"`` for a cache that
+        lasts only as long as this object.
+    :param max_entries: the maximum number of entries to keep.
+    """
+
+    def __init__(self, path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS forms (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS forms_last_used ON forms (last_used)"
+        )
+        # Keep the number of entries in the file itself so that a miss does
+        # not need to count them, and so that every connection to the file
+        # sees inserts from the others.
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS form_count (n INTEGER NOT NULL)"
+        )
+        self.conn.execute(
+            """
+            INSERT INTO form_count (n)
+            SELECT COUNT(*) FROM forms WHERE NOT EXISTS (SELECT 1 FROM form_count)
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS forms_insert AFTER INSERT ON forms
+            BEGIN UPDATE form_count SET n = n + 1; END
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS forms_delete AFTER DELETE ON forms
+            BEGIN UPDATE form_count SET n = n - 1; END
+            """
+        )
+        self.conn.commit()
+        #: Maps each key with a pending hit to the time of that hit.
+        self._touched = {}
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        (count,) = self.conn.execute("SELECT n FROM form_count").fetchone()
+        return count
+
+    @staticmethod
+    def _key(kind: str, args, tags, options, history: bool) -> str:
+        data = [
+            grammar_version(),
+            kind,
+            list(args),
+            sorted(tags or []),
+            sorted((options or {}).items()),
+            history,
+        ]
+        data = json.dumps(data, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _get(self, kind: str, fn, args, tags, options, history: bool):
+        key = self._key(kind, args, tags, options, history)
+        now = time.time_ns()
+        row = self.conn.execute(
+            "SELECT value FROM forms WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self.hits += 1
+            self._touched[key] = now
+            if len(self._touched) >= FLUSH_EVERY:
+                self.flush()
+            return _decode(row[0])
+
+        self.misses += 1
+        level = HistoryLevel.TEXT if history else HistoryLevel.NONE
+        result = fn(*args, tags=tags, options=options, history_level=level)
+        if isinstance(result, Prakriya):
+            result = [result]
+        forms = [_to_cached(p, history) for p in result]
+
+        self._write_touched()
+        # Another connection might have added this key since our lookup. If
+        # so, its value is the same as ours, so we keep it.
+        self.conn.execute(
+            "INSERT OR IGNORE INTO forms (key, value, last_used) VALUES (?, ?, ?)",
+            (key, _encode(forms), now),
+        )
+        self._evict()
+        self.conn.commit()
+        return forms
+
+    def _write_touched(self):
+        if self._touched:
+            self.conn.executemany(
+                "UPDATE forms SET last_used = ? WHERE key = ?",
+                [(now, key) for key, now in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                """
+                DELETE FROM forms WHERE key IN (
+                    SELECT key FROM forms ORDER BY last_used LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+
+    def flush(self):
+        """Write the `last_used` times of any pending hits."""
+        if self._touched:
+            self._write_touched()
+            self.conn.commit()
+
+    def clear(self):
+        """Delete all entries."""
+        self._touched.clear()
+        self.conn.execute("DELETE FROM forms")
+        self.conn.commit()
+
+    def tinanta(
+        self, dhatu, dhatu_code, la, tags=None, options=None, history=False
+    ) -> CachedForm:
+        """Cached version of :func:`~padmini.ashtadhyayi.tinanta`.
+
+        :param history: if true, also return the derivation history.
+        """
+        args = (dhatu, dhatu_code, la)
+        return self._get(
+            "tinanta", ashtadhyayi.tinanta, args, tags, options, history
+        )[0]
+
+    def all_tinantas(
+        self, dhatu, dhatu_code, la, tags=None, options=None, history=False
+    ) -> List[CachedForm]:
+        """Cached version of :func:`~padmini.ashtadhyayi.all_tinantas`."""
+        args = (dhatu, dhatu_code, la)
+        return self._get(
+            "all_tinantas", ashtadhyayi.all_tinantas, args, tags, options, history
+        )
+
+    def subanta(
+        self, pratipadika, linga, tags=None, options=None, history=False
+    ) -> CachedForm:
+        """Cached version of :func:`~padmini.ashtadhyayi.subanta`."""
+        args = (pratipadika, linga)
+        return self._get(
+            "subanta", ashtadhyayi.subanta, args, tags, options, history
+        )[0]
+
+    def all_subantas(
+        self, pratipadika, linga, tags=None, options=None, history=False
+    ) -> List[CachedForm]:
+        """Cached version of :func:`~padmini.ashtadhyayi.all_subantas`."""
+        args = (pratipadika, linga)
+        return self._get(
+            "all_subantas", ashtadhyayi.all_subantas, args, tags, options, history
+        )
@@ -0,0 +1,357 @@
+"""Compile generated forms into a minimal acyclic automaton.
+
+A DAWG (directed acyclic word graph) stores a set of strings by sharing both
+their prefixes and their suffixes. Verb forms share a great deal of both, so
+the automaton is much smaller than a trie of the same forms.
+
+Analyses are much less regular than forms: every dhātu has its own code. So
+we keep them out of the automaton. Instead, each state stores the number of
+forms it accepts, which lets us compute the rank of a form in sorted order as
+we walk it (Lucchesi and Kowaltowski, 1993). We then use this rank as an
+index into a table of analyses. Each analysis is a (lemma, tag) pair, e.g.
+``("01.0001,BU", "law,tip")``, and both are stored as ids into string tables.
+Lookups are linear in the length of the form.
+
+To build an automaton from the output of ``harness.py``, run::
+
+    python harness.py > forms.xml
+    python -m padmini.dawg forms.xml forms.dawg
+
+The file format is simple so that it can be read without this package. All
+integers are little-endian.
+
+- the magic bytes ``PDAWG2``
+- the number of states `n`, edges `m`, and analyses `k`, as uint32s
+- `n` + 1 uint32 offsets. The edges of state `i` are the edges in the range
+  ``[offsets[i], offsets[i + 1])``, sorted by label.
+- `m` edge labels, one byte each
+- `m` edge targets, as uint32s
+- `n` bytes, one per state, that are 1 if the state is final and 0
+  otherwise
+- `n` uint32 counts: the number of forms accepted from each state
+- `f` + 1 uint32 offsets, where `f` is the count of state 0. The analyses of
+  the form with rank `i` are those in ``[offsets[i], offsets[i + 1])``.
+- `k` uint32 lemma ids, then `k` uint32 tag ids
+- the lemma table and then the tag table. Each table is a uint32 byte length
+  followed by its strings in UTF-8, separated by ``\\n``.
+
+State 0 is the start state.
+"""
+
+import argparse
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+MAGIC = b"PDAWG2"
+
+_XML_RE = re.compile(
+    r'<f form="([^"]*)"><root name="([^"]*)" num="([^"]*)"/><(\w+)/><(\w+)/></f>'
+)
+
+
+def parse_harness_xml(lines: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """Yield a (form, lemma, tag) triple for every form in `lines`.
+
+    `lines` should be in the format that ``harness.py`` produces. The lemma
+    has the form ``num,root`` and the tag has the form ``la,tin``. Lines that
+    don't contain a form are skipped.
+    """
+    for line in lines:
+        m = _XML_RE.search(line)
+        if m:
+            form, root, num, la, tin = m.groups()
+            yield form, f"{num},{root}", f"{la},{tin}"
+
+
+class _State:
+    __slots__ = ("edges", "final")
+
+    def __init__(self):
+        self.edges: Dict[int, "_State"] = {}
+        self.final = False
+
+
+class DawgBuilder:
+    """Build a minimal DAWG from keys added in sorted order.
+
+    This is the incremental algorithm from Daciuk et al., "Incremental
+    Construction of Minimal Acyclic Finite-State Automata" (2000). After each
+    key, all states that are no longer on the path of the most recent key
+    are merged with an equivalent state if one exists. So the automaton is
+    always minimal except along that one path.
+    """
+
+    def __init__(self):
+        self.root = _State()
+        self._register: Dict[tuple, _State] = {}
+        # (parent, label, child) for each edge on the path of the last key.
+        self._unchecked: List[Tuple[_State, int, _State]] = []
+        self._previous = None
+
+    def add(self, key: bytes):
+        if self._previous is not None:
+            if key < self._previous:
+                raise ValueError("Keys must be added in sorted order.")
+            if key == self._previous:
+                return
+            prefix_len = 0
+            for a, b in zip(key, self._previous):
+                if a != b:
+                    break
+                prefix_len += 1
+        else:
+            prefix_len = 0
+
+        self._minimize(prefix_len)
+        if self._unchecked:
+            state = self._unchecked[-1][2]
+        else:
+            state = self.root
+        for label in key[prefix_len:]:
+            child = _State()
+            state.edges[label] = child
+            self._unchecked.append((state, label, child))
+            state = child
+        state.final = True
+        self._previous = key
+
+    def _minimize(self, down_to: int):
+        while len(self._unchecked) > down_to:
+            parent, label, child = self._unchecked.pop()
+            signature = (
+                child.final,
+                tuple((k, id(v)) for k, v in sorted(child.edges.items())),
+            )
+            existing = self._register.get(signature)
+            if existing is None:
+                self._register[signature] = child
+            else:
+                parent.edges[label] = existing
+
+    def finish(self) -> List[_State]:
+        """Minimize the remaining states and return all states in depth-first
+        order. The first state is the start state."""
+        self._minimize(0)
+
+        seen = {id(self.root)}
+        order = [self.root]
+        stack = [self.root]
+        while stack:
+            state = stack.pop()
+            for _, child in sorted(state.edges.items(), reverse=True):
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    order.append(child)
+                    stack.append(child)
+        return order
+
+
+def _pack_table(strings: List[str]) -> bytes:
+    data = "\n".join(strings).encode("utf-8")
+    return struct.pack("<I", len(data)) + data
+
+
+def _unpack_table(data: bytes, pos: int) -> Tuple[List[str], int]:
+    (size,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    strings = data[pos : pos + size].decode("utf-8").split("\n")
+    return strings, pos + size
+
+
+def _to_le(*arrays: array):
+    if sys.byteorder != "little":
+        for a in arrays:
+            a.byteswap()
+
+
+def build(entries: Iterable[Tuple[str, str, str]]) -> bytes:
+    """Build a serialized DAWG from (form, lemma, tag) triples.
+
+    The triples can be in any order and may contain duplicates.
+    """
+    analyses: Dict[bytes, set] = {}
+    lemma_ids: Dict[str, int] = {}
+    tag_ids: Dict[str, int] = {}
+    for form, lemma, tag in entries:
+        lemma_id = lemma_ids.setdefault(lemma, len(lemma_ids))
+        tag_id = tag_ids.setdefault(tag, len(tag_ids))
+        analyses.setdefault(form.encode("utf-8"), set()).add((lemma_id, tag_id))
+
+    keys = sorted(analyses)
+    builder = DawgBuilder()
+    for key in keys:
+        builder.add(key)
+    states = builder.finish()
+    ids = {id(s): i for i, s in enumerate(states)}
+
+    offsets = array("I", [0])
+    labels = bytearray()
+    targets = array("I")
+    finals = bytearray()
+    for state in states:
+        for label, child in sorted(state.edges.items()):
+            labels.append(label)
+            targets.append(ids[id(child)])
+        offsets.append(len(labels))
+        finals.append(1 if state.final else 0)
+
+    counts = array("I", [0] * len(states))
+    done = bytearray(len(states))
+
+    def count(i):
+        if not done[i]:
+            counts[i] = finals[i] + sum(
+                count(targets[j]) for j in range(offsets[i], offsets[i + 1])
+            )
+            done[i] = 1
+        return counts[i]
+
+    # The recursion is only as deep as the longest form.
+    count(0)
+
+    value_offsets = array("I", [0])
+    value_lemmas = array("I")
+    value_tags = array("I")
+    for key in keys:
+        for lemma_id, tag_id in sorted(analyses[key]):
+            value_lemmas.append(lemma_id)
+            value_tags.append(tag_id)
+        value_offsets.append(len(value_lemmas))
+
+    _to_le(offsets, targets, counts, value_offsets, value_lemmas, value_tags)
+    return b"".join(
+        [
+            MAGIC,
+            struct.pack("<III", len(states), len(labels), len(value_lemmas)),
+            offsets.tobytes(),
+            bytes(labels),
+            targets.tobytes(),
+            bytes(finals),
+            counts.tobytes(),
+            value_offsets.tobytes(),
+            value_lemmas.tobytes(),
+            value_tags.tobytes(),
+            _pack_table(list(lemma_ids)),
+            _pack_table(list(tag_ids)),
+        ]
+    )
+
+
+class Dawg:
+    """A read-only DAWG created with :func:`build`.
+
+    :param data: the serialized automaton.
+    """
+
+    def __init__(self, data: bytes):
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not a DAWG file.")
+        pos = len(MAGIC)
+        num_states, num_edges, num_values = struct.unpack_from("<III", data, pos)
+        pos += 12
+
+        def read_array(n):
+            nonlocal pos
+            a = array("I")
+            a.frombytes(data[pos : pos + 4 * n])
+            pos += 4 * n
+            return a
+
+        self._offsets = read_array(num_states + 1)
+        self._labels = data[pos : pos + num_edges]
+        pos += num_edges
+        self._targets = read_array(num_edges)
+        self._finals = data[pos : pos + num_states]
+        pos += num_states
+        self._counts = read_array(num_states)
+        self._value_offsets = read_array(self._counts[0] + 1 if num_states else 1)
+        self._value_lemmas = read_array(num_values)
+        self._value_tags = read_array(num_values)
+        _to_le(
+            self._offsets,
+            self._targets,
+            self._counts,
+            self._value_offsets,
+            self._value_lemmas,
+            self._value_tags,
+        )
+        self._lemmas, pos = _unpack_table(data, pos)
+        self._tags, pos = _unpack_table(data, pos)
+
+    @staticmethod
+    def load(path) -> "Dawg":
+        with open(path, "rb") as f:
+            return Dawg(f.read())
+
+    @property
+    def num_states(self) -> int:
+        return len(self._finals)
+
+    def __len__(self):
+        """Return the number of distinct forms."""
+        return self._counts[0] if self._finals else 0
+
+    def rank(self, form: str) -> int:
+        """Return the index of `form` among all forms in sorted order, or -1
+        if `form` is not in the automaton."""
+        if not self._finals:
+            return -1
+        offsets = self._offsets
+        labels = self._labels
+        targets = self._targets
+        counts = self._counts
+
+        state = 0
+        rank = 0
+        for label in form.encode("utf-8"):
+            lo = offsets[state]
+            hi = offsets[state + 1]
+            i = bisect_left(labels, label, lo, hi)
+            if i == hi or labels[i] != label:
+                return -1
+            # Skip the form that ends here and all forms under smaller labels.
+            rank += self._finals[state]
+            for j in range(lo, i):
+                rank += counts[targets[j]]
+            state = targets[i]
+        if not self._finals[state]:
+            return -1
+        return rank
+
+    def lookup(self, form: str) -> List[Tuple[str, str]]:
+        """Return all (lemma, tag) analyses of `form`."""
+        rank = self.rank(form)
+        if rank < 0:
+            return []
+        start = self._value_offsets[rank]
+        end = self._value_offsets[rank + 1]
+        return [
+            (self._lemmas[self._value_lemmas[i]], self._tags[self._value_tags[i]])
+            for i in range(start, end)
+        ]
+
+    def __contains__(self, form: str) -> bool:
+        return self.rank(form) >= 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile the output of harness.py into a DAWG."
+    )
+    parser.add_argument("input", help="XML output of harness.py")
+    parser.add_argument("output", help="path to the output DAWG file")
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        data = build(parse_harness_xml(f))
+    with open(args.output, "wb") as f:
+        f.write(data)
+
+
+if __name__ == "__main__":
+    main()
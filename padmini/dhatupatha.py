@@ -1,25 +1,166 @@
-from typing import NamedTuple, List
+import functools
+import marshal
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
 from padmini.prakriya import Term
 
 
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#: The path to the dhatupatha that ships with Padmini.
+DHATUPATHA_PATH = os.path.join(_REPO_ROOT, "data", "dhatupatha.tsv")
+
+# Bump this whenever the snapshot format changes.
+_SNAPSHOT_VERSION = 1
+
+
 class DhatupathaEntry(NamedTuple):
     upadesha: str
     gana: str
     number: str
+    #: The meaning of the dhatu, e.g. "sattAyAm" for "BU".
+    meaning: str = ""
+
+    @property
+    def code(self) -> str:
+        """The dhatu code, e.g. "01.0001"."""
+        return f"{self.gana}.{self.number}"
+
+
+class Dhatupatha:
+    """The dhatupatha with indexes for common lookups.
+
+    Entries keep the order of the source file. Use :func:`load` to get a
+    shared, cached instance.
+
+    :param entries: the entries in the dhatupatha.
+    """
+
+    def __init__(self, entries: List[DhatupathaEntry]):
+        self.entries = entries
+        #: Maps a dhatu code to its entry.
+        self.by_code: Dict[str, DhatupathaEntry] = {}
+        #: Maps an upadesha to its entries. Some upadeshas appear in more than
+        #: one gana.
+        self.by_upadesha: Dict[str, List[DhatupathaEntry]] = {}
+        #: Maps a gana (e.g. "01") to its entries.
+        self.by_gana: Dict[str, List[DhatupathaEntry]] = {}
+        for e in entries:
+            self.by_code[e.code] = e
+            self.by_upadesha.setdefault(e.upadesha, []).append(e)
+            self.by_gana.setdefault(e.gana, []).append(e)
+        self._by_root: Optional[Dict[str, List[DhatupathaEntry]]] = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[DhatupathaEntry]:
+        return iter(self.entries)
+
+    def __getitem__(self, code: str) -> DhatupathaEntry:
+        return self.by_code[code]
+
+    def gana(self, gana) -> List[DhatupathaEntry]:
+        """Return the entries in `gana`, which is an int or a string like
+        "01"."""
+        return self.by_gana.get(f"{int(gana):02d}", [])
+
+    def by_root(self, root: str) -> List[DhatupathaEntry]:
+        """Return the entries whose root is `root` once its `it` letters and
+        accent marks are removed. For example, "eD" matches "eDa~\\\\".
+
+        We build this index on first use, since it runs the it-prakarana on
+        every dhatu.
+        """
+        if self._by_root is None:
+            self._by_root = {}
+            for e in self.entries:
+                self._by_root.setdefault(_strip(e.upadesha), []).append(e)
+        return self._by_root.get(root, [])
+
+    @staticmethod
+    def from_tsv(path) -> "Dhatupatha":
+        """Parse a TSV file with columns for code, upadesha, and meaning.
+
+        Rows whose upadesha is "-" are skipped.
+        """
+        entries = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                code, upadesha, meaning = line.split("\t")
+                gana, number = code.split(".")
+                if upadesha == "-":
+                    continue
+                entries.append(DhatupathaEntry(upadesha, gana, number, meaning))
+        return Dhatupatha(entries)
+
+    def save_snapshot(self, path):
+        """Write a binary snapshot that :meth:`from_snapshot` can read."""
+        data = (_SNAPSHOT_VERSION, [tuple(e) for e in self.entries])
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def from_snapshot(path) -> Optional["Dhatupatha"]:
+        """Read a snapshot written by :meth:`save_snapshot`.
+
+        :return: the dhatupatha, or ``None`` if the snapshot is missing or
+            uses an old format.
+        """
+        try:
+            with open(path, "rb") as f:
+                version, rows = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != _SNAPSHOT_VERSION:
+            return None
+        return Dhatupatha([DhatupathaEntry(*row) for row in rows])
+
+
+def _strip(upadesha: str) -> str:
+    # Imported here to avoid a cycle with the prakarana modules.
+    from padmini.constants import Tag as T
+    from padmini.prakarana import it_samjna
+    from padmini.prakriya import HistoryLevel, Prakriya
+
+    t = Term.make_upadesha(upadesha)
+    t.add_tags(T.DHATU)
+    p = Prakriya.make([t], history_level=HistoryLevel.NONE)
+    it_samjna.run_no_index(p, t)
+    return t.text
+
+
+@functools.cache
+def load(path=DHATUPATHA_PATH, snapshot=None) -> Dhatupatha:
+    """Load the dhatupatha once and cache it.
+
+    :param path: the TSV file to read.
+    :param snapshot: if set, the path to a binary snapshot of `path`. We read
+        the snapshot if it is newer than `path` and otherwise recreate it.
+    """
+    if snapshot is not None:
+        try:
+            fresh = os.path.getmtime(snapshot) >= os.path.getmtime(path)
+        except OSError:
+            fresh = False
+        if fresh:
+            d = Dhatupatha.from_snapshot(snapshot)
+            if d is not None:
+                return d
+
+    d = Dhatupatha.from_tsv(path)
+    if snapshot is not None:
+        d.save_snapshot(snapshot)
+    return d
 
 
 def load_dhatus() -> List[DhatupathaEntry]:
-    res = []
-    with open("data/dhatupatha.tsv") as f:
-        for line in f:
-            line = line.strip()
-            code, upadesha, meaning = line.split("\t")
-            gana, number = code.split(".")
-            if upadesha == "-":
-                continue
-
-            res.append(DhatupathaEntry(upadesha, gana, number))
-    return res
+    """Return all entries in the dhatupatha as a new list."""
+    return list(load().entries)
 
 
 def is_kutadi(term: Term):
@@ -1,6 +1,6 @@
 from padmini.constants import Tag as T
 from .prakriya import Term
-from .sounds import s, HRASVA
+from .sounds import AC, HAL, HRASVA
 
 
 def samyoganta(t: Term) -> bool:
@@ -10,7 +10,7 @@ def samyoganta(t: Term) -> bool:
         # HACK: check for final C without tug-agama
         if y == "C":
             return True
-        return x in s("hal") and y in s("hal")
+        return x in HAL and y in HAL
     except ValueError:
         return False
 
@@ -19,7 +19,7 @@ def samyogadi(t: Term) -> bool:
     """``True`` iff `t` starts with multiple consonants."""
     try:
         x, y = t.text[:2]
-        return x in s("hal") and y in s("hal")
+        return x in HAL and y in HAL
     except ValueError:
         return False
 
@@ -81,6 +81,6 @@ def is_nit_lakara(la: Term) -> bool:
 
 
 def is_eka_ac(t: Term) -> bool:
-    num_vowels = sum(1 for L in t.text if L in s("ac"))
+    num_vowels = sum(1 for L in t.text if L in AC)
     # HACK to have ekac apply for am-Agama
     return num_vowels == 1 or "fa" in t.text
@@ -0,0 +1,158 @@
+"""A precomputed index of every tinanta in the dhatupatha.
+
+The index maps each surface form back to the derivations that produce it, so
+we can analyze a form like ``Bavati`` without running the grammar. It is a
+plain TSV file sorted by form, one derivation per line::
+
+    Bavati	01.0001	la~w	prathama	ekavacana	parasmaipada
+
+The last column lists the optional rules seen during the derivation, as
+``rule=0`` or ``rule=1`` separated by commas.
+
+:class:`FormIndex` memory-maps this file and finds a form with a binary
+search, so lookups are fast and loading costs almost nothing.
+
+To build the index, run::
+
+    python -m padmini.form_index forms.tsv
+"""
+
+import argparse
+import mmap
+from typing import List, NamedTuple, Optional, Tuple
+
+from padmini.stream import FormRecord, format_options, iter_forms, parse_options
+
+
+class Analysis(NamedTuple):
+    """One derivation of a form."""
+
+    #: The dhatu code, e.g. "01.0001".
+    dhatu_code: str
+    #: The lakara name, as in :data:`padmini.stream.LAKARAS`.
+    la: str
+    purusha: str
+    vacana: str
+    pada: str
+    #: The optional rules seen during the derivation, as (rule, accepted)
+    #: pairs.
+    options: Tuple[Tuple[str, bool], ...]
+
+
+def _to_line(r: FormRecord) -> str:
+    options = format_options(r.options)
+    return "\t".join((r.form, r.code, r.la, r.purusha, r.vacana, r.pada, options))
+
+
+def build(path, dhatus=None, workers: Optional[int] = None) -> int:
+    """Generate every form of `dhatus` and write a sorted index to `path`.
+
+    :param path: the output path.
+    :param dhatus: the dhatus to index. If ``None``, index the full
+        dhatupatha.
+    :param workers: the number of worker processes. If ``None``, use one per
+        CPU. If 1, run in the current process.
+    :return: the number of lines written.
+    """
+    records = iter_forms(dhatus, workers=workers)
+    lines = [_to_line(r) for r in records]
+
+    # Sort by UTF-8 bytes so that the order matches the one FormIndex uses.
+    # Since "\t" sorts before every sound, this also sorts by form.
+    data = sorted(line.encode("utf-8") for line in lines)
+    with open(path, "wb") as f:
+        for line in data:
+            f.write(line)
+            f.write(b"\n")
+    return len(data)
+
+
+class FormIndex:
+    """A read-only view of an index file created with :func:`build`.
+
+    :param path: the index file.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap can't map an empty file.
+            self._mm = b""
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _line_end(self, pos: int) -> int:
+        """Return the offset of the newline that ends the line at `pos`.
+
+        If the last line has no newline, return the length of the file.
+        """
+        end = self._mm.find(b"\n", pos)
+        return len(self._mm) if end == -1 else end
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Return the offset of the first line whose form is >= `key`."""
+        mm = self._mm
+        lo = 0
+        hi = len(mm)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", 0, mid) + 1
+            end = self._line_end(start)
+            tab = mm.find(b"\t", start, end)
+            if mm[start : end if tab == -1 else tab] < key:
+                lo = end + 1
+            else:
+                hi = start
+        return min(lo, len(mm))
+
+    def lookup(self, form: str) -> List[Analysis]:
+        """Return every derivation of `form`, or an empty list if `form` is
+        not in the index."""
+        mm = self._mm
+        key = form.encode("utf-8")
+        prefix = key + b"\t"
+        pos = self._lower_bound(key)
+        ret = []
+        while mm[pos : pos + len(prefix)] == prefix:
+            end = self._line_end(pos)
+            fields = mm[pos:end].decode("utf-8").split("\t")
+            code, la, purusha, vacana, pada, options = fields[1:]
+            ret.append(
+                Analysis(code, la, purusha, vacana, pada, parse_options(options))
+            )
+            pos = end + 1
+        return ret
+
+    def __contains__(self, form: str) -> bool:
+        key = form.encode("utf-8") + b"\t"
+        pos = self._lower_bound(form.encode("utf-8"))
+        return self._mm[pos : pos + len(key)] == key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the form index.")
+    parser.add_argument("output", help="path to the output TSV file")
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker processes (default: one per CPU)",
+    )
+    args = parser.parse_args()
+    build(args.output, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
-import re
 from typing import List, Optional
 
+from . import sounds
 from .constants import Tag as T
 from .prakarana import it_samjna
 from .prakriya import Term, Prakriya
-from .sounds import s
 
 
 def optional(func, rule: str, p: Prakriya, *args) -> bool:
@@ -78,17 +77,17 @@ def antya(rule: str, p: Prakriya, u: Term, sub: str):
 
 def mit(rule: str, p: Prakriya, u: Term, sub: str):
     """Insert after the last vowel."""
-    ac = s("ac").regex
-    hal = s("hal").regex
-    u.text = re.sub(f"({ac})({hal}*)$", f"\\1{sub}\\2", u.text)
+    i = sounds.last_vowel_index(u.text)
+    if i is not None:
+        u.text = u.text[: i + 1] + sub + u.text[i + 1 :]
     p.step(rule)
 
 
 def ti(rule: str, p: Prakriya, u: Term, sub: str):
     """Replace from the last vowel on."""
-    ac = s("ac").regex
-    hal = s("hal").regex
-    u.text = re.sub(f"{ac}{hal}*$", sub, u.text)
+    i = sounds.last_vowel_index(u.text)
+    if i is not None:
+        u.text = u.text[:i] + sub
     p.step(rule)
 
 
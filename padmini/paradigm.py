@@ -0,0 +1,91 @@
+"""Generate complete verb paradigms.
+
+A paradigm is every form of a dhātu in a single lakāra: 3 puruṣas times 3
+vacanas, in parasmaipada, ātmanepada, or both. Popular roots are requested
+again and again, so :func:`paradigm` keeps recent results in a bounded LRU
+cache. Use :func:`cache_info` to inspect its hits and misses.
+"""
+
+import functools
+import itertools
+from typing import NamedTuple, Tuple
+
+from padmini.ashtadhyayi import all_tinantas
+from padmini.constants import Tag as T
+from padmini.prakarana.tin_pratyaya import PURUSHA, VACANA
+from padmini.prakriya import HistoryLevel
+
+
+#: The maximum number of paradigms to keep in memory.
+CACHE_SIZE = 1024
+
+
+class Form(NamedTuple):
+    """A single form in a paradigm."""
+
+    #: The final text of the form.
+    text: str
+    #: The puruṣa of the form, e.g. :attr:`Tag.PRATHAMA`.
+    purusha: str
+    #: The vacana of the form, e.g. :attr:`Tag.EKAVACANA`.
+    vacana: str
+    #: The pada of the form, e.g. :attr:`Tag.PARASMAIPADA`.
+    pada: str
+    #: The optional rules seen during the derivation, as (rule, accepted)
+    #: pairs.
+    options: Tuple[Tuple[str, bool], ...]
+
+
+def make_paradigm(
+    dhatu: str, dhatu_code: str, la: str, tags=None
+) -> Tuple[Form, ...]:
+    """Uncached version of :func:`paradigm`.
+
+    Use this for bulk generation, where caching would only use memory.
+    """
+    tags = frozenset(tags or ())
+    forms = []
+    for purusha, vacana in itertools.product(PURUSHA, VACANA):
+        prakriyas = all_tinantas(
+            dhatu,
+            dhatu_code,
+            la,
+            tags=tags | {purusha, vacana},
+            history_level=HistoryLevel.NONE,
+        )
+        for p in prakriyas:
+            if p.terms[-1].all(T.ATMANEPADA):
+                pada = T.ATMANEPADA
+            else:
+                pada = T.PARASMAIPADA
+            options = tuple(tuple(x) for x in p.options_seen)
+            forms.append(Form(p.text, purusha, vacana, pada, options))
+    return tuple(forms)
+
+
+_paradigm = functools.lru_cache(maxsize=CACHE_SIZE)(make_paradigm)
+
+
+def paradigm(dhatu: str, dhatu_code: str, la: str, tags=None) -> Tuple[Form, ...]:
+    """Generate every form of `dhatu` in lakāra `la`.
+
+    Results are cached, so repeated calls with the same arguments are cheap.
+    Callers must not rely on getting a fresh object back.
+
+    :param dhatu: the dhātu to use, as in :func:`~padmini.ashtadhyayi.tinanta`.
+    :param dhatu_code: the number in the Dhatupatha.
+    :param la: the lakāra to use.
+    :param tags: extra tags to add to each derivation, e.g. :attr:`Tag.ASHIH`.
+    :return: all forms, ordered by puruṣa and vacana.
+    """
+    return _paradigm(dhatu, dhatu_code, la, frozenset(tags or ()))
+
+
+def cache_info():
+    """Return hit and miss statistics for the :func:`paradigm` cache."""
+    return _paradigm.cache_info()
+
+
+def cache_clear():
+    """Clear the :func:`paradigm` cache."""
+    _paradigm.cache_clear()
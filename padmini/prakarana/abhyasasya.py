@@ -80,7 +80,7 @@ def run_for_each(p: Prakriya, c: Term, dhatu: Term):
         if res != c.text:
             op.text("7.4.60", p, c, res)
 
-    kuhozcu = sounds.map_sounds(s("ku~ h"), s("cu~"))
+    kuhozcu = sounds.map_sounds_s("ku~ h", "cu~")
     if c.adi in kuhozcu:
         op.adi("7.4.62", p, c, kuhozcu[c.adi])
     if c.antya in sounds.DIRGHA:
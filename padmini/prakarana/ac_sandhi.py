@@ -4,7 +4,9 @@ ac_sandhi
 (6.1.66 - 6.1.101)
 """
 
-import re
+import functools
+import itertools
+from typing import Dict, NamedTuple
 
 from padmini import operations as op, sounds
 from padmini.sounds import s
@@ -24,85 +26,95 @@ def sup_sandhi_before_angasya(p: Prakriya):
         op.antya("6.1.93", p, c, "A")
 
 
-def find_all_matches(pattern: str, view):
-    """Used because `view` might be mutated per match."""
-    match = re.search(pattern, view.text)
-    i = 0
-    while match:
-        yield match
-
-        # Yield another only if it progresses.
-        j = match.span(0)[0]
-        if i != j:
-            i = j
-            match = re.search(pattern, view.text)
+class VowelSandhi(NamedTuple):
+    """The result of ac-sandhi between two adjacent vowels."""
+
+    #: The rule that applies.
+    rule: str
+    #: The replacement for the first vowel.
+    first: str
+    #: The replacement for the second vowel.
+    second: str
+    #: The rule's precedence. Lower values take precedence.
+    rank: int
+
+
+@functools.cache
+def _vowel_sandhi_table() -> Dict[str, VowelSandhi]:
+    """Map each pair of adjacent vowels to the sandhi that applies to it.
+
+    Rules take precedence in this order: 6.1.97, 6.1.78, 6.1.101, 6.1.77,
+    and 6.1.87/88. If more than one rule matches a pair, we use the first.
+    """
+    ayadi = dict(zip(s("ec").items, ("ay", "av", "Ay", "Av")))
+    yan = dict(zip("iIuUfFxX", "yyvvrrll"))
+
+    table = {}
+    for x, y in itertools.product(s("ac").items, repeat=2):
+        if x == "a" and y in "aeo":
+            # ato guNe
+            result = VowelSandhi("6.1.97", "", y, 0)
+        elif x in s("ec"):
+            # eco 'yavAyAvaH
+            result = VowelSandhi("6.1.78", ayadi[x], y, 1)
+        elif x in s("ak") and y in s("ak") and y in sounds.savarna(x):
+            # akaH savarNe dIrghaH
+            result = VowelSandhi("6.1.101", "", sounds.dirgha(x), 2)
+        elif x in s("ik"):
+            # iko yaR aci
+            result = VowelSandhi("6.1.77", yan[x], y, 3)
+        elif x in s("a") and y in s("ec"):
+            # vRddhir eci
+            result = VowelSandhi("6.1.88", sounds.vrddhi(y), "", 4)
+        elif x in s("a") and y in s("ik") and y not in "xX":
+            # Ad guNaH. (`sounds.guna` does not support x.)
+            result = VowelSandhi("6.1.87", sounds.guna(y), "", 4)
         else:
-            return
+            continue
+        table[x + y] = result
+    return table
 
 
 def general_vowel_sandhi(p: Prakriya, terms=None):
-    """
+    """Apply ac-sandhi to every pair of adjacent vowels.
+
+    We scan the text once from left to right. If the next pair uses a rule
+    with higher precedence (e.g. "A f a", where 6.1.77 blocks 6.1.87), we
+    apply that rule first. A substitution can create a new pair with the
+    sound before it (e.g. when 6.1.97 deletes a vowel), so after each one we
+    step back by one sound. Every substitution removes a vowel or an ec
+    sound, so the scan always ends.
 
     :param terms: optional. Used as a hack to apply ac-sandhi before Ni-lopa
     without also modifying Ni.
     """
+    table = _vowel_sandhi_table()
     view = StringView(terms or p.terms)
-    match = re.search("([a])([aeo])", view.text)
-    while match:
-        view[match.span(0)[0]] = ""
-        p.step("6.1.97")
-        match = re.search("([a])([aeo])", view.text)
-
-    a = s("a").regex
-    ac = s("ac").regex
-    ak = s("ak").regex
-    ec = s("ec").regex
-    ic = s("ic").regex
-    ik = s("ik").regex
-    for match in find_all_matches(f"({ec})({ac})", view):
-        mapping = dict(zip(s("ec").items, ("ay", "av", "Ay", "Av")))
-        view[match.span(0)[0]] = mapping[match.group(1)]
-        p.step("6.1.78")
-
-    match = re.search(f"({ak})({ak})", view.text)
-    while match:
-        first = match.group(1)
-        second = match.group(2)
-        if second in sounds.savarna(first):
-            view[match.span(0)[0]] = ""
-            view[match.span(1)[0]] = sounds.dirgha(first)
-            p.step("6.1.101")
-
-        # Loop but avoid infinite loop, which is possible here due to the
-        # savarna check.
-        old_start = match.span(0)[0]
-        match = re.search(f"({ak})({ak})", view.text)
-        if match and match.span(0)[0] == old_start:
-            break
-
-    for match in find_all_matches(f"({ik})({ac})", view):
-        mapping = dict(zip("iIuUfFxX", "yyvvrrll"))
-        view[match.span(0)[0]] = mapping[match.group(1)]
-        p.step("6.1.77")
-
-    match = re.search(f"({a})({ic})", view.text)
-    while match:
-        first = match.group(1)
-        second = match.group(2)
-        if second in s("ec"):
-            view[match.span(0)[0]] = sounds.vrddhi(second)
-            view[match.span(0)[1] - 1] = ""
-            p.step("6.1.88")
+    text = view.text
+    i = 0
+    while i < len(text) - 1:
+        result = table.get(text[i : i + 2])
+        if result is None:
+            i += 1
+            continue
+        following = table.get(text[i + 1 : i + 3])
+        if following is not None and following.rank < result.rank:
+            i += 1
+            continue
+
+        # HACK for trnah
+        term = view.term_for_index(i)
+        if result.rule == "6.1.87" and term.text == "tfnaih":
+            op.text("6.1.87", p, term, "tfneh")
         else:
-            # HACK for trnah
-            term = view.term_for_index(match.span(0)[0])
-            if term.text == "tfnaih":
-                op.text("6.1.87", p, term, "tfneh")
-            else:
-                view[match.span(0)[0]] = sounds.guna(second)
-                view[match.span(0)[1] - 1] = ""
-                p.step("6.1.87")
-        match = re.search(f"({a})({ic})", view.text)
+            # Replace the second vowel first so that `i` stays valid.
+            if result.second != text[i + 1]:
+                view[i + 1] = result.second
+            view[i] = result.first
+            p.step(result.rule)
+
+        text = view.text
+        i = max(i - 1, 0)
 
 
 def sup_sandhi_after_angasya(p: Prakriya):
@@ -142,11 +154,9 @@ def run_for_term(p: Prakriya, index: int):
     # Ignore this case if it starts an upadesha, otherwise roots like "vraj"
     # would by vyartha. Likewise for roots ending with 'v'
     # TODO: handle term boundaries more elegantly
-    val = s("val")
-    s_val = "".join(val.items)
-    re_vyor_vali = f"[vy]([{s_val}])"
-    if re.search(re_vyor_vali, c.text) and not c.all(T.DHATU):
-        c.text = re.sub(re_vyor_vali, r"\1", c.text)
+    vyor_vali = sounds.pattern("[vy]({val})")
+    if vyor_vali.search(c.text) and not c.all(T.DHATU):
+        c.text = vyor_vali.sub(r"\1", c.text)
         p.step("6.1.66")
 
     try:
@@ -154,7 +164,7 @@ def run_for_term(p: Prakriya, index: int):
     except IndexError:
         return
 
-    if c.antya in s("v y") and n.adi in val and not c.all(T.DHATU):
+    if c.antya in s("v y") and n.adi in sounds.VAL and not c.all(T.DHATU):
         op.antya("6.1.66", p, c, "")
 
     # TODO: NI, Ap
@@ -9,15 +9,13 @@ This section of the text is massive, so we break it down into several smaller
 prakaraṇas.
 """
 
-import re
-
 from padmini import filters as f
 from padmini import operations as op
 from padmini import sounds
 from padmini.constants import Tag as T
 from padmini.dhatu_gana import PU_ADI, MUC_ADI, TRMPH_ADI
 from padmini.prakriya import Prakriya, Term
-from padmini.sounds import s
+from padmini.sounds import s, AC, HAL, IK, JHAL
 from padmini.stem_gana import PURVA_ADI, DATARA_ADI
 from padmini.term_views import TermView, StringView
 
@@ -85,7 +83,7 @@ def pratyaya_adesha(p: Prakriya):
         op.upadesha("7.1.34", p, tin, "O")
 
     # Run 3.1.83 here because it has no clear place otherwise.
-    if prev.u == "SnA" and tin.text == "hi" and ps[-2].antya in s("hal"):
+    if prev.u == "SnA" and tin.text == "hi" and ps[-2].antya in HAL:
         op.upadesha("3.1.83", p, prev, "SAnac")
 
 
@@ -125,7 +123,7 @@ def nnit_vrddhi(p: Prakriya, c: Term, n: TermView):
     if na:
         p.step(na)
     # By "acaH" we should ignore iko guNavRddhI (vye -> vivyAya)
-    elif c.antya in s("ac"):
+    elif c.antya in AC:
         op.antya("7.2.115", p, c, sounds.vrddhi(c.antya))
     elif c.upadha == "a":
         op.upadha("7.2.116", p, c, "A")
@@ -151,7 +149,7 @@ def guna_adesha(p: Prakriya, index: int):
     if (
         c.antya == "u"
         and n.terms[0].any("luk")
-        and n.adi in s("hal")
+        and n.adi in HAL
         and piti_sarvadhatuke
         and can_guna
     ):
@@ -168,15 +166,15 @@ def guna_adesha(p: Prakriya, index: int):
         c.add_tags(T.F_GUNA)
         op.text("7.3.82", p, c, "med")
 
-    elif n.first_non_empty.u == "jus" and c.antya in s("ik"):
+    elif n.first_non_empty.u == "jus" and c.antya in IK:
         c.add_tags(T.F_GUNA)
         op.antya("7.3.83", p, c, sounds.guna(c.antya))
 
-    elif c.text == "tfnah" and n.adi in s("hal") and piti_sarvadhatuke:
+    elif c.text == "tfnah" and n.adi in HAL and piti_sarvadhatuke:
         op.mit("7.3.92", p, c, "i")
 
     # General case
-    elif can_guna and sarva_ardha and c.antya in s("ac"):
+    elif can_guna and sarva_ardha and c.antya in AC:
         if c.text == "jAgf" and n.terms[0].u not in {"kvip", "ciN"} and not n.any("N"):
             c.add_tags(T.F_GUNA)
             op.antya("7.3.85", p, c, "ar")
@@ -190,13 +188,13 @@ def guna_adesha(p: Prakriya, index: int):
     elif can_guna and sarva_ardha and c.upadha in sounds.HRASVA:
         # HACK: Asiddhavat, but this blocks guna.
         # TODO: move this to asiddhavat and add no_guna tag.
-        if c.text == "guh" and n and n.adi in s("ac"):
+        if c.text == "guh" and n and n.adi in AC:
             op.upadha("6.4.89", p, c, "U")
         # Per commentary on 3.1.81, make an exception for dhinv and kRNv.
         elif c.u in ("Divi~", "kfvi~"):
             pass
         # e.g. nenijAma
-        elif c.any(T.ABHYASTA) and n.all("p", T.SARVADHATUKA) and n.adi in s("ac"):
+        elif c.any(T.ABHYASTA) and n.all("p", T.SARVADHATUKA) and n.adi in AC:
             p.step("7.3.87")
         elif sounds.can_guna(c.upadha) and c.upadha in sounds.HRASVA:
             c.add_tags(T.F_GUNA)
@@ -316,11 +314,11 @@ def num_agama(p: Prakriya, index: int):
         op.mit("7.1.59", p, c, "n")
     elif c.u in TRMPH_ADI and n.terms[0].u == "Sa":
         op.mit("7.1.59.v1", p, c, "n")
-    elif c.text in ("masj", "naS") and n.adi in s("Jal"):
+    elif c.text in ("masj", "naS") and n.adi in JHAL:
         op.mit("7.1.60", p, c, "n")
 
     liti = n.any("li~w")
-    if n.adi in s("ac"):
+    if n.adi in AC:
         if c.u in ("ra\\Da~", "jaBI~\\"):
             if c.u == "ra\\Da~" and f.is_it_agama(n.terms[0]) and not liti:
                 p.step("7.1.62")
@@ -338,7 +336,7 @@ def num_agama(p: Prakriya, index: int):
             op.mit("7.1.70", p, c, "n")
         if c.any(T.NAPUMSAKA) and n.adi in s("Jal ac"):
             op.mit("7.1.72", p, c, "n")
-        if c.any in s("ik") and n.adi in s("ac") and n.any(T.VIBHAKTI):
+        if c.any in IK and n.adi in AC and n.any(T.VIBHAKTI):
             op.mit("7.1.73", p, c, "n")
 
 
@@ -356,7 +354,7 @@ def iit_agama(p: Prakriya):
             return
 
         sarva = n.all(T.SARVADHATUKA)
-        hali = n.adi in s("hal")
+        hali = n.adi in HAL
         if sarva and hali:
             piti = n.all("p")
             if piti and c.text == "brU":
@@ -522,7 +520,7 @@ def samhitayam_tuk(p: Prakriya):
     view = StringView(p.terms)
     vtext = view.text
 
-    for match in re.finditer("[aiufx](C)", vtext):
+    for match in sounds.pattern("[aiufx](C)").finditer(vtext):
         index = match.span(1)[0]
         term = view.term_for_index(index)
         if term.any(T.ABHYASA):
@@ -534,7 +532,7 @@ def samhitayam_tuk(p: Prakriya):
             view[match.span(1)[0]] = "tC"
             p.step("6.1.73")
 
-    match = re.search("[AIUFXeEoO](C)", vtext)
+    match = sounds.pattern("[AIUFXeEoO](C)").search(vtext)
     if match:
         view[match.span(1)[0]] = "tC"
         p.step("6.1.75")
@@ -612,7 +610,7 @@ def ato_dirgha(p: Prakriya, index: int):
             op.antya("7.3.101", p, c, "A")
     elif n.all(T.SUP):
         if c.antya == "a":
-            if n.all(T.BAHUVACANA) and n.adi in s("Jal"):
+            if n.all(T.BAHUVACANA) and n.adi in JHAL:
                 op.antya("7.3.103", p, c, "e")
             elif n.adi in s("yaY"):
                 op.antya("7.3.102", p, c, "A")
@@ -692,22 +690,22 @@ def sic_vrddhi(p: Prakriya):
             block_rule = "7.2.5"
         elif dhatu.text == "UrRu":
             block_rule = optional_rule("7.2.6", p)
-        elif dhatu.adi in s("hal") and dhatu.upadha == "a" and dhatu.antya != "C":
+        elif dhatu.adi in HAL and dhatu.upadha == "a" and dhatu.antya != "C":
             block_rule = optional_rule("7.2.7", p)
         # Base case
-        elif dhatu.antya in s("hal"):
+        elif dhatu.antya in HAL:
             block_rule = "7.2.4"
 
     if block_rule:
         p.step(block_rule)
         return
 
-    if dhatu.antya in s("ac"):
+    if dhatu.antya in AC:
         op.antya("7.2.1", p, dhatu, sounds.vrddhi(dhatu.antya))
     elif f.samyoganta(dhatu):
         # 7.2.3 applies to the final vowel generally, even if samyoganta
         text = dhatu.text
-        if text[-3] in s("ac"):
+        if text[-3] in AC:
             dhatu.text = text[:-3] + sounds.vrddhi(text[-3]) + text[-2:]
         else:
             # e.g. "mansj", "pracC"
@@ -785,13 +783,13 @@ def cani_after_guna(p: Prakriya):
         return
 
     # Ignore 'f' because it is handled by 7.4.7.
-    if c.upadha in s("ac") and c.upadha not in s("f"):
+    if c.upadha in AC and c.upadha not in s("f"):
         res = sounds.hrasva(c.upadha)
         if c.any(T.F_AT_LOPA) or c.text == "SAs" or c.any("f"):
             p.step("7.4.2")
         elif res != c.upadha:
             op.upadha("7.4.1", p, c, res)
-    elif has_agama and c.antya in s("ac"):
+    elif has_agama and c.antya in AC:
         # HACK for agama
         res = sounds.hrasva(c.antya)
         op.antya("7.4.1", p, c, res)
@@ -856,7 +854,7 @@ def ksasya(p: Prakriya):
         return
 
     n = p.terms[index + 2]
-    if n.adi in s("ac"):
+    if n.adi in AC:
         op.antya("7.3.72", p, c, "")
     if dhatu.text in {"duh", "dih", "lih", "guh"} and n.all(T.ATMANEPADA):
         op.optional(op.antya, "7.3.73", p, c, "")
@@ -908,10 +906,10 @@ def vibhaktau(p: Prakriya):
         return
     stem = p.terms[-2]
 
-    if stem.text == "rE" and sup.adi in s("hal"):
+    if stem.text == "rE" and sup.adi in HAL:
         op.antya("7.2.85", p, stem, "A")
     elif stem.text in {"yuzmad", "asmad"}:
-        if sup.adi in s("ac"):
+        if sup.adi in AC:
             op.antya("7.2.89", p, stem, "y")
         elif sup.text:
             op.antya("7.2.86", p, stem, "A")
@@ -1,11 +1,66 @@
+import functools
+from typing import List, NamedTuple, Tuple
+
 from padmini import operations as op
 from padmini.constants import Tag as T
 from padmini.dhatu_gana import CUR_MIT, KUSMADI, GARVADI
-from padmini.prakriya import Term, Prakriya
+from padmini.prakriya import HistoryLevel, Prakriya, Term, TermState, TagSet
 from . import it_samjna
 
 
+class DhatuProfile(NamedTuple):
+    """The result of :func:`run` for some dhatu.
+
+    :func:`run` does not depend on anything but the dhatu, so we compute this
+    profile once per dhatu and replay it onto later prakriyas.
+    """
+
+    #: Each step of the derivation as a rule and the state of each term.
+    steps: Tuple[Tuple[str, Tuple[TermState, ...]], ...]
+    #: The final state of each term.
+    terms: Tuple[TermState, ...]
+    #: The tags added to the prakriya, as a tag mask.
+    tags: int
+
+
+def _make_terms(states) -> List[Term]:
+    ret = []
+    for u, text, mask, gana, number in states:
+        ret.append(Term(u, text, TagSet.from_mask(mask), gana, number))
+    return ret
+
+
+@functools.cache
+def profile(dhatu: str, dhatu_code: str) -> DhatuProfile:
+    """Return the profile of `dhatu`. The arguments match those of
+    :func:`run`."""
+    p = Prakriya.make(history_level=HistoryLevel.TERMS)
+    _run(p, dhatu, dhatu_code)
+    steps = tuple(
+        (step.rule, tuple(t.state() for t in step.terms)) for step in p.steps
+    )
+    terms = tuple(t.state() for t in p.terms)
+    return DhatuProfile(steps, terms, p.tags.mask)
+
+
 def run(p: Prakriya, dhatu: str, dhatu_code: str):
+    """Add the dhatu to the prakriya and apply its samjnas and early sound
+    changes.
+
+    :param dhatu: the dhatu in upadesha form, e.g. "BU".
+    :param dhatu_code: the dhatu code, e.g. "01.0001".
+    """
+    prof = profile(dhatu, dhatu_code)
+    # Replay the steps only if someone will see them.
+    if p.history_level is not HistoryLevel.NONE or p.timer is not None:
+        for rule, states in prof.steps:
+            p.terms = _make_terms(states)
+            p.step(rule)
+    p.terms = _make_terms(prof.terms)
+    p.tags.update_mask(prof.tags)
+
+
+def _run(p: Prakriya, dhatu: str, dhatu_code: str):
     gana, _, number = dhatu_code.partition(".")
     dhatu = Term.make_dhatu(dhatu, int(gana), number)
 
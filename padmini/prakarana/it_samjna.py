@@ -8,28 +8,64 @@ different `it` sounds from an upadeśa. Most derivations use this prakaraṇa a
 least once.
 """
 
+import functools
 import re
+from typing import NamedTuple, Tuple
 
+from padmini import sounds
 from padmini.sounds import s
 from padmini.prakriya import Prakriya, Term
 from padmini.constants import Tag as T
 
 
-def run_no_index(p: Prakriya, u: Term):
-    """Extract its."""
-
-    ac = s("ac")
-    hal = s("hal")
-    tusma = s("tu~ s m")
-    cutu = s("cu~ wu~")
-    lashaku = s("l S ku~")
-
-    # it-prakarana runs only for upadeshas. If not an upadesha, skip.
-    if u.u != u.text:
-        return
-
-    raw = text = u.u
+#: Matches a nasal vowel with an optional accent mark, e.g. "a~" or "i~\\".
+_AC_IT = sounds.pattern("({ac}~[\\\\^]?)")
+#: Matches accent and nasal marks.
+_MARKS = re.compile(r"[\\^~]")
+
+_HAL = s("hal")
+_TUSMA = s("tu~ s m")
+_CUTU = s("cu~ wu~")
+_LASHAKU = s("l S ku~")
+
+#: The lakAras, whose first "l" we keep. Otherwise, rule 3.4.77 would become
+#: vyartha.
+_LAKARAS = {
+    "la~w",
+    "li~w",
+    "lu~w",
+    "lf~w",
+    "le~w",
+    "lo~w",
+    "la~N",
+    "li~N",
+    "lu~N",
+    "lf~N",
+}
+
+
+class ItResult(NamedTuple):
+    """The result of the it-prakarana for some upadesha."""
+
+    #: The upadesha without its its.
+    text: str
+    #: The its and accent tags to add to the term.
+    its: Tuple[str, ...]
+    #: The rules to log before the text changes. This does not include
+    #: 1.3.9, which we log only if the text changed.
+    rules: Tuple[str, ...]
+
+
+@functools.cache
+def analyze(raw: str, vibhakti: bool, pratyaya: bool, taddhita: bool) -> ItResult:
+    """Find the its in `raw`.
+
+    The result depends only on `raw` and on whether the term is a vibhakti,
+    pratyaya, or taddhita, so we cache it.
+    """
+    text = raw
     its = set()
+    rules = []
 
     # Varttika
     irit = False
@@ -44,8 +80,7 @@ def run_no_index(p: Prakriya, u: Term):
         irit = True
 
     # include anudAttet / svaritet
-    s_ac = "".join(ac.items)
-    splits = re.split(f"([{s_ac}]~[\\\\^]?)", text)
+    splits = _AC_IT.split(text)
     if len(splits) > 1:
         text = "".join(splits[::2])
 
@@ -55,67 +90,67 @@ def run_no_index(p: Prakriya, u: Term):
             its.add(T.ANUDATTET)
         if any("^" in it for it in it_groups):
             its.add(T.SVARITET)
-        for it in splits[1::2]:
-            it = re.sub(r"[\\^~]", "", it)
-            its.add(it)
-        p.step("1.3.2")
+        for it in it_groups:
+            its.add(_MARKS.sub("", it))
+        rules.append("1.3.2")
 
     # Also handle general udatta/svarita
     if "\\" in text:
         its.add(T.ANUDATTA)
     if "^" in text:
         its.add(T.SVARITA)
-    text = re.sub(r"[\\^~]", "", text)
+    text = _MARKS.sub("", text)
 
-    vibhaktau_tusmah = u.all(T.VIBHAKTI) and raw[-1] in tusma
-    if raw[-1] in hal and not vibhaktau_tusmah and not irit:
+    vibhaktau_tusmah = vibhakti and raw[-1] in _TUSMA
+    if raw[-1] in _HAL and not vibhaktau_tusmah and not irit:
         its.add(raw[-1])
         text = text[:-1]
-        p.step("1.3.4")
+        rules.append("1.3.4")
 
     if raw[:2] in ("Yi", "wu", "qu"):
         its.add(raw[:2])
         text = text[2:]
-        p.step("1.3.5")
+        rules.append("1.3.5")
 
     # `elif` because 1.3.5 can't apply at the same time as the rules below.
-    elif u.all(T.PRATYAYA):
+    elif pratyaya:
         if raw[0] == "z":
             its.add(raw[0])
             text = text[1:]
-            p.step("1.3.6")
+            rules.append("1.3.6")
 
-        elif raw[0] in cutu:
+        elif raw[0] in _CUTU:
             # CJWQ are replaced later in the grammar.
             # If we substitute them now, those rules will become vyartha.
             if raw[0] not in "CJWQ":
                 its.add(raw[0])
                 text = text[1:]
-                p.step("1.3.7")
-
-        elif not u.any(T.TADDHITA) and raw[0] in lashaku:
-            # Keep the first "l" of the lakAras.
-            # Otherwise, rule 3.4.77 will become vyartha.
-            LAKARA = {
-                "la~w",
-                "li~w",
-                "lu~w",
-                "lf~w",
-                "le~w",
-                "lo~w",
-                "la~N",
-                "li~N",
-                "lu~N",
-                "lf~N",
-            }
-            if raw not in LAKARA:
+                rules.append("1.3.7")
+
+        elif not taddhita and raw[0] in _LASHAKU:
+            if raw not in _LAKARAS:
                 its.add(raw[0])
                 text = text[1:]
-                p.step("1.3.8")
+                rules.append("1.3.8")
+
+    return ItResult(text, tuple(sorted(its)), tuple(rules))
+
+
+def run_no_index(p: Prakriya, u: Term):
+    """Extract its."""
+
+    # it-prakarana runs only for upadeshas. If not an upadesha, skip.
+    if u.u != u.text:
+        return
+
+    raw = u.u
+    res = analyze(raw, u.all(T.VIBHAKTI), u.all(T.PRATYAYA), u.any(T.TADDHITA))
+    for rule in res.rules:
+        p.step(rule)
 
-    u.text = text
-    u.add_tags(*its)
-    if text != raw:
+    u.text = res.text
+    u.add_tags(*res.its)
+    if res.text != raw:
         p.step("1.3.9")
 
 
@@ -1,3 +1,4 @@
+import functools
 import itertools
 
 from padmini import operations as op
@@ -10,6 +11,7 @@ VIBHAKTI = [T.V1, T.V2, T.V3, T.V4, T.V5, T.V6, T.V7]
 VACANA = [T.EKAVACANA, T.DVIVACANA, T.BAHUVACANA]
 
 
+@functools.cache
 def _make_sup():
     text = [
         "su~",
@@ -44,9 +46,6 @@ def _make_sup():
     return terms
 
 
-SUP = _make_sup()
-
-
 def adesha(p: Prakriya):
     """Add a sup-pratyaya.
 
@@ -58,7 +57,7 @@ def adesha(p: Prakriya):
     else:
         raise VyakaranaException("prakriya needs all of (vibhakti, vacana)")
 
-    for ending in SUP:
+    for ending in _make_sup():
         if ending.all(vibhakti, vacana):
             break
     else:
@@ -16,6 +16,7 @@ The rules in this section have two main functions:
 All of these rules are found at the end of section 3.4 of the Ashtadhyayi.
 """
 
+import functools
 import itertools
 
 from . import it_samjna
@@ -36,6 +37,7 @@ TIN_NAL_MAPPING = dict(zip(TIN_PARA, NAL_ADI))
 TAJHAYOH = {"ta": "eS", "Ja": "irec"}
 
 
+@functools.cache
 def _make_tin():
     """Define the tin endings with their proper samjnas."""
     text = [
@@ -72,9 +74,6 @@ def _make_tin():
     return terms
 
 
-TIN = _make_tin()
-
-
 def adesha(p: Prakriya):
     """Replace the lakAra with a tiN-pratyaya.
 
@@ -86,7 +85,7 @@ def adesha(p: Prakriya):
     else:
         raise VyakaranaException("prakriya needs all of (purusha, vacana, pada)")
 
-    for ending in TIN:
+    for ending in _make_tin():
         if ending.all(purusha, vacana, pada):
             break
     else:
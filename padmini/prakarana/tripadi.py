@@ -16,7 +16,7 @@ import re
 from typing import Optional
 
 from padmini.term_views import StringView, TermView
-from padmini.sounds import s
+from padmini.sounds import s, AC, HAL, IK, JHAL
 from padmini import filters as f
 from padmini import operations as op
 from padmini import sounds
@@ -24,6 +24,68 @@ from .utils import per_term
 from padmini.prakriya import Prakriya, VyakaranaException
 from padmini.constants import Tag as T
 
+
+class AlAdesha:
+
+    """A compiled letter substitution rule.
+
+    We compile the rule's pattern and its sound mapping once, then reuse them
+    for every term and every prakriya. For the meaning of the arguments, see
+    :func:`al_adesha`.
+    """
+
+    def __init__(
+        self,
+        rule: str,
+        tasmat: Optional[str],
+        tasya: str,
+        tasmin: Optional[str],
+        sthani: str,
+    ):
+        assert tasya
+        assert sthani
+
+        def sound_pattern(expression):
+            if expression:
+                return s(expression).regex
+            else:
+                return ""
+
+        self.rule = rule
+        self.pattern = re.compile(
+            f"({sound_pattern(tasmat)})({sound_pattern(tasya)})({sound_pattern(tasmin)})"
+        )
+        self.mapping = sounds.map_sounds_s(tasya, sthani)
+        #: Whether the rule conditions on the sound after the sthana.
+        self.has_tasmin = bool(tasmin)
+
+    def apply(self, p: Prakriya, index: int):
+        c = p.terms[index]
+        text = c.text
+        if not text:
+            return
+
+        # The sthana must be in `c`, and `tasmin` is a single sound, so we
+        # need at most one sound from the following terms.
+        buf = text
+        if self.has_tasmin:
+            for t in p.terms[index + 1 :]:
+                if t.text:
+                    buf += t.text[0]
+                    break
+
+        for match in self.pattern.finditer(buf):
+            i = match.start(2)
+            if i >= len(text):
+                break
+            sthana = match.group(2)
+            sthani = self.mapping[sthana]
+            if sthana != sthani:
+                c.text = c.text[:i] + sthani + c.text[i + 1 :]
+                p.step(self.rule)
+
+
+#: Maps a rule code to its compiled :class:`AlAdesha`.
 ADESHA_CACHE = {}
 
 
@@ -38,6 +100,8 @@ def al_adesha(
 ):
     """Apply letter substitution rules at term boundaries.
 
+    The rule is compiled on first use and cached by rule code.
+
     :param rule: the rule ID
     :param p: the prakriya
     :param index: the index to apply the rule to
@@ -46,43 +110,12 @@ def al_adesha(
     :param tasmin: term after
     :param sthana: replacement
     """
-    if rule in ADESHA_CACHE:
-        func = ADESHA_CACHE[rule]
-        return func(p, index)
-
-    assert tasya
-    assert sthani
-
-    def sound_pattern(expression):
-        if expression:
-            return s(expression).regex
-        else:
-            return ""
-
-    re_tasmat = sound_pattern(tasmat)
-    re_tasya = sound_pattern(tasya)
-    re_tasmin = sound_pattern(tasmin)
-    mapping = sounds.map_sounds(s(tasya), s(sthani))
-
-    def adesha(p, index):
-        c = p.terms[index]
-        next_text = "".join(x.text for x in p.terms[index + 1 :])
-
-        pattern = f"({re_tasmat})({re_tasya})({re_tasmin})"
-
-        for match in re.finditer(pattern, c.text + next_text):
-            prefix = c.text[: match.start(2)]
-            sthana = match.group(2)
-            sthani = mapping[sthana]
-            if prefix != c.text and sthana != sthani:
-                suffix = c.text[match.start(2) + 1 :]
-                result = prefix + sthani + suffix
-                c.text = result
-                p.step(rule)
-
-    adesha(p, index)
-    ADESHA_CACHE[rule] = adesha
-    return adesha
+    try:
+        adesha = ADESHA_CACHE[rule]
+    except KeyError:
+        adesha = AlAdesha(rule, tasmat, tasya, tasmin, sthani)
+        ADESHA_CACHE[rule] = adesha
+    adesha.apply(p, index)
 
 
 def na_lopa(p: Prakriya):
@@ -108,7 +141,7 @@ def ra_to_la(p: Prakriya):
             c.text = c.text.replace("r", "l")
             p.step("8.2.20")
         # TODO: where is it specified that this is only for gF/girati?
-        elif c.u == "gF" and c.gana == 6 and n.adi in s("ac"):
+        elif c.u == "gF" and c.gana == 6 and n.adi in AC:
             res = c.text.replace("r", "l")
             op.optional(op.text, "8.2.21", p, c, res)
 
@@ -116,21 +149,13 @@ def ra_to_la(p: Prakriya):
 def samyoganta_and_salopa(p: Prakriya):
     """Final samyoga. (8.2.23 - 8.2.29)"""
 
-    # Exception to 8.2.23.
-    sk = s("s k").regex
-    hal = s("hal").regex
-    jhal = s("Jal").regex
-
-    # TODO: jhal case
-    pattern = f"({sk}+){hal}+"
-    jhal = f"{jhal}"
-
     # jhalo jhali
+    # Spans stay aligned as earlier matches are deleted.
     view = StringView(p.terms)
-    lopa_offset = 0
-    for match in re.finditer(f"{jhal}(s){jhal}", view.text):
-        start, end = match.span(1)
-        view.delete_span(start - lopa_offset, end - lopa_offset)
+    jhalo_jhali = sounds.pattern("{Jal}(s){Jal}")
+    spans = [view.span(*m.span(1)) for m in jhalo_jhali.finditer(view.text)]
+    for span in spans:
+        view.delete(span)
         p.step("8.2.26")
 
     # saMst can be handled only with difficulty. For details, see the
@@ -141,10 +166,14 @@ def samyoganta_and_salopa(p: Prakriya):
     vtext = view.text
     # We find all matches at the beginning of the loop. If multiple sa-lopas
     # apply, then each lopa will cause a frame shift that will affect later
-    # sa-lopas. As a quick hack, manage this with `offset` so that the deletion
-    # indices are always properly aligned.
-    lopa_offset = 0
-    for match in re.finditer(pattern + f"({jhal}|$)", vtext):
+    # sa-lopas. So we track each match with a span, which the view keeps
+    # aligned as we delete.
+    #
+    # skoH saMyogAdyor ante ca (8.2.29) is an exception to 8.2.23.
+    # TODO: jhal case
+    salopa = sounds.pattern("({s k}+){hal}+({Jal}|$)")
+    matches = [(m, view.span(*m.span(1))) for m in salopa.finditer(vtext)]
+    for match, span in matches:
         can_apply = True
         if "sanst" in vtext:
             # Apply the rule only if the change would not affect "sanst."
@@ -157,10 +186,8 @@ def samyoganta_and_salopa(p: Prakriya):
                 # rule would apply to "sanst" -- block.
                 can_apply = False
         if can_apply:
-            start, end = match.span(1)
-            view.delete_span(start - lopa_offset, end - lopa_offset)
+            view.delete(span)
             p.step("8.2.29")
-            lopa_offset += 1
 
     for c, n in per_term(p):
         if not n:
@@ -182,7 +209,7 @@ def samyoganta_and_salopa(p: Prakriya):
         if (
             c.antya in sounds.HRASVA
             and n.text == "s"
-            and n2.adi in s("Jal")
+            and n2.adi in JHAL
             and not c.any(T.AGAMA)
         ):
             op.lopa("8.2.27", p, n)
@@ -242,7 +269,7 @@ def per_term_1b(p: Prakriya, index: int):
         "BrAjf~\\",
     }
 
-    jhali_ante = not n or n.adi in s("Jal")
+    jhali_ante = not n or n.adi in JHAL
     if (c.u in vrascha or c.antya in s("C S")) and jhali_ante:
         if c.text.endswith("tC"):
             # TODO: seems implied, not sure.
@@ -251,8 +278,8 @@ def per_term_1b(p: Prakriya, index: int):
         else:
             op.antya("8.2.36", p, c, "z")
 
-    if c.antya in s("cu~") and (not n or n.adi in s("Jal")):
-        mapping = sounds.map_sounds(s("cu~"), s("ku~"))
+    if c.antya in s("cu~") and (not n or n.adi in JHAL):
+        mapping = sounds.map_sounds_s("cu~", "ku~")
         op.antya("8.2.30", p, c, mapping[c.antya])
 
     sdhvoh = n and (n.adi == "s" or n.all(T.PRATYAYA) and n.u.startswith("Dv"))
@@ -266,8 +293,8 @@ def per_term_1b(p: Prakriya, index: int):
     # - S for 8.2.36 (vraSca-Brasja-...-Ca-SAM zaH)
     # - s for 8.2.66 (sasajuSo ruH)
     # - h for 8.2.31 (ho QaH)
-    if c.antya in s("Jal") and c.antya not in s("c S s h") and not n:
-        mapping = sounds.map_sounds(s("Jal"), s("jaS"))
+    if c.antya in JHAL and c.antya not in s("c S s h") and not n:
+        mapping = sounds.map_sounds_s("Jal", "jaS")
         op.antya("8.2.39", p, c, mapping[c.antya])
 
     if c.all(T.DHATU) and c.u != "quDA\\Y":
@@ -310,15 +337,15 @@ def per_term_1b(p: Prakriya, index: int):
             p.step("8.2.79")
         elif c.antya in s("r v"):
             if c.upadha in {"i", "u", "f", "x"}:
-                if n and n.adi in s("hal"):
+                if n and n.adi in HAL:
                     op.upadha("8.2.77", p, c, sounds.dirgha(c.upadha))
                 elif not n:
                     op.upadha("8.2.76", p, c, sounds.dirgha(c.upadha))
         if (
             len(c.text) >= 3
-            and c.text[-3] in s("ik")
+            and c.text[-3] in IK
             and c.upadha in "rv"
-            and c.antya in s("hal")
+            and c.antya in HAL
         ):
             c.text = c.text[:-3] + sounds.dirgha(c.text[-3]) + c.text[-2:]
             p.step("8.2.78")
@@ -348,8 +375,7 @@ def natva(p: Prakriya):
 
     # TODO: AG and num
     view = StringView(p.terms)
-    between = s("aw ku~ pu~ M").regex
-    match = re.search(f"[rzfF]({between}*)n", view.text)
+    match = sounds.pattern("[rzfF]({aw ku~ pu~ M}*)n").search(view.text)
 
     if match:
         # End of pada
@@ -372,7 +398,7 @@ def stoh_scuna_stuna(p):
     scu = s("S cu~")
     swu = s("z wu~")
     stu = s("s tu~")
-    match = re.search(f"({stu.regex})({scu.regex})", view.text)
+    match = sounds.pattern("({s tu~})({S cu~})").search(view.text)
     if match:
         first, second = match.group(1), match.group(2)
         if first in s("tu~") and second == "z":
@@ -382,7 +408,7 @@ def stoh_scuna_stuna(p):
             view[match.span(0)[0]] = mapping[first]
             p.step("8.4.40")
 
-    match = re.search(f"({scu.regex})({stu.regex})", view.text)
+    match = sounds.pattern("({S cu~})({s tu~})").search(view.text)
     if match:
         first, second = match.group(1), match.group(2)
         if first == "S":
@@ -392,13 +418,13 @@ def stoh_scuna_stuna(p):
             view[match.span(0)[0] + 1] = mapping[second]
             p.step("8.4.40")
 
-    match = re.search(f"({stu.regex}){swu.regex}", view.text)
+    match = sounds.pattern("({s tu~}){z wu~}").search(view.text)
     if match:
         res = match.group(1)
         mapping = dict(zip(stu.items, swu.items))
         view[match.span(0)[0]] = mapping[res]
         p.step("8.4.41")
-    match = re.search(f"({swu.regex})({stu.regex})", view.text)
+    match = sounds.pattern("({z wu~})({s tu~})").search(view.text)
     if match:
         res = match.group(2)
         mapping = dict(zip(stu.items, swu.items))
@@ -463,8 +489,7 @@ def overall_1(p: Prakriya):
     # 8.3.24
     # TODO: next term
     # TODO: a-padAnta
-    jhal = s("Jal").regex
-    for match in re.finditer(f"([mn])({jhal})", view.text):
+    for match in sounds.pattern("([mn])({Jal})").finditer(view.text):
         view[match.span(1)[0]] = "M"
         p.step("8.3.24")
 
@@ -476,14 +501,14 @@ def dha(p: Prakriya):
     vtext = view.text
 
     # Placed after 8.4.41, otherwise this is vyartha
-    match = re.search(f"([Q])[Q]", view.text)
+    match = sounds.pattern("(Q)Q").search(view.text)
     if match:
         view[match.span(0)[0]] = ""
         p.step("8.3.13")
 
         # Placed here, otherwise this is vyartha
         # matches aN (no f, x)
-        match = re.search(f"([aAiIuU])[Q]", view.text)
+        match = sounds.pattern("([aAiIuU])Q").search(view.text)
         if match:
             # HACK to check for sah and vah
             if "saQ" in vtext or "sAQ" in vtext or "vaQ" in vtext or "vAQ" in vtext:
@@ -500,8 +525,7 @@ def savarna(p):
 
     view = StringView(p.terms)
     vtext = view.text
-    yay = s("yay").regex
-    for match in re.finditer(f"(M)({yay})", vtext):
+    for match in sounds.pattern("(M)({yay})").finditer(vtext):
         anusvara_index = match.span(1)[0]
         para = match.group(2)
 
@@ -521,12 +545,8 @@ def savarna(p):
         view[anusvara_index] = replacement
         p.step("8.4.58")
 
-    hal = s("hal").regex
-    yam = s("yam").regex
-    jhar = s("Jar").regex
-
     view = StringView(p.terms)
-    match = re.search(f"{hal}({yam})({yam})", view.text)
+    match = sounds.pattern("{hal}({yam})({yam})").search(view.text)
     if match:
         c = match.group(1)
         n = match.group(2)
@@ -537,7 +557,7 @@ def savarna(p):
                 p.decline("8.4.64")
 
     view = StringView(p.terms)
-    match = re.search(f"{hal}({jhar})({jhar})", view.text)
+    match = sounds.pattern("{hal}({Jar})({Jar})").search(view.text)
     if match:
         c = match.group(1)
         n = match.group(2)
@@ -570,8 +590,8 @@ def per_term_2(p: Prakriya, index: int):
 
     al_adesha("8.4.55", p, index, None, "Jal", "Kar", "car")
 
-    if c.antya in s("Jal") and not n:
-        mapping = sounds.map_sounds(s("Jal"), s("car"))
+    if c.antya in JHAL and not n:
+        mapping = sounds.map_sounds_s("Jal", "car")
         op.optional(op.antya, "8.4.56", p, c, mapping[c.antya])
 
 
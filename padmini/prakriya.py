@@ -1,13 +1,127 @@
-from dataclasses import dataclass
-from typing import Dict, Set, List, Tuple, Optional
+from collections.abc import MutableSet
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple, Optional
+from typing import TYPE_CHECKING
 
 from padmini.constants import Tag
 
+if TYPE_CHECKING:
+    from padmini.timing import Timer
+
 
 class VyakaranaException(Exception):
     pass
 
 
+#: Maps each tag to its bit in a tag mask. Tags are registered on first use.
+_TAG_BITS: Dict[str, int] = {}
+#: The tag for each bit, in the order the bits were assigned.
+_BIT_TAGS: List[str] = []
+
+
+class _MaskCache(dict):
+
+    """Caches the mask for a tuple of tags.
+
+    Rules test the same few tuples of tags over and over, so looking up a
+    mask is usually a single dict lookup.
+    """
+
+    def __missing__(self, tags: Tuple[str, ...]) -> int:
+        mask = 0
+        for tag in tags:
+            mask |= tag_bit(tag)
+        self[tags] = mask
+        return mask
+
+
+_MASKS = _MaskCache()
+
+
+def tag_bit(tag: str) -> int:
+    """Return the bit for `tag`, registering the tag if necessary."""
+    try:
+        return _TAG_BITS[tag]
+    except KeyError:
+        bit = 1 << len(_BIT_TAGS)
+        _TAG_BITS[tag] = bit
+        _BIT_TAGS.append(tag)
+        return bit
+
+
+def tag_mask(tags: Tuple[str, ...]) -> int:
+    """Return the mask for a tuple of tags."""
+    return _MASKS[tags]
+
+
+def tags_in_mask(mask: int) -> List[str]:
+    """Return the tags whose bits are set in `mask`."""
+    ret = []
+    i = 0
+    while mask:
+        if mask & 1:
+            ret.append(_BIT_TAGS[i])
+        mask >>= 1
+        i += 1
+    return ret
+
+
+class TagSet(MutableSet):
+
+    """A mutable set of tags stored as a bitmask.
+
+    Tags are interned strings (saṃjñās from :class:`Tag`, it letters, and so
+    on), and each tag is assigned its own bit in an :class:`int`. So testing
+    several tags at once is a single mask operation, and a copy or snapshot
+    of a :class:`TagSet` is just an :class:`int`.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, items: Iterable[str] = ()):
+        #: The bits of the current tags.
+        self.mask: int = tag_mask(tuple(items))
+
+    @staticmethod
+    def from_mask(mask: int) -> "TagSet":
+        ret = TagSet()
+        ret.mask = mask
+        return ret
+
+    def __contains__(self, tag) -> bool:
+        bit = _TAG_BITS.get(tag)
+        return bit is not None and self.mask & bit != 0
+
+    def __iter__(self):
+        return iter(tags_in_mask(self.mask))
+
+    def __len__(self) -> int:
+        return bin(self.mask).count("1")
+
+    def __repr__(self):
+        return "TagSet({})".format(set(self))
+
+    def add(self, tag: str):
+        self.mask |= tag_bit(tag)
+
+    def discard(self, tag: str):
+        self.mask &= ~_TAG_BITS.get(tag, 0)
+
+    def update(self, tags: Iterable[str]):
+        self.mask |= tag_mask(tuple(tags))
+
+    def update_mask(self, mask: int):
+        """Add every tag in `mask`, as from :attr:`mask` of another set."""
+        self.mask |= mask
+
+    def difference_update(self, tags: Iterable[str]):
+        self.mask &= ~tag_mask(tuple(tags))
+
+    def copy(self) -> "TagSet":
+        return TagSet.from_mask(self.mask)
+
+
 @dataclass
 class Term:
 
@@ -31,11 +145,15 @@ class Term:
     #: The "human-readable" form of the term, including any sound changes.
     text: str
     #: Any tags that apply to the term.
-    tags: Set[str]
+    tags: TagSet
     #: If the :class:`Term` refers to a dhatu, the root's class.
     gana: Optional[int]
     number: Optional[int]
 
+    def __post_init__(self):
+        if not isinstance(self.tags, TagSet):
+            self.tags = TagSet(self.tags)
+
     @staticmethod
     def make_upadesha(upadesha):
         """Make an upadesha."""
@@ -93,23 +211,109 @@ class Term:
         except IndexError:
             return None
 
+    def copy(self) -> "Term":
+        """Return a copy of this term that can be modified independently."""
+        return Term(self.u, self.text, self.tags.copy(), self.gana, self.number)
+
+    def state(self) -> "TermState":
+        """Return the current state of this term."""
+        return (self.u, self.text, self.tags.mask, self.gana, self.number)
+
+    def set_state(self, state: "TermState"):
+        """Restore a state returned by :meth:`state`."""
+        self.u, self.text, self.tags.mask, self.gana, self.number = state
+
     def all(self, *tags) -> bool:
-        for t in tags:
-            if t not in self.tags:
-                return False
-        return True
+        mask = _MASKS[tags]
+        return self.tags.mask & mask == mask
 
     def any(self, *tags) -> bool:
-        for t in tags:
-            if t in self.tags:
-                return True
-        return False
+        return self.tags.mask & _MASKS[tags] != 0
 
     def add_tags(self, *tags):
-        self.tags |= set(tags)
+        self.tags.update(tags)
 
     def remove_tags(self, *tags):
-        self.tags -= set(tags)
+        self.tags.difference_update(tags)
+
+
+#: The state of a :class:`Term` as returned by :meth:`Term.state`.
+TermState = Tuple[str, str, int, Optional[int], Optional[int]]
+
+
+class HistoryLevel(Enum):
+
+    """Defines how much of the derivation :meth:`Prakriya.step` records."""
+
+    #: Record nothing. Use this for bulk generation.
+    NONE = "none"
+    #: Record only the rule that was applied.
+    RULES = "rules"
+    #: Record the rule and the text of each term.
+    TEXT = "text"
+    #: Record the rule and a copy of each term, including its tags.
+    TERMS = "terms"
+
+
+class TermDelta(NamedTuple):
+
+    """A change to one term between two steps of the derivation."""
+
+    #: The index of the term in `Prakriya.terms`.
+    index: int
+    #: The term's text before the step.
+    old: str
+    #: The term's text after the step.
+    new: str
+    #: A mask of the tags the term gained in the step.
+    tags_added: int
+
+
+class Step(NamedTuple):
+
+    """A single entry in the derivation history.
+
+    With :attr:`HistoryLevel.TEXT`, we store only what changed since the
+    previous step: usually a few :class:`TermDelta` objects, or the text of
+    every term if the number of terms changed. We render the full text only
+    when someone reads :attr:`Prakriya.history`.
+    """
+
+    #: The rule that was applied.
+    rule: Any
+    #: The terms that changed in this step.
+    deltas: Tuple[TermDelta, ...] = ()
+    #: The text of every term, if the number of terms changed in this step.
+    texts: Optional[Tuple[str, ...]] = None
+    #: A copy of every term. Used only with :attr:`HistoryLevel.TERMS`.
+    terms: Optional[Tuple[Term, ...]] = None
+
+
+#: The text and tag mask of each term at the last step.
+StepBase = Tuple[List[str], List[int]]
+
+
+class Snapshot(NamedTuple):
+
+    """The state of a :class:`Prakriya` at some point in the derivation.
+
+    A snapshot shares all of its data with the prakriya it came from, so
+    creating one costs time proportional to the number of terms and nothing
+    more. For usage, see :meth:`Prakriya.snapshot`.
+    """
+
+    #: Each term in the prakriya with its state.
+    terms: Tuple[Tuple[Term, TermState], ...]
+    #: The prakriya's tags, as a tag mask.
+    tags: int
+    #: The length of `Prakriya.steps`.
+    steps_len: int
+    #: The state that the next step is compared against.
+    step_base: StepBase
+    #: The length of `Prakriya.options_seen`.
+    options_seen_len: int
+    #: A copy of `Prakriya.options_override`.
+    options_override: Dict[str, bool]
 
 
 @dataclass
@@ -130,49 +334,154 @@ class Prakriya:
     forms for some given input.
 
     :param terms: the derivation state. The program modifies this list and its
-        members during execution. If you want to preserve the initial state,
-        provide a deep copy instead.
+        members during execution. If you want to preserve some state, use
+        :meth:`snapshot` and :meth:`restore` or :meth:`fork`.
     :param tags: any meta information that applies to the prakriya overall.
         This mainly contains semantic information (purusha, vacana) or sets the
         derivation context (chandasi). It is also used to manage "global" state
         that we cannot easily define on :class:`Tag` objects.
-    :param history: the derivation history. This is a list of 2-tuples, where
-        the first member is the current result and the second member is the
-        rule we applied to get that result. If you want to log different
-        information in the history, you can override the `step` method of this
-        class.
+    :param steps: the derivation history, stored compactly. For a readable
+        version, use :attr:`history`.
+    :param history_level: how much of the derivation to record. With
+        :attr:`HistoryLevel.TEXT`, each history entry contains the text of
+        each term, joined with spaces. With :attr:`HistoryLevel.TERMS`, it
+        contains a tuple of copies of each term. With
+        :attr:`HistoryLevel.RULES`, it contains ``None``. With
+        :attr:`HistoryLevel.NONE`, we record nothing.
     :param options_override: maps a rule code to whether the rule can be used
         or not. This mapping has meaning only for *optional* rules and is
         ignored for mandatory rules.
     :param options_seen: optional rules seen during the derivation. This is a
         list of 2-tuples, where the first member is the rule and the second is
         whether the rule was accepted or not.
+    :param options_pending: optional rules seen during the derivation that
+        have no entry in `options_override`. Callers that explore all options
+        (see :func:`~padmini.ashtadhyayi.all_tinantas`) use this list to
+        decide where the derivation should fork.
+    :param timer: if set, a :class:`~padmini.timing.Timer` that records each
+        rule applied. Forks share the same timer.
     """
 
     terms: List[Term]
-    tags: Set[str]
-    history: List[Tuple[str, str]]
+    tags: TagSet
+    steps: List[Step]
+    history_level: HistoryLevel
     options_override: Dict[str, bool]
     options_seen: List[Tuple[str, bool]]
+    options_pending: List[str]
+    step_base: StepBase = field(default=(), repr=False)
+    timer: Optional["Timer"] = field(default=None, repr=False)
 
     @classmethod
-    def make(cls, terms: Optional[List[Term]] = None):
+    def make(
+        cls,
+        terms: Optional[List[Term]] = None,
+        history_level: HistoryLevel = HistoryLevel.TEXT,
+    ):
         """Convenience function to define a :class:`Prakriya`.
 
         :param terms: an optional list of :class:`Term`s.
+        :param history_level: how much of the derivation to record.
         """
         return Prakriya(
             terms=terms or [],
-            tags=set(),
-            history=[],
+            tags=TagSet(),
+            steps=[],
+            history_level=history_level,
             options_override={},
             options_seen=[],
+            options_pending=[],
+        )
+
+    def snapshot(self) -> Snapshot:
+        """Record the current derivation state.
+
+        Snapshots are cheap because they share their data with the prakriya.
+        To return to a snapshot, use :meth:`restore`; to continue from it in a
+        separate prakriya, use :meth:`fork`.
+        """
+        return Snapshot(
+            terms=tuple((t, t.state()) for t in self.terms),
+            tags=self.tags.mask,
+            steps_len=len(self.steps),
+            step_base=self.step_base,
+            options_seen_len=len(self.options_seen),
+            options_override=dict(self.options_override),
+        )
+
+    def restore(self, snapshot: Snapshot):
+        """Return to the state recorded in `snapshot`.
+
+        The snapshot must have been created by this prakriya.
+        """
+        terms = []
+        for t, state in snapshot.terms:
+            if t.state() != state:
+                t.set_state(state)
+            terms.append(t)
+        self.terms = terms
+        self.tags.mask = snapshot.tags
+        del self.steps[snapshot.steps_len :]
+        self.step_base = snapshot.step_base
+        del self.options_seen[snapshot.options_seen_len :]
+        self.options_override = dict(snapshot.options_override)
+        self.options_pending = []
+
+    def fork(self, snapshot: Optional[Snapshot] = None) -> "Prakriya":
+        """Return a copy of the derivation state that can continue
+        independently of this one.
+
+        :param snapshot: if set, copy the state in `snapshot` instead of the
+            current state. The snapshot must have been created by this
+            prakriya.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+
+        terms = []
+        for _, (u, text, mask, gana, number) in snapshot.terms:
+            terms.append(Term(u, text, TagSet.from_mask(mask), gana, number))
+        return Prakriya(
+            terms=terms,
+            tags=TagSet.from_mask(snapshot.tags),
+            steps=self.steps[: snapshot.steps_len],
+            history_level=self.history_level,
+            options_override=dict(snapshot.options_override),
+            options_seen=self.options_seen[: snapshot.options_seen_len],
+            options_pending=[],
+            step_base=snapshot.step_base,
+            timer=self.timer,
         )
 
     @property
     def text(self):
         return "".join(t.text for t in self.terms)
 
+    @property
+    def history(self) -> List[Tuple[Any, str]]:
+        """The derivation history. This is a list of 2-tuples, where the first
+        member is the current result and the second member is the rule we
+        applied to get that result. What we store as the result depends on
+        `history_level`.
+
+        We render this list from :attr:`steps` each time it is requested.
+        """
+        level = self.history_level
+        if level is HistoryLevel.RULES:
+            return [(None, step.rule) for step in self.steps]
+        if level is HistoryLevel.TERMS:
+            return [(step.terms, step.rule) for step in self.steps]
+
+        ret = []
+        texts = []
+        for step in self.steps:
+            if step.texts is not None:
+                texts = list(step.texts)
+            for delta in step.deltas:
+                texts[delta.index] = delta.new
+            ret.append((" ".join(t or "_" for t in texts), step.rule))
+        return ret
+
     def find(self, func):
         """Return all terms that match the test function.
 
@@ -198,7 +507,9 @@ class Prakriya:
 
     def allow(self, code: str) -> bool:
         res = self.options_override.get(code)
-        if res:
+        if res is None:
+            self.options_pending.append(code)
+        elif res:
             self.options_seen.append((code, True))
         return res
 
@@ -209,21 +520,52 @@ class Prakriya:
         self.options_override = options
 
     def all(self, *tags: List[str]):
-        return all(t in self.tags for t in tags)
+        mask = _MASKS[tags]
+        return self.tags.mask & mask == mask
 
     def any(self, *tags: List[str]):
-        return any(t in self.tags for t in tags)
+        return self.tags.mask & _MASKS[tags] != 0
 
     def add_tags(self, *tags):
-        self.tags |= set(tags)
+        self.tags.update(tags)
 
     def step(self, rule):
         """Log the current derivation state.
 
         :param rule: the rule that was just applied.
         """
-        text = " ".join(u.text or "_" for u in self.terms)
-        self.history.append((text, rule))
+        if self.timer is not None:
+            self.timer.mark(rule)
+        level = self.history_level
+        if level is HistoryLevel.TEXT:
+            self.steps.append(self._make_delta_step(rule))
+        elif level is HistoryLevel.NONE:
+            pass
+        elif level is HistoryLevel.RULES:
+            self.steps.append(Step(rule))
+        else:
+            self.steps.append(Step(rule, terms=tuple(u.copy() for u in self.terms)))
+
+    def _make_delta_step(self, rule) -> Step:
+        """Describe how the terms changed since the last step."""
+        terms = self.terms
+        texts = [t.text for t in terms]
+        masks = [t.tags.mask for t in terms]
+        old_texts, old_masks = self.step_base or ((), ())
+        self.step_base = (texts, masks)
+
+        # Deltas are by index, so we need the full text only if the number of
+        # terms changed.
+        if len(old_texts) != len(texts):
+            return Step(rule, texts=tuple(texts))
+        if old_texts == texts and old_masks == masks:
+            return Step(rule)
+        deltas = tuple(
+            TermDelta(i, old_texts[i], texts[i], masks[i] & ~old_masks[i])
+            for i in range(len(texts))
+            if old_texts[i] != texts[i] or old_masks[i] != masks[i]
+        )
+        return Step(rule, deltas)
 
     def debug(self, *a):
         self.step(a)
@@ -231,6 +573,12 @@ class Prakriya:
     def debug_print(self):
         for t in self.terms:
             print("  ", t)
-        for text, rule in self.history:
-            print(f"    {text} ({rule})")
+        for result, rule in self.history:
+            if result is None:
+                print(f"    ({rule})")
+            elif isinstance(result, tuple):
+                text = " ".join(u.text or "_" for u in result)
+                print(f"    {text} ({rule})")
+            else:
+                print(f"    {result} ({rule})")
         print()
@@ -0,0 +1,379 @@
+"""Sandhi between complete words.
+
+The prakaranas in :mod:`padmini.prakarana` apply sandhi within a single
+prakriya. This module joins finished words into phrases and sentences
+without running any derivations::
+
+    >>> join(["rAmaH", "gacCati"]).text
+    'rAmo gacCati'
+    >>> join(["deva", "indraH", "atra"]).text
+    "devendro 'tra"
+
+The result at a junction depends only on the last two sounds of the first
+word and the first two sounds of the second, so we store each result in a
+table keyed by those sounds and reuse it for every later pair with the same
+key. :func:`join_pairs` applies this table to large batches of word pairs,
+and ``python -m padmini.sandhi`` does the same for text on stdin.
+
+We apply these rules, and where a rule is optional, we use its most common
+option:
+
+- vowel sandhi: 6.1.77, 6.1.78 with 8.3.19, 6.1.87, 6.1.88, 6.1.101, and
+  6.1.109. We do not yet model pragṛhya vowels (1.1.11).
+- visarga sandhi: 6.1.113, 6.1.114, 6.1.132, 8.2.66, 8.3.14 with 6.3.111,
+  8.3.15, 8.3.17 with 8.3.19 and 8.3.22, and 8.3.34.
+- consonant sandhi: 6.1.73, 8.2.39, 8.3.7, 8.3.23, 8.3.32, 8.4.40, 8.4.41,
+  8.4.45, 8.4.55, 8.4.60, 8.4.62, and 8.4.63.
+
+A visarga on its own does not say whether it comes from s or from r. We
+assume s unless the word is in a short list of common words that end in r,
+such as ``punaH`` and ``antaH``. To join any other word that ends in r, pass
+it with its r, e.g. ``pitar`` for the vocative ``pitaH``::
+
+    >>> join(["punaH", "api"]).text
+    'punar api'
+
+A word that does not start with an SLP1 sound, such as ``|`` or ``1``, is a
+pause (avasāna), so we apply no sandhi before it.
+"""
+
+import argparse
+import functools
+import sys
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from padmini import sounds
+from padmini.sounds import s
+
+
+class Junction(NamedTuple):
+    """Two words after the sandhi between them."""
+
+    #: The first word after sandhi.
+    first: str
+    #: The second word after sandhi.
+    second: str
+    #: The rules applied, in order.
+    rules: Tuple[str, ...]
+    #: Whether the two words are written without a space between them.
+    joined: bool
+
+
+class SandhiResult(NamedTuple):
+    """A sequence of words joined with sandhi."""
+
+    #: The joined text.
+    text: str
+    #: The rules applied, in order.
+    rules: Tuple[str, ...]
+
+
+class _Edit(NamedTuple):
+    """How sandhi changes the sounds around a junction."""
+
+    #: The replacement for the last sounds of the first word.
+    left: str
+    #: The replacement for the first sounds of the second word.
+    right: str
+    rules: Tuple[str, ...]
+    joined: bool
+
+
+# Sound classes, as strings for fast `in` checks.
+_AC = "".join(s("ac").items)
+_HAL = "".join(s("hal").items)
+_KHAR = "".join(s("Kar").items)
+_AM = "".join(s("am").items)
+_AW = "".join(s("aw").items)
+_JHAY = "".join(s("Jay").items)
+_HRASVA = "aiufx"
+_SOUNDS = _AC + _HAL
+
+#: Each varga, in the order car, (unvoiced aspirate), jaS, (voiced aspirate),
+#: and nasal.
+_VARGAS = ["kKgGN", "cCjJY", "wWqQR", "tTdDn", "pPbBm"]
+_VARGA = {sound: v for v in _VARGAS for sound in v}
+
+#: Words that lose their visarga before a consonant by 6.1.132.
+_ETAT_TAT = {"saH", "ezaH"}
+
+#: Common words whose final visarga comes from r, not s.
+_R_FINAL = {"punaH", "antaH", "prAtaH", "svaH", "BUH", "dvAH", "gIH"}
+
+# 6.1.87 and 6.1.88, including x, which `sounds.guna` does not handle.
+_GUNA = dict(zip("iIuUfFxX", ["e", "e", "o", "o", "ar", "ar", "al", "al"]))
+_YAN = dict(zip("iIuUfFxX", "yyvvrrll"))
+# 6.1.78 followed by 8.3.19 for y and v after a short "a".
+_AYADI = {"e": "a", "o": "a", "E": "A", "O": "Av"}
+
+
+@functools.cache
+def _vowel_table() -> Dict[str, _Edit]:
+    """Map each pair of vowels to the sandhi between them."""
+    table = {}
+    for x in _AC:
+        for y in _AC:
+            if x in "aAiIuUfFxX" and y in sounds.savarna(x):
+                # akaH savarNe dIrghaH
+                e = _Edit(sounds.dirgha(x), "", ("6.1.101",), True)
+            elif x in _YAN:
+                # iko yaR aci
+                e = _Edit(_YAN[x], y, ("6.1.77",), True)
+            elif x in "aA" and y in "eoEO":
+                # vRddhir eci
+                e = _Edit(sounds.vrddhi(y), "", ("6.1.88",), True)
+            elif x in "aA":
+                # Ad guNaH
+                e = _Edit(_GUNA[y], "", ("6.1.87",), True)
+            elif x in "eo" and y == "a":
+                # eNaH padAntAd ati
+                e = _Edit(x, "'", ("6.1.109",), False)
+            elif x in "eoE":
+                # eco 'yavAyAvaH, lopaH SAkalyasya
+                e = _Edit(_AYADI[x], y, ("6.1.78", "8.3.19"), False)
+            else:
+                # eco 'yavAyAvaH
+                e = _Edit(_AYADI[x], y, ("6.1.78",), False)
+            table[x + y] = e
+    return table
+
+
+def _visarga(prev: str, y: str, after: str) -> _Edit:
+    """Sandhi for a final visarga after `prev` before `y`."""
+    head = y + after
+    if y in _KHAR:
+        if y in "cC":
+            return _Edit(prev + "S", head, ("8.3.34", "8.4.40"), False)
+        if y in "wW":
+            return _Edit(prev + "z", head, ("8.3.34", "8.4.41"), False)
+        if y in "tT":
+            return _Edit(prev + "s", head, ("8.3.34",), False)
+        # Before k, p, and sibilants, the visarga stays (8.3.36, 8.3.37).
+        return _Edit(prev + "H", head, (), False)
+
+    if prev == "a":
+        if y == "a":
+            # ato ror aplutAd aplute, Ad guNaH, eNaH padAntAd ati
+            rules = ("6.1.113", "6.1.87", "6.1.109")
+            return _Edit("o", "'" + after, rules, False)
+        if y in _AC:
+            # bhobhagoaghoapUrvasya yo 'Si, lopaH SAkalyasya
+            return _Edit("a", head, ("8.3.17", "8.3.19"), False)
+        # haSi ca, Ad guNaH
+        return _Edit("o", head, ("6.1.114", "6.1.87"), False)
+    if prev == "A":
+        if y in _AC:
+            return _Edit("A", head, ("8.3.17", "8.3.19"), False)
+        # hali sarvezAm
+        return _Edit("A", head, ("8.3.17", "8.3.22"), False)
+
+    if y == "r":
+        # ro ri, Qralope pUrvasya dIrgho 'RaH
+        return _Edit(sounds.dirgha(prev), head, ("8.3.14", "6.3.111"), False)
+    # The visarga is the ru from sasajuSo ruH, which is now r.
+    return _Edit(prev + "r", head, ("8.2.66",), False)
+
+
+def _final_r(prev: str, y: str, after: str) -> _Edit:
+    """Sandhi for a final r after `prev` before `y`."""
+    head = y + after
+    if y in _KHAR:
+        # kharavasAnayor visarjanIyaH
+        e = _visarga(prev, y, after)
+        return _Edit(e.left, e.right, ("8.3.15",) + e.rules, e.joined)
+    if y == "r":
+        # ro ri, Qralope pUrvasya dIrgho 'RaH
+        return _Edit(sounds.dirgha(prev), head, ("8.3.14", "6.3.111"), False)
+    return _Edit(prev + "r", head, (), False)
+
+
+def _stop(x: str, y: str, after: str) -> _Edit:
+    """Sandhi for a final stop `x` before `y`."""
+    varga = _VARGA[x]
+    rules = []
+    if y in _KHAR:
+        final = varga[0]
+        if final != x:
+            # khari ca
+            rules.append("8.4.55")
+    elif y in "YmNRn":
+        # yaro 'nunAsike 'nunAsiko vA
+        final = varga[4]
+        rules.append("8.4.45")
+    else:
+        final = varga[2]
+        if final != x:
+            # JalAM jaSo 'nte
+            rules.append("8.2.39")
+
+    if varga == "tTdDn":
+        if y in "cCjJS":
+            # stoH ScunA ScuH
+            final = _VARGA["c"][varga.index(final)]
+            rules.append("8.4.40")
+        elif y in "wWqQ":
+            # zwunA zwuH
+            final = _VARGA["w"][varga.index(final)]
+            rules.append("8.4.41")
+        elif y == "l":
+            # tor li
+            final = "l"
+            rules.append("8.4.60")
+
+    if y == "S" and after[:1] and after[0] in _AW:
+        # SaS Co 'wi
+        y = "C"
+        rules.append("8.4.63")
+    elif y == "h":
+        # Jayo ho 'nyatarasyAm
+        y = varga[3]
+        rules.append("8.4.62")
+    return _Edit(final, y + after, tuple(rules), False)
+
+
+def _nasal(prev: str, x: str, y: str, after: str) -> _Edit:
+    """Sandhi for a final n, N, R, or m after `prev` before `y`."""
+    head = y + after
+    if y in _AC:
+        if x in "NRn" and prev in _HRASVA:
+            # Namo hrasvAd aci NamuR nityam
+            return _Edit(prev + x + x, head, ("8.3.32",), False)
+        return _Edit(prev + x, head, (), False)
+    if x == "m":
+        # mo 'nusvAraH
+        return _Edit(prev + "M", head, ("8.3.23",), False)
+    if x != "n":
+        return _Edit(prev + x, head, (), False)
+
+    if y in "cCwWtT" and after[:1] and after[0] in _AM:
+        # naS Cavy apraSAn, then the ru becomes a sibilant.
+        rules = ("8.3.7", "8.3.4", "8.3.34")
+        if y in "cC":
+            return _Edit(prev + "MS", head, rules + ("8.4.40",), False)
+        if y in "wW":
+            return _Edit(prev + "Mz", head, rules + ("8.4.41",), False)
+        return _Edit(prev + "Ms", head, rules, False)
+    if y in "cCjJS":
+        return _Edit(prev + "Y", head, ("8.4.40",), False)
+    if y in "wWqQ":
+        return _Edit(prev + "R", head, ("8.4.41",), False)
+    if y == "l":
+        return _Edit(prev + "l~", head, ("8.4.60",), False)
+    return _Edit(prev + x, head, (), False)
+
+
+@functools.cache
+def _edit(tail: str, head: str) -> _Edit:
+    """Return the sandhi between a word ending in `tail` and a word starting
+    with `head`.
+
+    :param tail: the last two sounds (or fewer) of the first word.
+    :param head: the first two sounds (or fewer) of the second word.
+    """
+    prev, x = tail[:-1], tail[-1]
+    y, after = head[0], head[1:]
+
+    if x in _AC:
+        if y in _AC:
+            e = _vowel_table()[x + y]
+            return _Edit(prev + e.left, e.right + after, e.rules, e.joined)
+        if y == "C" and x in _HRASVA:
+            # che ca, then stoH ScunA ScuH for the new t.
+            return _Edit(tail, "c" + head, ("6.1.73", "8.4.40"), False)
+        return _Edit(tail, head, (), False)
+    if x == "H":
+        return _visarga(prev, y, after)
+    if x == "r":
+        return _final_r(prev, y, after)
+    if x in "NRnm":
+        return _nasal(prev, x, y, after)
+    if x in _JHAY:
+        e = _stop(x, y, after)
+        return _Edit(prev + e.left, e.right, e.rules, e.joined)
+    return _Edit(tail, head, (), False)
+
+
+def junction(first: str, second: str) -> Junction:
+    """Apply sandhi between two words.
+
+    :param first: a complete word in SLP1, e.g. ``"rAmaH"``.
+    :param second: the word that follows it. If it does not start with an
+        SLP1 sound, we treat it as a pause and apply no sandhi.
+    """
+    if not first or not second or second[0] not in _SOUNDS:
+        return Junction(first, second, (), False)
+    if first in _ETAT_TAT and second[0] in _HAL:
+        # etattadoH sulopo 'kor anaYsamAse hali
+        return Junction(first[:-1], second, ("6.1.132",), False)
+
+    if first in _R_FINAL:
+        first = first[:-1] + "r"
+    tail = first[-2:]
+    head = second[:2]
+    e = _edit(tail, head)
+    return Junction(
+        first[: -len(tail)] + e.left, e.right + second[len(head) :], e.rules, e.joined
+    )
+
+
+def join(words: Iterable[str]) -> SandhiResult:
+    """Join `words` with sandhi in a single pass.
+
+    Empty words are skipped.
+    """
+    parts: List[str] = []
+    rules: List[str] = []
+    current = ""
+    for word in words:
+        if not word:
+            continue
+        if not current:
+            current = word
+            continue
+        j = junction(current, word)
+        rules.extend(j.rules)
+        if j.joined:
+            current = j.first + j.second
+        else:
+            parts.append(j.first)
+            current = j.second
+    if current:
+        parts.append(current)
+    return SandhiResult(" ".join(parts), tuple(rules))
+
+
+def join_pairs(pairs: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    """Join each pair of words in `pairs` and yield the joined text.
+
+    This is the fast path for large batches. It does not record rules.
+    """
+    for first, second in pairs:
+        j = junction(first, second)
+        if j.joined:
+            yield j.first + j.second
+        elif j.first and j.second:
+            yield f"{j.first} {j.second}"
+        else:
+            yield j.first or j.second
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Join the words on each line of stdin with sandhi."
+    )
+    parser.add_argument(
+        "--rules", action="store_true", help="append the rules applied to each line"
+    )
+    args = parser.parse_args()
+
+    out = sys.stdout
+    for line in sys.stdin:
+        result = join(line.split())
+        if args.rules:
+            out.write(f"{result.text}\t{','.join(result.rules)}\n")
+        else:
+            out.write(result.text + "\n")
+
+
+if __name__ == "__main__":
+    main()
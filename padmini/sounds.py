@@ -1,7 +1,8 @@
 import functools
+import re
 
 from enum import Enum
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 
 #: The Ashtadhyayi uses a special ordering of sounds that is optimized for the
@@ -248,6 +249,62 @@ def s(terms: str) -> OrderedSet[str]:
     return OrderedSet(ret)
 
 
+#: Precompiled sound classes for the pratyāhāras that rules test most often.
+#: Rules in hot paths should use these constants instead of calling :func:`s`
+#: on every test.
+AC = s("ac")
+HAL = s("hal")
+IK = s("ik")
+JHAL = s("Jal")
+VAL = s("val")
+
+
+#: Matches a ``{...}`` group in a pattern template.
+_TEMPLATE_GROUP = re.compile(r"\{([^{}]+)\}")
+
+
+@functools.cache
+def pattern(template: str) -> "re.Pattern[str]":
+    """Compile a regex in which each ``{...}`` group names a sound class.
+
+    Each group is replaced with the character class for :func:`s` of its
+    contents. Groups that hold only digits and commas are regex quantifiers
+    and are kept as-is. Patterns are compiled on first use and cached, so
+    rules can call this function on every test.
+
+    Example usage::
+
+        # A final vowel and the consonants after it.
+        pattern("({ac})({hal}*)$")
+        # s between two jhal sounds.
+        pattern("{Jal}(s){Jal}")
+
+    :param template: a regex with sound classes in ``{...}`` groups.
+    """
+
+    def _replace(match):
+        terms = match.group(1)
+        if all(c in "0123456789," for c in terms):
+            return match.group(0)
+        return s(terms).regex
+
+    return re.compile(_TEMPLATE_GROUP.sub(_replace, template))
+
+
+def last_vowel_index(text: str) -> Optional[int]:
+    """Return the index of the last vowel in `text` if only consonants follow
+    it, and ``None`` otherwise.
+
+    This matches ``pattern("({ac}){hal}*$")`` without using a regex.
+    """
+    i = len(text) - 1
+    while i >= 0 and text[i] in HAL:
+        i -= 1
+    if i >= 0 and text[i] in AC:
+        return i
+    return None
+
+
 def guna(s: str) -> str:
     # 1.1.2 adeGguNaH
     # 1.1.3 iko guNavRddhI
@@ -323,7 +380,7 @@ VRDDHI = set("AEO")
 MAHAPRANA = set("KGCJWQTDPBh")
 
 
-def invert(d):
+def _invert(d):
     ret = {}
     for k, vs in d.items():
         for v in vs:
@@ -333,29 +390,77 @@ def invert(d):
     return ret
 
 
-STHANA = invert(
-    {
-        Sthana.KANTHA: s("a ku~ h H"),
-        Sthana.TALU: s("i cu~ y S"),
-        Sthana.MURDHA: s("f wu~ r z"),
-        Sthana.DANTA: s("x tu~ l s"),
-        Sthana.OSTHA: s("u pu~"),
-        Sthana.NASIKA: s("Yam M"),
-        Sthana.KANTHA_TALU: s("e E"),
-        Sthana.KANTHA_OSTHA: s("o O"),
-        Sthana.DANTOSTHA: s("v"),
-    }
-)
-GHOSHA = invert({Ghosha.GHOSHAVAT: s("ac") | s("haS"), Ghosha.AGHOSHA: s("Kar")})
-PRANA = invert({Prana.MAHAPRANA: "KGCJWQTDPBh", Prana.ALPAPRANA: s("ac yam jaS car")})
-PRAYATNA = invert(
-    {
-        Prayatna.ISHAT: s("yaR Sar"),
-        Prayatna.VIVRTA: s("ac h"),
-        Prayatna.SPRSHTA: s("Yay"),
+#: Tables that we build on first use. See :func:`__getattr__`.
+_LAZY_TABLES = ("STHANA", "GHOSHA", "PRANA", "PRAYATNA", "FEATURES")
+
+
+@functools.cache
+def _feature_tables() -> Dict[str, Dict[str, set]]:
+    """Return the sthāna, ghoṣa, prāṇa, and prayatna of each sound."""
+    return {
+        "STHANA": _invert(
+            {
+                Sthana.KANTHA: s("a ku~ h H"),
+                Sthana.TALU: s("i cu~ y S"),
+                Sthana.MURDHA: s("f wu~ r z"),
+                Sthana.DANTA: s("x tu~ l s"),
+                Sthana.OSTHA: s("u pu~"),
+                Sthana.NASIKA: s("Yam M"),
+                Sthana.KANTHA_TALU: s("e E"),
+                Sthana.KANTHA_OSTHA: s("o O"),
+                Sthana.DANTOSTHA: s("v"),
+            }
+        ),
+        "GHOSHA": _invert(
+            {Ghosha.GHOSHAVAT: s("ac") | s("haS"), Ghosha.AGHOSHA: s("Kar")}
+        ),
+        "PRANA": _invert(
+            {Prana.MAHAPRANA: "KGCJWQTDPBh", Prana.ALPAPRANA: s("ac yam jaS car")}
+        ),
+        "PRAYATNA": _invert(
+            {
+                Prayatna.ISHAT: s("yaR Sar"),
+                Prayatna.VIVRTA: s("ac h"),
+                Prayatna.SPRSHTA: s("Yay"),
+            }
+        ),
     }
-)
-del invert
+
+
+def __getattr__(name):
+    # Most callers never need the feature tables, so build them only when
+    # they are first accessed as module attributes (PEP 562).
+    if name == "FEATURES":
+        return _feature_masks()
+    if name in _LAZY_TABLES:
+        return _feature_tables()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.cache
+def _feature_masks() -> Dict[str, int]:
+    """Return the sthāna, ghoṣa, prāṇa, and prayatna of each sound as a mask.
+
+    Each member of :class:`Sthana`, :class:`Ghosha`, :class:`Prana`, and
+    :class:`Prayatna` has its own bit, so the number of features by which
+    two sounds differ is the number of bits set in ``x ^ y``.
+    """
+    feature_bits = {}
+    for enum in (Sthana, Ghosha, Prana, Prayatna):
+        for feature in enum:
+            feature_bits[feature] = 1 << len(feature_bits)
+
+    tables = _feature_tables()
+    masks = {}
+    for name in ("GHOSHA", "PRANA", "STHANA", "PRAYATNA"):
+        for sound, features in tables[name].items():
+            for feature in features:
+                masks[sound] = masks.get(sound, 0) | feature_bits[feature]
+    return masks
+
+
+#: Caches the result of :func:`map_sounds` for each pair of sound groups.
+_MAP_CACHE: Dict[Tuple[str, str], Dict[str, str]] = {}
 
 
 @functools.cache
@@ -378,29 +483,38 @@ def map_sounds(left: OrderedSet, right: OrderedSet) -> Dict[str, str]:
 
         1.1.50 *sthāne'ntaratamaḥ*
 
+    We compute each mapping only once and compare sounds with the feature
+    masks from :func:`_feature_masks`. Callers must not modify the returned dict.
+
     :param left: the "input" side of the mapping.
     :param right: the "output" side of the mapping.
     :return: a mapping from each sound in `left` to its closest sound in
         `right`.
     """
-    right_qs = []
-    for r in right.items:
-        right_q = GHOSHA[r] | PRANA[r] | STHANA[r] | PRAYATNA[r]
-        right_qs.append((r, right_q))
+    key = ("".join(left.items), "".join(right.items))
+    try:
+        return _MAP_CACHE[key]
+    except KeyError:
+        pass
+
+    features = _feature_masks()
+    right_qs = [(r, features[r]) for r in right.items]
 
     mapping = {}
     for L in left.items:
-        left_q = GHOSHA[L] | PRANA[L] | STHANA[L] | PRAYATNA[L]
+        left_q = features[L]
 
         best = None
         best_score = 999
         for r, right_q in right_qs:
             # The most similar sound is the one that is the least different.
-            score = len(right_q - left_q) + len(left_q - right_q)
+            score = bin(left_q ^ right_q).count("1")
             if score < best_score:
                 best = r
                 best_score = score
 
         assert best
         mapping[L] = best
+
+    _MAP_CACHE[key] = mapping
     return mapping
@@ -0,0 +1,369 @@
+"""Stream generated forms as structured records.
+
+Bulk generation produces hundreds of thousands of forms, so we never hold
+them all at once. Instead, :func:`iter_shards` generates one dhātu at a time
+(optionally on a process pool) and yields its records in dhātupāṭha order.
+Sinks such as :class:`XmlSink` and :class:`TsvSink` then write each record
+as it arrives.
+
+Usage::
+
+    with open("forms.tsv", "w") as f:
+        write(iter_forms(start="01.0001", end="01.0100"), TsvSink(f))
+"""
+
+import abc
+import functools
+import itertools
+import json
+import multiprocessing
+import os
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from padmini.ashtadhyayi import all_tinantas
+from padmini.constants import Tag as T
+from padmini import dhatupatha
+from padmini.dhatupatha import DhatupathaEntry
+from padmini.prakarana.tin_pratyaya import PURUSHA, VACANA
+from padmini.prakriya import HistoryLevel
+
+
+#: Maps a lakara name to the lakara and extra tags we use to derive it.
+LAKARAS = {
+    "la~w": ("la~w", frozenset()),
+    "li~w": ("li~w", frozenset()),
+    "lu~w": ("lu~w", frozenset()),
+    "lf~w": ("lf~w", frozenset()),
+    "lo~w": ("lo~w", frozenset()),
+    "la~N": ("la~N", frozenset()),
+    "ashir-lin": ("li~N", frozenset({T.ASHIH})),
+    "li~N": ("li~N", frozenset()),
+    "lu~N": ("lu~N", frozenset()),
+    "lf~N": ("lf~N", frozenset()),
+}
+
+#: The tin-pratyayas in order, first parasmaipada then atmanepada.
+TIN_LIST = [
+    "tip",
+    "tas",
+    "Ji",
+    "sip",
+    "Tas",
+    "Ta",
+    "mip",
+    "vas",
+    "mas",
+    "ta",
+    "AtAm",
+    "Ja",
+    "tAs",
+    "ATAm",
+    "Dvam",
+    "iw",
+    "vahi",
+    "mahiN",
+]
+
+
+class FormRecord(NamedTuple):
+    """A single generated form."""
+
+    #: The final text of the form.
+    form: str
+    #: The dhatu in upadesha form, e.g. "BU".
+    dhatu: str
+    #: The dhatu code, e.g. "01.0001".
+    code: str
+    #: The lakara name, as in :data:`LAKARAS`.
+    la: str
+    purusha: str
+    vacana: str
+    pada: str
+    #: The tin-pratyaya, as in :data:`TIN_LIST`.
+    tin: str
+    #: The optional rules seen during the derivation, as (rule, accepted)
+    #: pairs.
+    options: Tuple[Tuple[str, bool], ...]
+
+
+class Shard(NamedTuple):
+    """All records for a single dhatu."""
+
+    #: The dhatu code, e.g. "01.0001".
+    code: str
+    records: List[FormRecord]
+    #: A description of each derivation that raised an exception.
+    errors: List[str]
+
+
+def generate_dhatu(
+    dhatu: DhatupathaEntry, lakaras: Iterable[str] = LAKARAS, tags=frozenset()
+) -> Shard:
+    """Generate all tinantas for a single dhatu.
+
+    Exceptions are caught per derivation so that one bad form does not lose
+    the rest of the shard.
+
+    :param dhatu: the dhatu to use.
+    :param lakaras: the lakara names to use, as in :data:`LAKARAS`.
+    :param tags: extra tags to add to each derivation.
+    """
+    code = dhatu.code
+    records = []
+    errors = []
+    for name in lakaras:
+        la, la_tags = LAKARAS[name]
+        for i, (purusha, vacana) in enumerate(itertools.product(PURUSHA, VACANA)):
+            final_tags = {purusha, vacana} | la_tags | set(tags)
+            try:
+                prakriyas = all_tinantas(
+                    dhatu.upadesha,
+                    code,
+                    la,
+                    tags=final_tags,
+                    history_level=HistoryLevel.NONE,
+                )
+            except Exception as e:
+                tag_str = ",".join(sorted(final_tags))
+                errors.append(f"{code} {dhatu.upadesha} {la} {tag_str}: {e!r}")
+                continue
+            for p in prakriyas:
+                if p.terms[-1].all(T.ATMANEPADA):
+                    pada = T.ATMANEPADA
+                    tin = TIN_LIST[i + 9]
+                else:
+                    pada = T.PARASMAIPADA
+                    tin = TIN_LIST[i]
+                options = tuple(tuple(x) for x in p.options_seen)
+                records.append(
+                    FormRecord(
+                        p.text,
+                        dhatu.upadesha,
+                        code,
+                        name,
+                        purusha,
+                        vacana,
+                        pada,
+                        tin,
+                        options,
+                    )
+                )
+    return Shard(code, records, errors)
+
+
+def select_dhatus(
+    dhatus=None, start: Optional[str] = None, end: Optional[str] = None
+) -> List[DhatupathaEntry]:
+    """Return the dhatus whose code is in the range [`start`, `end`].
+
+    :param dhatus: the dhatus to select from. If ``None``, use the full
+        dhatupatha.
+    :param start: the first code to include, e.g. "01.0001".
+    :param end: the last code to include.
+    """
+    if dhatus is None:
+        dhatus = dhatupatha.load()
+    ret = []
+    for d in dhatus:
+        code = d.code
+        if start is not None and code < start:
+            continue
+        if end is not None and code > end:
+            continue
+        ret.append(d)
+    return ret
+
+
+def iter_shards(
+    dhatus=None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    lakaras: Iterable[str] = LAKARAS,
+    tags=frozenset(),
+    workers: Optional[int] = 1,
+) -> Iterator[Shard]:
+    """Generate tinantas one dhatu at a time.
+
+    Shards are yielded in the same order as `dhatus` regardless of the
+    number of workers.
+
+    :param dhatus: the dhatus to use. If ``None``, use the full dhatupatha.
+    :param start: if set, skip dhatus whose code is less than `start`.
+    :param end: if set, skip dhatus whose code is greater than `end`.
+    :param lakaras: the lakara names to use, as in :data:`LAKARAS`.
+    :param tags: extra tags to add to each derivation.
+    :param workers: the number of worker processes. If ``None``, use one per
+        CPU. If 1, run in the current process.
+    """
+    dhatus = select_dhatus(dhatus, start, end)
+    func = functools.partial(
+        generate_dhatu, lakaras=tuple(lakaras), tags=frozenset(tags)
+    )
+    if workers == 1:
+        yield from map(func, dhatus)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(func, dhatus, chunksize=4)
+
+
+def iter_forms(
+    *args, errors: Optional[List[str]] = None, **kw
+) -> Iterator[FormRecord]:
+    """Like :func:`iter_shards`, but yield individual records.
+
+    :param errors: if set, we append the description of each derivation that
+        raised an exception to this list. Otherwise, we drop these errors.
+    """
+    for shard in iter_shards(*args, **kw):
+        yield from shard.records
+        if errors is not None:
+            errors.extend(shard.errors)
+
+
+def format_options(options) -> str:
+    """Format options as ``rule=0`` or ``rule=1`` separated by commas."""
+    return ",".join(f"{rule}={int(value)}" for rule, value in options)
+
+
+def parse_options(s: str) -> Tuple[Tuple[str, bool], ...]:
+    """Inverse of :func:`format_options`."""
+    if not s:
+        return ()
+    ret = []
+    for item in s.split(","):
+        rule, _, value = item.rpartition("=")
+        ret.append((rule, value == "1"))
+    return tuple(ret)
+
+
+class Sink(abc.ABC):
+    """Writes records somewhere.
+
+    Call :meth:`begin` once, :meth:`write` for each record, and :meth:`end`
+    once. :func:`write` does all three.
+    """
+
+    def begin(self):
+        pass
+
+    @abc.abstractmethod
+    def write(self, record: FormRecord):
+        pass
+
+    def end(self):
+        pass
+
+
+class XmlSink(Sink):
+    """Writes records in the XML format that ``harness.py`` has always used.
+
+    This format does not include puruṣa, vacana, or options.
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def begin(self):
+        self.f.write('<!DOCTYPE forms SYSTEM "verbforms.dtd">\n')
+        self.f.write("<forms>\n")
+
+    def write(self, r: FormRecord):
+        if r.la == "ashir-lin":
+            la = "ASIrliN"
+        else:
+            la = r.la.replace("~", "")
+        self.f.write(
+            f'<f form="{r.form}"><root name="{r.dhatu}" num="{r.code}"/>'
+            f"<{la}/><{r.tin}/></f>\n"
+        )
+
+    def end(self):
+        self.f.write("</forms>\n")
+
+
+class TsvSink(Sink):
+    """Writes records as TSV with a header row. Options are formatted with
+    :func:`format_options`."""
+
+    def __init__(self, f, header: bool = True):
+        self.f = f
+        self.header = header
+
+    def begin(self):
+        if self.header:
+            self.f.write("\t".join(FormRecord._fields) + "\n")
+
+    def write(self, r: FormRecord):
+        row = r[:-1] + (format_options(r.options),)
+        self.f.write("\t".join(row) + "\n")
+
+
+class JsonlSink(Sink):
+    """Writes one JSON object per record."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, r: FormRecord):
+        self.f.write(json.dumps(r._asdict(), ensure_ascii=False) + "\n")
+
+
+class ColumnarSink(Sink):
+    """Writes each field to its own file in `directory`, one value per line.
+
+    Consumers that need only a few fields can read just those files. Use
+    :func:`read_columns` to read the records back.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+
+    def begin(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for field in FormRecord._fields:
+            path = os.path.join(self.directory, f"{field}.txt")
+            self.files[field] = open(path, "w")
+
+    def write(self, r: FormRecord):
+        for field, value in zip(FormRecord._fields, r):
+            if field == "options":
+                value = format_options(value)
+            self.files[field].write(value + "\n")
+
+    def end(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+
+
+#: Maps a format name to a sink class that writes to a file object.
+FILE_SINKS = {
+    "xml": XmlSink,
+    "tsv": TsvSink,
+    "jsonl": JsonlSink,
+}
+
+
+def read_columns(directory, fields: Iterable[str] = FormRecord._fields):
+    """Read `fields` from a directory written by :class:`ColumnarSink`.
+
+    :return: a dict that maps each field to a list of values.
+    """
+    ret = {}
+    for field in fields:
+        with open(os.path.join(directory, f"{field}.txt")) as f:
+            values = f.read().split("\n")[:-1]
+        if field == "options":
+            values = [parse_options(x) for x in values]
+        ret[field] = values
+    return ret
+
+
+def write(records: Iterable[FormRecord], sink: Sink):
+    """Write all `records` to `sink`."""
+    sink.begin()
+    for r in records:
+        sink.write(r)
+    sink.end()
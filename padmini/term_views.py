@@ -1,4 +1,7 @@
-from padmini.prakriya import Prakriya, VyakaranaException
+from bisect import bisect_right
+from typing import Optional
+
+from padmini.prakriya import Prakriya, VyakaranaException, tag_mask
 from padmini.constants import Tag
 
 
@@ -166,11 +169,12 @@ class TermView:
 
     def all(self, *tags) -> bool:
         # Only check non-empty terms.
-        for tag in tags:
-            if any(t.all(tag) for t in self.terms if t.text):
-                continue
-            return False
-        return True
+        mask = tag_mask(tags)
+        seen = 0
+        for t in self.terms:
+            if t.text:
+                seen |= t.tags.mask
+        return seen & mask == mask
 
     def any(self, *tags) -> bool:
         """Return whether any of the terms in this view has any of the tags in `tags`.
@@ -178,68 +182,179 @@ class TermView:
         :param tags: a list of tags
         :return:
         """
+        mask = tag_mask(tags)
         for t in self.terms:
-            if t.text and t.any(*tags):
+            if t.text and t.tags.mask & mask:
                 return True
         return False
 
 
+class Span:
+
+    """A stable reference to a range of sounds in a :class:`StringView`.
+
+    Edits made through the view keep the span aligned with the sounds it
+    refers to. So if we find several matches up front and delete them one by
+    one, later spans stay correct even though earlier deletions shift the
+    text.
+    """
+
+    __slots__ = ("start", "end")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Span({self.start}, {self.end})"
+
+    def _shift(self, index: int, removed: int, added: int):
+        """Update the span for an edit that replaces `removed` sounds at
+        `index` with `added` sounds."""
+        end = index + removed
+        delta = added - removed
+        if self.start >= end:
+            self.start += delta
+        elif self.start > index:
+            self.start = index
+        if self.end >= end:
+            self.end += delta
+        elif self.end > index:
+            self.end = index
+
+
 class StringView:
 
-    """Helper class that treats a prakriya like one string."""
+    """Helper class that treats a prakriya like one string.
+
+    The view keeps the offset of each term so that it can map an index to
+    its term with a binary search. Edits made through the view update these
+    offsets in place. If the terms are changed directly, the view notices
+    the next time it is used and recomputes its offsets.
+    """
 
     def __init__(self, terms):
         self.terms = terms
+        #: The text of each term, as of the last sync.
+        self._texts = []
+        #: `_starts[i]` is the offset of term `i`. The last entry is the
+        #: length of the full text.
+        self._starts = [0]
+        self._text = ""
+        #: The terms as of the last sync.
+        self._terms = []
+        #: Spans that might still be shifted by an edit.
+        self._spans = set()
+
+    def _sync(self):
+        """Recompute offsets if any term was changed outside the view."""
+        terms = self.terms
+        if len(terms) == len(self._terms):
+            for t, known, text in zip(terms, self._terms, self._texts):
+                if t is not known or t.text != text:
+                    break
+            else:
+                return
+        texts = [t.text for t in terms]
+        self._terms = list(terms)
+        starts = [0]
+        for text in texts:
+            starts.append(starts[-1] + len(text))
+        self._texts = texts
+        self._starts = starts
+        self._text = None
+
+    def _set_term_text(self, i: int, text: str):
+        """Set the text of term `i` and update the offsets after it.
+
+        Updating the offsets is linear in the number of terms. A prakriya
+        has only a handful of terms, so this is cheaper in practice than a
+        tree of offsets.
+        """
+        delta = len(text) - len(self._texts[i])
+        self.terms[i].text = text
+        self._texts[i] = text
+        if delta:
+            starts = self._starts
+            for j in range(i + 1, len(starts)):
+                starts[j] += delta
+
+    def _shift_spans(self, index: int, removed: int, added: int):
+        """Shift all live spans for an edit, and drop the spans that no
+        longer cover any sounds."""
+        done = []
+        for span in self._spans:
+            span._shift(index, removed, added)
+            if span.start >= span.end:
+                done.append(span)
+        self._spans.difference_update(done)
+
+    def _index(self, index: int) -> Optional[int]:
+        """Return the index of the term that contains sound `index`."""
+        starts = self._starts
+        if not 0 <= index < starts[-1]:
+            return None
+        return bisect_right(starts, index) - 1
 
     @property
     def text(self):
-        return "".join(x.text for x in self.terms)
+        self._sync()
+        if self._text is None:
+            self._text = "".join(self._texts)
+        return self._text
+
+    def span(self, start: int, end: int) -> Span:
+        """Return a :class:`Span` for `text[start:end]` that stays aligned
+        with later edits made through this view."""
+        span = Span(start, end)
+        if start < end:
+            self._spans.add(span)
+        return span
+
+    def delete(self, span: Span):
+        """Delete the sounds in `span`."""
+        self._spans.discard(span)
+        self.delete_span(span.start, span.end)
 
     def delete_span(self, start, end):
-        # Given:
-        # - `start` is (before, in, after) the term.
-        # - `end` is (before, in, after) the term.
-        # - `end` always comes after `start`
-        # We have six cases:
-        # - (before, before)
-        # - (before, in)
-        # - (before, after)
-        # - (in, in)
-        # - (in, after)
-        # - (after, after)
-        terms = self.terms
-        offset = 0
-        for t in terms:
-            len_t = len(t.text)
-            # Clamp to prevent loop around to negative indices
+        self._sync()
+        start = max(start, 0)
+        end = min(end, self._starts[-1])
+        if start >= end:
+            return
+
+        # Work backward so that the offsets of the remaining terms are not
+        # affected by our edits.
+        first = self._index(start)
+        last = self._index(end - 1)
+        for i in range(last, first - 1, -1):
+            offset = self._starts[i]
+            text = self._texts[i]
             t_s = max(start - offset, 0)
             t_e = end - offset
-
-            if t_s < len_t and t_e > 0:
-                t.text = t.text[:t_s] + t.text[t_e:]
-
-            offset += len_t
+            self._set_term_text(i, text[:t_s] + text[t_e:])
+        self._text = None
+        if self._spans:
+            self._shift_spans(start, end - start, 0)
 
     def __getitem__(self, index):
         return self.text[index]
 
     def __setitem__(self, index, substitute):
-        cur = 0
-        for u in self.terms:
-            delta = len(u.text)
-            if cur <= index < cur + delta:
-                offset = index - cur
-                u.text = u.text[:offset] + substitute + u.text[offset + 1 :]
-                return
-            else:
-                cur += delta
+        self._sync()
+        i = self._index(index)
+        if i is None:
+            return
+        text = self._texts[i]
+        offset = index - self._starts[i]
+        self._set_term_text(i, text[:offset] + substitute + text[offset + 1 :])
+        self._text = None
+        if self._spans:
+            self._shift_spans(index, 1, len(substitute))
 
     def term_for_index(self, index):
-        cur = 0
-        for u in self.terms:
-            delta = len(u.text)
-            if cur <= index < cur + delta:
-                return u
-            else:
-                cur += delta
-        return None
+        self._sync()
+        i = self._index(index)
+        if i is None:
+            return None
+        return self.terms[i]
@@ -0,0 +1,161 @@
+"""Opt-in timing for derivations.
+
+A :class:`Timer` records how much wall time each stage of a derivation takes
+(e.g. ``angasya.run_remainder`` or ``tripadi.run``) and how often each rule
+is applied. Pass the same timer to many derivations to aggregate over a
+batch::
+
+    timer = Timer()
+    for la in ["la~w", "li~w", "lu~N"]:
+        tinanta("BU", "01.0001", la, tags={...}, timer=timer)
+    timer.print_report()
+
+    with open("profile.folded", "w") as f:
+        timer.write_collapsed(f)
+
+The collapsed-stack file can be viewed with ``flamegraph.pl`` or uploaded to
+https://www.speedscope.app.
+
+We time a rule as the wall time between the previous event (the start of its
+stage or the previous rule) and the call to :meth:`Prakriya.step` that logs
+it. This includes the time spent checking rules that did not apply, so treat
+per-rule times as a guide to where a stage spends its time and not as exact
+measurements.
+"""
+
+import contextlib
+import functools
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Stat(NamedTuple):
+    """Aggregate timing for a stage or a rule."""
+
+    #: The number of times the stage was run or the rule was applied.
+    calls: int
+    #: The total wall time in seconds.
+    seconds: float
+
+
+def stage_name(stage) -> str:
+    """Return a short name for `stage`, e.g. ``"angasya.run_remainder"``."""
+    while isinstance(stage, functools.partial):
+        stage = stage.func
+    return _function_name(stage)
+
+
+@functools.cache
+def _function_name(stage) -> str:
+    module = getattr(stage, "__module__", None) or ""
+    for prefix in ("padmini.prakarana.", "padmini."):
+        if module.startswith(prefix):
+            module = module[len(prefix) :]
+            break
+    name = getattr(stage, "__qualname__", None) or repr(stage)
+    return f"{module}.{name}" if module else name
+
+
+class Timer:
+    """Collects timings for stages and rules across many derivations.
+
+    A derivation has a root frame (e.g. ``"tinanta"``), which contains one
+    frame per stage, which contains one frame per rule applied. Time not
+    covered by a child frame is the frame's own time.
+    """
+
+    def __init__(self):
+        #: Maps a stack of frame names to the time spent in that frame itself.
+        self.self_times: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._stage_calls: Dict[str, int] = defaultdict(int)
+        self._stage_times: Dict[str, float] = defaultdict(float)
+        self._rule_calls: Dict[str, int] = defaultdict(int)
+        self._rule_times: Dict[str, float] = defaultdict(float)
+        #: The current stack of (name, start time) pairs.
+        self._stack: List[Tuple[str, float]] = []
+        self._last = 0.0
+
+    def _flush(self, now: float):
+        """Assign the time since the last event to the current frame."""
+        if self._stack:
+            key = tuple(name for name, _ in self._stack)
+            self.self_times[key] += now - self._last
+        self._last = now
+
+    def enter(self, name: str):
+        """Start a frame named `name` inside the current frame."""
+        now = time.perf_counter()
+        self._flush(now)
+        self._stack.append((name, now))
+        if len(self._stack) == 2:
+            self._stage_calls[name] += 1
+
+    def exit(self):
+        """End the current frame."""
+        now = time.perf_counter()
+        self._flush(now)
+        name, start = self._stack.pop()
+        if len(self._stack) == 1:
+            self._stage_times[name] += now - start
+
+    @contextlib.contextmanager
+    def frame(self, name: str):
+        """Run the body of a ``with`` block in a frame named `name`."""
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def mark(self, rule):
+        """Record that `rule` was just applied in the current frame."""
+        now = time.perf_counter()
+        rule = str(rule)
+        elapsed = now - self._last
+        if self._stack:
+            key = tuple(name for name, _ in self._stack) + (rule,)
+            self.self_times[key] += elapsed
+        self._last = now
+        self._rule_calls[rule] += 1
+        self._rule_times[rule] += elapsed
+
+    def stages(self) -> Dict[str, Stat]:
+        """Return timings per stage. Stage times include their rules."""
+        return {
+            name: Stat(calls, self._stage_times[name])
+            for name, calls in self._stage_calls.items()
+        }
+
+    def rules(self) -> Dict[str, Stat]:
+        """Return timings per rule, summed over all stages."""
+        return {
+            rule: Stat(calls, self._rule_times[rule])
+            for rule, calls in self._rule_calls.items()
+        }
+
+    def clear(self):
+        """Discard all timings."""
+        self.__init__()
+
+    def write_collapsed(self, f):
+        """Write timings in the collapsed-stack format used by flame graphs.
+
+        Each line has a semicolon-separated stack and a time in microseconds,
+        e.g. ``tinanta;tripadi.run;8.2.66 1520``.
+        """
+        for key, seconds in sorted(self.self_times.items()):
+            micros = round(seconds * 1_000_000)
+            if micros:
+                f.write(f"{';'.join(key)} {micros}\n")
+
+    def print_report(self, limit: int = 20):
+        """Print the slowest `limit` stages and rules."""
+        for title, stats in [("stage", self.stages()), ("rule", self.rules())]:
+            rows = sorted(stats.items(), key=lambda x: x[1].seconds, reverse=True)
+            print(f"{title:<40} {'calls':>8} {'total ms':>10} {'us/call':>9}")
+            for name, (calls, seconds) in rows[:limit]:
+                per_call = seconds / calls * 1_000_000
+                total = seconds * 1000
+                print(f"{name:<40} {calls:>8} {total:>10.1f} {per_call:>9.1f}")
+            print()
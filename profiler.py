@@ -1,13 +1,73 @@
+"""Show which stages and rules take the most time.
+
+Usage::
+
+    # Profile all lakaras for the first 20 dhatus.
+    python profiler.py --end 01.0020
+
+    # Profile one lakara and write a flame graph input file.
+    python profiler.py --lakara lu~N -o profile.folded
+    flamegraph.pl profile.folded > profile.svg
+"""
+
+import argparse
+import itertools
 import sys
 
-import pstats
-from pstats import SortKey
+from padmini import ashtadhyayi, stream
+from padmini.prakarana.tin_pratyaya import PURUSHA, VACANA
+from padmini.prakriya import HistoryLevel
+from padmini.timing import Timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", help="first dhatu code to generate")
+    parser.add_argument("--end", help="last dhatu code to generate")
+    parser.add_argument(
+        "--lakara",
+        action="append",
+        choices=list(stream.LAKARAS),
+        help="lakara to generate. Repeat for more than one (default: all)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="write collapsed stacks for a flame graph here"
+    )
+    parser.add_argument(
+        "-n", "--limit", type=int, default=20, help="rows to print (default: 20)"
+    )
+    args = parser.parse_args()
+
+    timer = Timer()
+    num_errors = 0
+    for dhatu in stream.select_dhatus(start=args.start, end=args.end):
+        for name in args.lakara or stream.LAKARAS:
+            la, la_tags = stream.LAKARAS[name]
+            for purusha, vacana in itertools.product(PURUSHA, VACANA):
+                try:
+                    ashtadhyayi.all_tinantas(
+                        dhatu.upadesha,
+                        dhatu.code,
+                        la,
+                        tags={purusha, vacana} | la_tags,
+                        history_level=HistoryLevel.NONE,
+                        timer=timer,
+                    )
+                except Exception as e:
+                    tag_str = f"{purusha} {vacana}"
+                    print(
+                        f"{dhatu.code} {dhatu.upadesha} {la} {tag_str}: {e!r}",
+                        file=sys.stderr,
+                    )
+                    num_errors += 1
 
+    timer.print_report(args.limit)
+    if args.output:
+        with open(args.output, "w") as f:
+            timer.write_collapsed(f)
+    if num_errors:
+        print(f"{num_errors} derivations failed.", file=sys.stderr)
 
-try:
-    order = sys.argv[2]
-except IndexError:
-    order = "tottime"
 
-p = pstats.Stats(sys.argv[1])
-p.strip_dirs().sort_stats(order).print_stats(20)
+if __name__ == "__main__":
+    main()
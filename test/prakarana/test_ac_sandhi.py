@@ -0,0 +1,59 @@
+import pytest
+
+from padmini.prakarana import ac_sandhi
+from padmini.prakriya import Prakriya, Term
+
+
+def _make(*texts):
+    return Prakriya.make([Term.make_term(t) for t in texts])
+
+
+@pytest.mark.parametrize(
+    "texts,expected,rules",
+    [
+        # 6.1.97 ato guNe
+        (["pac", "a", "anti"], ["pac", "", "anti"], ["6.1.97"]),
+        # 6.1.78 eco 'yavAyAvaH
+        (["Bo", "a"], ["Bav", "a"], ["6.1.78"]),
+        (["nE", "aka"], ["nAy", "aka"], ["6.1.78"]),
+        # 6.1.101 akaH savarNe dIrghaH
+        (["vidyA", "alaya"], ["vidy", "Alaya"], ["6.1.101"]),
+        (["kavi", "indra"], ["kav", "Indra"], ["6.1.101"]),
+        # 6.1.77 iko yaR aci
+        (["naDi", "am"], ["naDy", "am"], ["6.1.77"]),
+        # 6.1.87 Ad guNaH
+        (["deva", "indra"], ["deve", "ndra"], ["6.1.87"]),
+        (["mahA", "fzi"], ["mahar", "zi"], ["6.1.87"]),
+        # 6.1.88 vfddhir eci
+        (["deva", "Ekya"], ["devE", "kya"], ["6.1.88"]),
+        # No vowels in contact.
+        (["Bav", "ti"], ["Bav", "ti"], []),
+    ],
+)
+def test_general_vowel_sandhi(texts, expected, rules):
+    p = _make(*texts)
+    ac_sandhi.general_vowel_sandhi(p)
+    assert [t.text for t in p.terms] == expected
+    assert [rule for _, rule in p.history] == rules
+
+
+def test_general_vowel_sandhi_precedence():
+    # 6.1.77 applies to "f a" before 6.1.87 can apply to "A f".
+    p = _make("A", "f", "atus")
+    ac_sandhi.general_vowel_sandhi(p)
+    assert [t.text for t in p.terms] == ["A", "r", "atus"]
+    assert [rule for _, rule in p.history] == ["6.1.77"]
+
+    # 6.1.97 applies to "a e" first and leaves "A" next to "e", which 6.1.88
+    # then resolves.
+    p = _make("sA", "a", "eva")
+    ac_sandhi.general_vowel_sandhi(p)
+    assert p.text == "sEva"
+    assert [rule for _, rule in p.history] == ["6.1.97", "6.1.88"]
+
+
+def test_general_vowel_sandhi_applies_every_junction():
+    # "i u" is not savarna, but 6.1.101 still applies to the "a A" after it.
+    p = _make("i", "u", "a", "A")
+    ac_sandhi.general_vowel_sandhi(p)
+    assert p.text == "yvA"
@@ -0,0 +1,32 @@
+from padmini.constants import Tag as T
+from padmini.prakarana import dhatu_karya
+from padmini.prakriya import HistoryLevel, Prakriya
+
+
+def _run(dhatu, code, history_level=HistoryLevel.TEXT):
+    p = Prakriya.make(history_level=history_level)
+    dhatu_karya.run(p, dhatu, code)
+    return p
+
+
+def test_run():
+    p = _run("zWA\\", "01.1077")
+    assert [t.text for t in p.terms] == ["sTA"]
+    assert p.terms[0].all(T.DHATU, T.F_ADESHA_ADI)
+    assert p.history[0] == ("zWA\\", "start")
+
+
+def test_run_replays_profile():
+    first = _run("i\\N", "02.0041")
+    second = _run("i\\N", "02.0041")
+    assert [t.text for t in second.terms] == ["aDi", "i"]
+    assert second.history == first.history
+    # Each prakriya gets its own terms.
+    assert first.terms[1] is not second.terms[1]
+
+
+def test_run_without_history():
+    p = _run("kusma~", "10.0236", history_level=HistoryLevel.NONE)
+    assert p.steps == []
+    assert p.all(T.ATMANEPADA)
+    assert p.terms[0].text == "kusm"
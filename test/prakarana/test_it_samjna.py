@@ -61,3 +61,20 @@ def test_pratyaya(raw, expected, its):
     res = p.terms[0]
     assert expected == res.text
     assert all(it in res.tags for it in its)
+
+
+def test_analyze():
+    res = it_samjna.analyze("qupa\\ca~^z", False, False, False)
+    assert res.text == "pac"
+    assert res.rules == ("1.3.2", "1.3.4", "1.3.5")
+    # Results are cached.
+    assert it_samjna.analyze("qupa\\ca~^z", False, False, False) is res
+
+
+def test_run_logs_rules():
+    p = Prakriya.make([Term.make_upadesha("tip")])
+    p.terms[0].tags.add("vibhakti")
+    it_samjna.run(p, 0)
+    assert [rule for _, rule in p.history] == ["1.3.4", "1.3.9"]
+    assert p.history[0][0] == "tip"
+    assert p.history[1][0] == "ti"
@@ -0,0 +1,35 @@
+import pytest
+
+from padmini.prakarana import tripadi
+from padmini.prakriya import Prakriya, Term
+
+
+def _make(*texts):
+    return Prakriya.make([Term.make_term(t) for t in texts])
+
+
+@pytest.mark.parametrize(
+    "texts,index,expected",
+    [
+        # 8.4.55 khari ca
+        (["lab", "ta"], 0, ["lap", "ta"]),
+        (["vivid", "", "su"], 0, ["vivit", "", "su"]),
+        # No following khar.
+        (["lab", "Da"], 0, ["lab", "Da"]),
+        (["lab", "", ""], 0, ["lab", "", ""]),
+        # Only the term at `index` changes.
+        (["a", "lab", "tA"], 0, ["a", "lab", "tA"]),
+        (["gupt", "sa"], 0, ["gupt", "sa"]),
+        (["bkdt", "sa"], 0, ["pktt", "sa"]),
+    ],
+)
+def test_al_adesha(texts, index, expected):
+    p = _make(*texts)
+    tripadi.al_adesha("8.4.55", p, index, None, "Jal", "Kar", "car")
+    assert [t.text for t in p.terms] == expected
+
+
+def test_al_adesha_logs_each_change():
+    p = _make("bkdt", "sa")
+    tripadi.al_adesha("8.4.55", p, 0, None, "Jal", "Kar", "car")
+    assert [rule for _, rule in p.history] == ["8.4.55", "8.4.55"]
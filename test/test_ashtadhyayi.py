@@ -0,0 +1,59 @@
+import pytest
+from padmini import ashtadhyayi
+from padmini.constants import Tag as T
+from .utils import (
+    all_subantas,
+    all_subantas_by_rerun,
+    run_all_permutations,
+    run_all_permutations_by_rerun,
+)
+
+
+def _key(p):
+    return (p.text, tuple(p.options_seen), tuple(p.history))
+
+
+@pytest.mark.parametrize(
+    "code,la,tags",
+    [
+        # Many optional rules
+        ("01.0001", "lu~N", {T.PRATHAMA, T.EKAVACANA}),
+        ("01.1033", "lu~N", {T.PRATHAMA, T.EKAVACANA}),
+        ("04.0095", "lu~w", {T.MADHYAMA, T.EKAVACANA}),
+        ("07.0006", "lu~N", {T.PRATHAMA, T.BAHUVACANA}),
+        ("10.0155", "lu~N", {T.UTTAMA, T.DVIVACANA}),
+        ("02.0067", "li~N", {T.PRATHAMA, T.EKAVACANA, T.ASHIH}),
+    ],
+)
+def test_all_tinantas_matches_rerun(code, la, tags):
+    forked = run_all_permutations(code, la, tags)
+    rerun = run_all_permutations_by_rerun(code, la, tags)
+    assert sorted(map(_key, forked)) == sorted(map(_key, rerun))
+
+
+@pytest.mark.parametrize(
+    "stem,linga,tags",
+    [
+        # Two optional rules
+        ("pUrva", T.PUM, {T.V5, T.EKAVACANA}),
+        ("pUrva", T.PUM, {T.V1, T.BAHUVACANA}),
+        ("deva", T.PUM, {T.V5, T.EKAVACANA}),
+        ("praTama", T.PUM, {T.V1, T.BAHUVACANA}),
+    ],
+)
+def test_all_subantas_matches_rerun(stem, linga, tags):
+    forked = all_subantas(stem, linga, tags)
+    rerun = all_subantas_by_rerun(stem, linga, tags)
+    assert sorted(map(_key, forked)) == sorted(map(_key, rerun))
+
+
+def test_options_are_not_modified():
+    tags = {T.PRATHAMA, T.EKAVACANA}
+    options = {"x": True}
+    first = ashtadhyayi.all_tinantas("gupU~", "01.0461", "lf~w", tags, options)
+    assert options == {"x": True}
+
+    # Reusing the same dict gives the same forms.
+    second = ashtadhyayi.all_tinantas("gupU~", "01.0461", "lf~w", tags, options)
+    assert len(first) > 1
+    assert [p.text for p in first] == [p.text for p in second]
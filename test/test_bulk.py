@@ -0,0 +1,55 @@
+import json
+import os
+
+import pytest
+
+from padmini import bulk
+from padmini.dhatupatha import load_dhatus
+
+
+DHATUS = load_dhatus()[:5]
+
+
+def _run(directory, **kw):
+    return bulk.run(directory, dhatus=DHATUS, lakaras=["la~w"], shard_size=2, **kw)
+
+
+def _read_outputs(directory):
+    ret = {}
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("part-"):
+            with open(os.path.join(directory, name)) as f:
+                ret[name] = f.read()
+    return ret
+
+
+def test_run(tmp_path):
+    assert _run(tmp_path) == 3
+    outputs = _read_outputs(tmp_path)
+    assert list(outputs) == ["part-00000.tsv", "part-00001.tsv", "part-00002.tsv"]
+    assert "\tBU\t01.0001\t" in outputs["part-00000.tsv"]
+
+    # Everything is done, so there is nothing to resume.
+    assert _run(tmp_path) == 0
+
+
+def test_resume(tmp_path):
+    _run(tmp_path)
+    expected = _read_outputs(tmp_path)
+
+    # Simulate a crash after the first shard.
+    for name in ["part-00001.tsv", "part-00002.tsv"]:
+        os.remove(tmp_path / name)
+    checkpoint = tmp_path / bulk.CHECKPOINT
+    data = json.loads(checkpoint.read_text())
+    data["completed"] = ["01.0001", "01.0002"]
+    checkpoint.write_text(json.dumps(data))
+
+    assert _run(tmp_path) == 2
+    assert _read_outputs(tmp_path) == expected
+
+
+def test_changed_arguments(tmp_path):
+    _run(tmp_path)
+    with pytest.raises(ValueError):
+        _run(tmp_path, format="jsonl")
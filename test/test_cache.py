@@ -0,0 +1,81 @@
+from padmini import ashtadhyayi
+from padmini.cache import FormCache
+from padmini.constants import Tag as T
+
+
+TAGS = {T.PRATHAMA, T.EKAVACANA}
+
+
+def test_hit_matches_miss(tmp_path):
+    path = tmp_path / "forms.db"
+    with FormCache(path) as cache:
+        cold = cache.all_tinantas("BU", "01.0001", "la~w", tags=TAGS)
+        assert cache.misses == 1
+
+    # Reopen to check that entries persist.
+    with FormCache(path) as cache:
+        warm = cache.all_tinantas("BU", "01.0001", "la~w", tags=TAGS)
+        assert cache.hits == 1
+        assert cache.misses == 0
+
+    assert cold == warm
+    assert [f.text for f in warm] == ["Bavati"]
+
+
+def test_history():
+    with FormCache(":memory:") as cache:
+        form = cache.tinanta("BU", "01.0001", "la~w", tags=TAGS, history=True)
+        p = ashtadhyayi.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        assert form.text == p.text
+        assert list(form.history) == p.history
+
+        # History is part of the key.
+        form = cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        assert form.history is None
+        assert cache.misses == 2
+
+
+def test_eviction():
+    with FormCache(":memory:", max_entries=2) as cache:
+        cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        cache.tinanta("BU", "01.0001", "lo~w", tags=TAGS)
+        # Use la~w so that lo~w is the least recently used.
+        cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        cache.tinanta("BU", "01.0001", "la~N", tags=TAGS)
+        assert len(cache) == 2
+
+        cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        assert cache.hits == 2
+        cache.tinanta("BU", "01.0001", "lo~w", tags=TAGS)
+        assert cache.misses == 4
+
+
+def test_hits_are_batched(tmp_path):
+    path = tmp_path / "forms.db"
+    with FormCache(path, max_entries=2) as cache:
+        cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        changes = cache.conn.total_changes
+        for _ in range(3):
+            cache.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        # Warm hits do not write until the next flush.
+        assert cache.conn.total_changes == changes
+        cache.flush()
+        assert cache.conn.total_changes == changes + 1
+
+
+def test_shared_file(tmp_path):
+    path = tmp_path / "forms.db"
+    with FormCache(path, max_entries=2) as a, FormCache(path, max_entries=2) as b:
+        a.tinanta("BU", "01.0001", "la~w", tags=TAGS)
+        b.tinanta("BU", "01.0001", "lo~w", tags=TAGS)
+        assert len(a) == len(b) == 2
+        # `a` sees the entry from `b` and evicts the oldest entry.
+        a.tinanta("BU", "01.0001", "la~N", tags=TAGS)
+        assert len(b) == 2
+
+    # The count survives when we reopen the file.
+    with FormCache(path, max_entries=2) as cache:
+        (count,) = cache.conn.execute("SELECT COUNT(*) FROM forms").fetchone()
+        assert len(cache) == count == 2
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from padmini.dawg import Dawg, DawgBuilder, build, parse_harness_xml
+
+
+XML = """\
+<!DOCTYPE forms SYSTEM "verbforms.dtd">
+<forms>
+<f form="Bavati"><root name="BU" num="01.0001"/><law/><tip/></f>
+<f form="BavataH"><root name="BU" num="01.0001"/><law/><tas/></f>
+<f form="edate"><root name="eDa~\\\\" num="01.0002"/><law/><ta/></f>
+<f form="Bavati"><root name="BU" num="01.0001"/><law/><tip/></f>
+</forms>
+"""
+
+
+def test_parse_harness_xml():
+    entries = list(parse_harness_xml(XML.splitlines()))
+    assert entries[0] == ("Bavati", "01.0001,BU", "law,tip")
+    assert len(entries) == 4
+
+
+def test_lookup():
+    dawg = Dawg(build(parse_harness_xml(XML.splitlines())))
+    assert len(dawg) == 3
+    assert dawg.lookup("Bavati") == [("01.0001,BU", "law,tip")]
+    assert dawg.lookup("BavataH") == [("01.0001,BU", "law,tas")]
+    assert dawg.lookup("Bava") == []
+    assert dawg.lookup("BavatiH") == []
+    assert "edate" in dawg
+    assert "ed" not in dawg
+
+
+def test_rank():
+    forms = ["a", "ab", "abc", "b", "ba", "bc", "c"]
+    dawg = Dawg(build((f, "x", "y") for f in forms))
+    assert [dawg.rank(f) for f in forms] == list(range(len(forms)))
+    assert dawg.rank("bb") == -1
+
+
+def test_multiple_analyses():
+    entries = [("a", "x", "2"), ("a", "x", "1"), ("ab", "y", "1"), ("b", "x", "1")]
+    dawg = Dawg(build(entries))
+    assert sorted(dawg.lookup("a")) == [("x", "1"), ("x", "2")]
+    assert dawg.lookup("ab") == [("y", "1")]
+    assert dawg.lookup("b") == [("x", "1")]
+
+
+def test_minimal():
+    # All three forms share the suffix "a", so it is stored once.
+    dawg = Dawg(build((f, "x", "y") for f in ["ta", "pa", "ka"]))
+    assert dawg.num_states == 3
+
+
+def test_empty():
+    dawg = Dawg(build([]))
+    assert len(dawg) == 0
+    assert dawg.lookup("a") == []
+
+
+def test_sorted_input_required():
+    builder = DawgBuilder()
+    builder.add(b"b")
+    with pytest.raises(ValueError):
+        builder.add(b"a")
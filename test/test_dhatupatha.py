@@ -0,0 +1,58 @@
+import os
+
+from padmini import dhatupatha
+from padmini.dhatupatha import Dhatupatha
+
+
+def test_load():
+    d = dhatupatha.load()
+    assert d is dhatupatha.load()
+
+    bhu = d["01.0001"]
+    assert bhu.upadesha == "BU"
+    assert bhu.code == "01.0001"
+    assert bhu.meaning == "sattAyAm"
+
+    assert d.entries[0] is bhu
+    assert d.gana(1)[0] is bhu
+    assert d.gana("01") == d.by_gana["01"]
+    assert bhu in d.by_upadesha["BU"]
+
+
+def test_load_from_other_directory(tmp_path):
+    cwd = os.getcwd()
+    try:
+        os.chdir(tmp_path)
+        assert dhatupatha.load_dhatus()[0].upadesha == "BU"
+    finally:
+        os.chdir(cwd)
+
+
+def test_skips_missing_dhatus():
+    d = dhatupatha.load()
+    assert all(e.upadesha != "-" for e in d)
+    assert "01.0923" not in d.by_code
+
+
+def test_by_root():
+    d = dhatupatha.load()
+    assert d["01.0002"] in d.by_root("eD")
+    assert d["08.0010"] in d.by_root("kf")
+    assert d.by_root("xyz") == []
+
+
+def test_snapshot(tmp_path):
+    path = tmp_path / "dhatupatha.tsv"
+    path.write_text("01.0001\tBU\tsattAyAm\n01.0002\teDa~\\\tvfdDO\n")
+    snapshot = tmp_path / "dhatupatha.bin"
+
+    d = Dhatupatha.from_tsv(path)
+    d.save_snapshot(snapshot)
+    assert Dhatupatha.from_snapshot(snapshot).entries == d.entries
+
+    # The cached loader creates the snapshot if needed.
+    os.remove(snapshot)
+    assert dhatupatha.load(path, snapshot).entries == d.entries
+    assert os.path.exists(snapshot)
+
+    assert Dhatupatha.from_snapshot(tmp_path / "missing.bin") is None
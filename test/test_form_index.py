@@ -0,0 +1,54 @@
+from padmini.constants import Tag as T
+from padmini.dhatupatha import load_dhatus
+from padmini.form_index import FormIndex, build
+
+
+def test_build_and_lookup(tmp_path):
+    path = tmp_path / "forms.tsv"
+    dhatus = load_dhatus()[:3]
+    num_lines = build(path, dhatus=dhatus, workers=1)
+
+    with open(path, "rb") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == num_lines
+    assert lines == sorted(lines)
+
+    with FormIndex(path) as index:
+        (a,) = index.lookup("Bavati")
+        assert a.dhatu_code == "01.0001"
+        assert a.la == "la~w"
+        assert a.purusha == T.PRATHAMA
+        assert a.vacana == T.EKAVACANA
+        assert a.pada == T.PARASMAIPADA
+        assert a.options == ()
+
+        assert "BUyAt" in index
+        assert {a.la for a in index.lookup("BUyAt")} == {"ashir-lin"}
+        assert index.lookup("Bavat") == []
+        assert "Bavat" not in index
+
+        # Every indexed form can be found.
+        for line in lines:
+            form = line.split(b"\t")[0].decode("utf-8")
+            assert index.lookup(form)
+
+
+def test_empty_index(tmp_path):
+    path = tmp_path / "forms.tsv"
+    build(path, dhatus=[], workers=1)
+    with FormIndex(path) as index:
+        assert index.lookup("Bavati") == []
+
+
+def test_no_trailing_newline(tmp_path):
+    path = tmp_path / "forms.tsv"
+    rows = [
+        "Bavati\t01.0001\tla~w\tprathama\tekavacana\tparasmaipada\t",
+        "Bavanti\t01.0001\tla~w\tprathama\tbahuvacana\tparasmaipada\t",
+    ]
+    path.write_text("\n".join(sorted(rows)), encoding="utf-8")
+    with FormIndex(path) as index:
+        assert len(index.lookup("Bavati")) == 1
+        assert len(index.lookup("Bavanti")) == 1
+        assert index.lookup("Bavatu") == []
+        assert "zzz" not in index
@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+
+
+#: Modules that only tinanta derivations need.
+TINANTA_ONLY = [
+    "padmini.prakarana.dhatu_karya",
+    "padmini.prakarana.dvitva",
+    "padmini.prakarana.la_karya",
+    "padmini.prakarana.tin_pratyaya",
+    "padmini.prakarana.vikarana",
+]
+
+
+def _run(code: str):
+    """Run `code` in a fresh interpreter and return what it prints as JSON."""
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def test_import_is_lazy():
+    modules = _run(
+        "import json, sys\n"
+        "import padmini.ashtadhyayi\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    assert not [m for m in modules if m.startswith("padmini.prakarana")]
+
+
+def test_subanta_skips_tinanta_modules():
+    modules = _run(
+        "import json, sys\n"
+        "from padmini.ashtadhyayi import subanta\n"
+        "p = subanta('deva', 'puM', tags={'v1', 'ekavacana'})\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    assert "padmini.prakarana.sup_karya" in modules
+    for m in TINANTA_ONLY:
+        assert m not in modules
+
+
+def test_import_time_budget():
+    # An eager import of every prakarana takes about twice as long as a lazy
+    # import. We measure both in the same interpreter so that the test does
+    # not depend on the speed of the machine, and we keep the best of a few
+    # runs to reduce noise.
+    code = (
+        "import importlib, json, pkgutil, time\n"
+        "start = time.perf_counter()\n"
+        "import padmini.ashtadhyayi\n"
+        "lazy = time.perf_counter() - start\n"
+        "import padmini.prakarana as pk\n"
+        "for m in pkgutil.iter_modules(pk.__path__):\n"
+        "    importlib.import_module('padmini.prakarana.' + m.name)\n"
+        "print(json.dumps([lazy, time.perf_counter() - start]))\n"
+    )
+    runs = [_run(code) for _ in range(3)]
+    lazy = min(r[0] for r in runs)
+    eager = min(r[1] for r in runs)
+    assert lazy < 0.75 * eager
@@ -0,0 +1,45 @@
+from padmini import paradigm
+from padmini.constants import Tag as T
+
+
+def test_paradigm():
+    paradigm.cache_clear()
+    forms = paradigm.paradigm("BU", "01.0001", "la~w")
+    assert [f.text for f in forms] == [
+        "Bavati",
+        "BavataH",
+        "Bavanti",
+        "Bavasi",
+        "BavaTaH",
+        "BavaTa",
+        "BavAmi",
+        "BavAvaH",
+        "BavAmaH",
+    ]
+    assert forms[0].purusha == T.PRATHAMA
+    assert forms[0].vacana == T.EKAVACANA
+    assert forms[0].pada == T.PARASMAIPADA
+    assert forms[-1].purusha == T.UTTAMA
+    assert forms[-1].vacana == T.BAHUVACANA
+
+
+def test_paradigm_is_cached():
+    paradigm.cache_clear()
+    first = paradigm.paradigm("BU", "01.0001", "lo~w")
+    second = paradigm.paradigm("BU", "01.0001", "lo~w")
+    assert first is second
+
+    info = paradigm.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+
+def test_paradigm_tags():
+    paradigm.cache_clear()
+    forms = paradigm.paradigm("BU", "01.0001", "li~N", tags={T.ASHIH})
+    assert [f.text for f in forms[:2]] == ["BUyAd", "BUyAt"]
+    # Optional forms have different options.
+    assert forms[0].options != forms[1].options
+
+    forms = paradigm.paradigm("BU", "01.0001", "li~N")
+    assert [f.text for f in forms[:2]] == ["Baved", "Bavet"]
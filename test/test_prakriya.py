@@ -0,0 +1,134 @@
+import pytest
+
+from padmini.prakriya import HistoryLevel, Prakriya, TagSet, Term
+
+
+def _make():
+    p = Prakriya.make([Term.make_upadesha("BU"), Term.make_upadesha("tip")])
+    p.add_tags("kartari")
+    p.step("start")
+    return p
+
+
+def test_restore():
+    p = _make()
+    snap = p.snapshot()
+
+    bhu, tip = p.terms
+    bhu.text = "Bo"
+    bhu.add_tags("guna")
+    p.terms.append(Term.agama("iw"))
+    p.add_tags("ashih")
+    p.step("7.3.84")
+    p.decline("8.4.56")
+
+    p.restore(snap)
+    assert p.terms == [bhu, tip]
+    assert bhu.text == "BU"
+    assert bhu.tags == set()
+    assert p.tags == {"kartari"}
+    assert p.history == [("BU tip", "start")]
+    assert p.options_seen == []
+
+
+def test_fork_is_independent():
+    p = _make()
+    snap = p.snapshot()
+    p.terms[0].add_tags("dhatu")
+
+    q = p.fork(snap)
+    q.terms[0].text = "Bav"
+    q.terms[1].add_tags("p")
+    q.step("6.1.78")
+
+    assert p.text == "BUtip"
+    assert p.terms[0].tags == {"dhatu"}
+    assert p.terms[1].tags == set()
+    assert q.terms[0].tags == set()
+    assert q.history == [("BU tip", "start"), ("Bav tip", "6.1.78")]
+    assert p.history == [("BU tip", "start")]
+
+
+def test_term_copy_shares_nothing_mutable():
+    t = Term.make_upadesha("tip")
+    t.add_tags("p")
+    u = t.copy()
+    u.add_tags("sarvadhatuka")
+    u.remove_tags("p")
+    assert t.tags == {"p"}
+    assert u.tags == {"sarvadhatuka"}
+
+
+def test_tag_set_api():
+    t = Term.make_upadesha("Sap")
+    t.add_tags("pratyaya", "S", "p")
+    assert t.all("pratyaya", "p")
+    assert not t.all("pratyaya", "k")
+    assert t.any("k", "p")
+    assert not t.any("k", "N")
+    assert "S" in t.tags
+    assert "never-registered" not in t.tags
+
+    t.tags.remove("S")
+    assert t.tags == {"pratyaya", "p"}
+    assert len(t.tags) == 2
+
+    other = TagSet(["k", "p"])
+    t.tags.update_mask(other.mask)
+    assert t.tags == {"pratyaya", "p", "k"}
+
+
+@pytest.mark.parametrize(
+    "level,expected",
+    [
+        (HistoryLevel.NONE, []),
+        (HistoryLevel.RULES, [(None, "start"), (None, "6.1.78")]),
+        (HistoryLevel.TEXT, [("BU tip", "start"), ("Bav tip", "6.1.78")]),
+    ],
+)
+def test_history_level(level, expected):
+    p = Prakriya.make([Term.make_upadesha("BU"), Term.make_upadesha("tip")], level)
+    p.step("start")
+    p.terms[0].text = "Bav"
+    p.step("6.1.78")
+    assert p.history == expected
+
+
+def test_history_level_terms():
+    p = Prakriya.make([Term.make_upadesha("BU")], HistoryLevel.TERMS)
+    p.step("start")
+    p.terms[0].text = "Bo"
+    p.terms[0].add_tags("guna")
+    p.step("7.3.84")
+
+    (first, _), (second, rule) = p.history
+    assert [t.text for t in first] == ["BU"]
+    assert first[0].tags == set()
+    assert [t.text for t in second] == ["Bo"]
+    assert second[0].tags == {"guna"}
+    assert rule == "7.3.84"
+
+
+def test_history_is_stored_as_deltas():
+    p = _make()
+    p.terms[0].text = "Bo"
+    p.terms[0].add_tags("guna")
+    p.step("7.3.84")
+    p.terms.insert(1, Term.agama("Sap"))
+    p.step("3.1.68")
+    p.terms[1].text = "a"
+    p.step("1.3.9")
+
+    start, guna, sap, it = p.steps
+    assert start.texts == ("BU", "tip")
+    assert guna.texts is None
+    assert [(d.index, d.old, d.new) for d in guna.deltas] == [(0, "BU", "Bo")]
+    assert sap.texts == ("Bo", "Sap", "tip")
+    assert [(d.index, d.old, d.new) for d in it.deltas] == [(1, "Sap", "a")]
+
+    assert p.history == [
+        ("BU tip", "start"),
+        ("Bo tip", "7.3.84"),
+        ("Bo Sap tip", "3.1.68"),
+        ("Bo a tip", "1.3.9"),
+    ]
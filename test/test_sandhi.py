@@ -0,0 +1,77 @@
+import pytest
+
+from padmini import sandhi
+
+
+@pytest.mark.parametrize(
+    "words,expected",
+    [
+        # Vowels
+        (["naDI", "atra"], "naDyatra"),
+        (["guru", "uvAca"], "gurUvAca"),
+        (["deva", "indraH"], "devendraH"),
+        (["mahA", "fziH"], "maharziH"),
+        (["sadA", "eva"], "sadEva"),
+        (["te", "atra"], "te 'tra"),
+        (["vane", "iti"], "vana iti"),
+        (["tasmE", "iti"], "tasmA iti"),
+        (["tO", "iti"], "tAv iti"),
+        # Visarga
+        (["rAmaH", "gacCati"], "rAmo gacCati"),
+        (["rAmaH", "atra"], "rAmo 'tra"),
+        (["rAmaH", "iti"], "rAma iti"),
+        (["rAmaH", "ca"], "rAmaS ca"),
+        (["rAmaH", "tatra"], "rAmas tatra"),
+        (["rAmaH", "karoti"], "rAmaH karoti"),
+        (["devAH", "gacCanti"], "devA gacCanti"),
+        (["hariH", "atra"], "harir atra"),
+        (["hariH", "ramate"], "harI ramate"),
+        (["punaH", "api"], "punar api"),
+        (["punaH", "ramate"], "punA ramate"),
+        (["punaH", "ca"], "punaS ca"),
+        (["pitar", "atra"], "pitar atra"),
+        (["saH", "gacCati"], "sa gacCati"),
+        (["saH", "api"], "so 'pi"),
+        # Consonants
+        (["BUyAt", "iti"], "BUyAd iti"),
+        (["vAk", "hari"], "vAg Gari"),
+        (["tat", "na"], "tan na"),
+        (["tat", "ca"], "tac ca"),
+        (["tat", "SrutvA"], "tac CrutvA"),
+        (["tat", "lokaH"], "tal lokaH"),
+        (["tAn", "ca"], "tAMS ca"),
+        (["tAn", "jayati"], "tAY jayati"),
+        (["rAjan", "atra"], "rAjann atra"),
+        (["sugaR", "atra"], "sugaRR atra"),
+        (["tAm", "gacCati"], "tAM gacCati"),
+        (["tava", "CAyA"], "tava cCAyA"),
+        # No change
+        (["Bavati", "kaH"], "Bavati kaH"),
+        (["rAmaH"], "rAmaH"),
+        # Pause
+        (["rAmaH", "|"], "rAmaH |"),
+        (["tat", "1"], "tat 1"),
+        (["punaH", "|", "api"], "punaH | api"),
+    ],
+)
+def test_join(words, expected):
+    assert sandhi.join(words).text == expected
+
+
+def test_join_many_words():
+    result = sandhi.join(["deva", "indraH", "atra", "", "gacCati"])
+    assert result.text == "devendro 'tra gacCati"
+    assert result.rules == ("6.1.87", "6.1.113", "6.1.87", "6.1.109")
+
+
+def test_junction():
+    j = sandhi.junction("tat", "hitam")
+    assert j == sandhi.Junction("tad", "Ditam", ("8.2.39", "8.4.62"), False)
+
+    j = sandhi.junction("naDI", "atra")
+    assert j == sandhi.Junction("naDy", "atra", ("6.1.77",), True)
+
+
+def test_join_pairs():
+    pairs = [("rAmaH", "gacCati"), ("naDI", "atra"), ("", "atra")]
+    assert list(sandhi.join_pairs(pairs)) == ["rAmo gacCati", "naDyatra", "atra"]
@@ -69,3 +69,36 @@ def test_map_sounds_kuh_cu():
         "N": "Y",
         "h": "J",
     }
+
+
+def test_constants():
+    assert S.AC == S.s("ac")
+    assert S.HAL == S.s("hal")
+    assert S.JHAL == S.s("Jal")
+
+
+def test_pattern():
+    p = S.pattern("{Jal}(s){Jal}")
+    assert p is S.pattern("{Jal}(s){Jal}")
+    assert p.search("akzsta").group(1) == "s"
+    assert not p.search("asa")
+
+    # Quantifiers are kept.
+    assert S.pattern("{hal}{2}$").search("Bavant")
+    assert not S.pattern("{hal}{2}$").search("Bavat")
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Bavat", 3),
+        ("BU", 1),
+        ("kzR", None),
+        ("", None),
+        ("a~", None),
+    ],
+)
+def test_last_vowel_index(text, expected):
+    assert S.last_vowel_index(text) == expected
+    match = S.pattern("({ac}){hal}*$").search(text)
+    assert (match.start(1) if match else None) == expected
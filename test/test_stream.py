@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+from padmini import stream
+from padmini.constants import Tag as T
+from padmini.dhatupatha import load_dhatus
+
+
+def _records():
+    return list(stream.iter_forms(end="01.0001", lakaras=["la~w", "ashir-lin"]))
+
+
+def test_iter_forms():
+    records = _records()
+    r = records[0]
+    assert r.form == "Bavati"
+    assert r.dhatu == "BU"
+    assert r.code == "01.0001"
+    assert r.la == "la~w"
+    assert (r.purusha, r.vacana, r.pada) == (T.PRATHAMA, T.EKAVACANA, T.PARASMAIPADA)
+    assert r.tin == "tip"
+    assert {r.la for r in records} == {"la~w", "ashir-lin"}
+
+
+def test_iter_forms_errors(monkeypatch):
+    def all_tinantas(*args, **kw):
+        raise ValueError("bad form")
+
+    monkeypatch.setattr(stream, "all_tinantas", all_tinantas)
+    errors = []
+    records = list(stream.iter_forms(end="01.0001", lakaras=["la~w"], errors=errors))
+    assert records == []
+    assert len(errors) == 9
+    assert errors[0].startswith("01.0001 BU la~w")
+    assert "bad form" in errors[0]
+
+
+def test_sink_is_abstract():
+    with pytest.raises(TypeError):
+        stream.Sink()
+
+
+def test_select_dhatus():
+    dhatus = stream.select_dhatus(start="01.0002", end="01.0004")
+    assert [d.code for d in dhatus] == ["01.0002", "01.0003", "01.0004"]
+
+
+def test_shards_are_ordered():
+    dhatus = load_dhatus()[:4]
+    serial = list(stream.iter_shards(dhatus, lakaras=["la~w"], workers=1))
+    parallel = list(stream.iter_shards(dhatus, lakaras=["la~w"], workers=2))
+    assert serial == parallel
+    assert [s.code for s in serial] == ["01.0001", "01.0002", "01.0003", "01.0004"]
+
+
+def test_xml_sink():
+    f = io.StringIO()
+    stream.write(_records()[:1], stream.XmlSink(f))
+    assert f.getvalue().splitlines() == [
+        '<!DOCTYPE forms SYSTEM "verbforms.dtd">',
+        "<forms>",
+        '<f form="Bavati"><root name="BU" num="01.0001"/><law/><tip/></f>',
+        "</forms>",
+    ]
+
+
+def test_tsv_and_jsonl_sinks():
+    records = _records()
+
+    f = io.StringIO()
+    stream.write(records, stream.TsvSink(f))
+    lines = f.getvalue().splitlines()
+    assert lines[0].split("\t") == list(stream.FormRecord._fields)
+    assert len(lines) == len(records) + 1
+
+    f = io.StringIO()
+    stream.write(records, stream.JsonlSink(f))
+    rows = [json.loads(x) for x in f.getvalue().splitlines()]
+    assert [x["form"] for x in rows] == [r.form for r in records]
+
+
+def test_columnar_sink(tmp_path):
+    records = _records()
+    stream.write(records, stream.ColumnarSink(tmp_path))
+    columns = stream.read_columns(tmp_path, ["form", "options"])
+    assert columns["form"] == [r.form for r in records]
+    assert columns["options"] == [r.options for r in records]
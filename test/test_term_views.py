@@ -0,0 +1,91 @@
+from padmini.prakriya import Term
+from padmini.term_views import StringView
+
+
+def _terms(*texts):
+    return [Term.make_term(text) for text in texts]
+
+
+def test_term_for_index():
+    a, b, c, d = _terms("ab", "", "cde", "f")
+    view = StringView([a, b, c, d])
+    assert view.text == "abcdef"
+    assert view.term_for_index(0) is a
+    assert view.term_for_index(1) is a
+    assert view.term_for_index(2) is c
+    assert view.term_for_index(4) is c
+    assert view.term_for_index(5) is d
+    assert view.term_for_index(6) is None
+
+
+def test_setitem():
+    terms = _terms("ab", "cd")
+    view = StringView(terms)
+    view[1] = "xy"
+    assert [t.text for t in terms] == ["axy", "cd"]
+    view[3] = ""
+    assert [t.text for t in terms] == ["axy", "d"]
+    assert view.text == "axyd"
+    assert view.term_for_index(3) is terms[1]
+
+
+def test_delete_span_across_terms():
+    terms = _terms("abc", "d", "efg")
+    view = StringView(terms)
+    view.delete_span(1, 5)
+    assert [t.text for t in terms] == ["a", "", "fg"]
+    assert view.text == "afg"
+
+
+def test_spans_stay_aligned():
+    terms = _terms("asta", "sti")
+    view = StringView(terms)
+    spans = [view.span(i, i + 1) for i, x in enumerate(view.text) if x == "s"]
+    for span in spans:
+        view.delete(span)
+    assert [t.text for t in terms] == ["ata", "ti"]
+    assert view.text == "atati"
+
+
+def test_direct_term_edits():
+    terms = _terms("ab", "cd")
+    view = StringView(terms)
+    assert view.text == "abcd"
+    terms[0].text = "abxy"
+    assert view.text == "abxycd"
+    assert view.term_for_index(4) is terms[1]
+
+
+def test_spans_are_dropped():
+    terms = _terms("asta", "sti")
+    view = StringView(terms)
+    spans = [view.span(i, i + 1) for i, x in enumerate(view.text) if x == "s"]
+    view.delete(spans[0])
+    assert len(view._spans) == 1
+    # Deleting the sounds under a span also drops it.
+    view.delete_span(2, 4)
+    assert not view._spans
+    assert view.text == "atti"
+
+
+def test_added_terms():
+    terms = _terms("ab")
+    view = StringView(terms)
+    assert view.text == "ab"
+    terms.append(Term.make_term("cd"))
+    assert view.text == "abcd"
+    terms.pop(0)
+    assert view.text == "cd"
+
+
+def test_replaced_terms():
+    terms = _terms("ab", "cd")
+    view = StringView(terms)
+    assert view.text == "abcd"
+    # Same number of terms, but a different term.
+    terms[1] = Term.make_term("xyz")
+    assert view.text == "abxyz"
+    assert view.term_for_index(4) is terms[1]
+
+    view.terms = _terms("pq")
+    assert view.text == "pq"
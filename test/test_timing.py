@@ -0,0 +1,76 @@
+import io
+
+from padmini import ashtadhyayi
+from padmini.constants import Tag as T
+from padmini.prakarana import tripadi
+from padmini.prakriya import HistoryLevel
+from padmini.timing import Timer, stage_name
+
+
+def test_stage_name():
+    stages = ashtadhyayi._subanta_stages("deva", T.PUM)
+    assert stage_name(stages[0]) == "pratipadika_karya.run"
+    assert stage_name(tripadi.run) == "tripadi.run"
+    assert stage_name(ashtadhyayi.dhatu_samprasarana_tasks) == (
+        "ashtadhyayi.dhatu_samprasarana_tasks"
+    )
+
+
+def test_tinanta():
+    timer = Timer()
+    tags = {T.PRATHAMA, T.EKAVACANA}
+    p = ashtadhyayi.tinanta("BU", "01.0001", "la~w", tags=tags, timer=timer)
+    assert p.text == "Bavati"
+
+    stages = timer.stages()
+    assert stages["tripadi.run"].calls == 1
+    assert stages["angasya.run_remainder"].seconds > 0
+
+    rules = timer.rules()
+    # 3.1.68 adds Sap.
+    assert rules["3.1.68"].calls == 1
+    assert sum(s.calls for s in rules.values()) == len(p.history)
+
+    # Stage times include their rules, and the root frame includes its stages.
+    total = sum(timer.self_times.values())
+    assert sum(s.seconds for s in stages.values()) <= total
+
+
+def test_aggregates_across_calls():
+    timer = Timer()
+    tags = {T.V1, T.EKAVACANA}
+    for _ in range(3):
+        ashtadhyayi.subanta(
+            "deva", T.PUM, tags=tags, history_level=HistoryLevel.NONE, timer=timer
+        )
+    assert timer.stages()["tripadi.run"].calls == 3
+
+    timer.clear()
+    assert timer.stages() == {}
+
+
+def test_all_tinantas_shares_timer():
+    timer = Timer()
+    tags = {T.PRATHAMA, T.EKAVACANA}
+    prakriyas = ashtadhyayi.all_tinantas(
+        "mu\\ha~", "04.0095", "lu~w", tags=tags, timer=timer
+    )
+    assert len(prakriyas) > 1
+    # Each branch runs the final stage.
+    assert timer.stages()["tripadi.run"].calls == len(prakriyas)
+
+
+def test_write_collapsed():
+    timer = Timer()
+    tags = {T.PRATHAMA, T.EKAVACANA}
+    ashtadhyayi.tinanta("BU", "01.0001", "la~w", tags=tags, timer=timer)
+
+    f = io.StringIO()
+    timer.write_collapsed(f)
+    lines = f.getvalue().splitlines()
+    assert lines
+    for line in lines:
+        stack, _, micros = line.rpartition(" ")
+        assert stack.startswith("tinanta")
+        assert int(micros) > 0
+    assert any(line.startswith("tinanta;vikarana.run;3.1.68 ") for line in lines)
@@ -1,11 +1,12 @@
 from typing import List
 
+from padmini import ashtadhyayi
 from padmini.ashtadhyayi import tinanta, subanta
 from padmini.prakriya import Prakriya
-from padmini.dhatupatha import load_dhatus
+from padmini import dhatupatha
 
 
-DHATUS = {f"{x.gana}.{x.number}": x for x in load_dhatus()}
+DHATUS = dhatupatha.load().by_code
 
 
 class PrakriyaTree:
@@ -58,10 +59,14 @@ class PrakriyaTree:
 
 def run_all_permutations(code, la, tags) -> List[Prakriya]:
     dhatu = DHATUS[code]
+    return ashtadhyayi.all_tinantas(dhatu.upadesha, code, la, tags=tags.copy())
+
+
+def _rerun_all(derive) -> List[Prakriya]:
+    """Call `derive(options)` once per combination of options."""
     tree = PrakriyaTree()
 
-    p = tinanta(dhatu.upadesha, code, la, tags=tags.copy())
-    p_orig = p
+    p = derive(None)
     tree.add_prakriya(p)
 
     next = tree.next_missing()
@@ -70,8 +75,7 @@ def run_all_permutations(code, la, tags) -> List[Prakriya]:
         loop_counter += 1
         if loop_counter > 10:
             assert False, "infinite loop"
-        options = dict(next)
-        p = tinanta(dhatu.upadesha, code, la, tags=tags.copy(), options=options)
+        p = derive(dict(next))
         assert p.options_seen
         tree.add_prakriya(p)
         next = tree.next_missing()
@@ -79,24 +83,25 @@ def run_all_permutations(code, la, tags) -> List[Prakriya]:
     return [x[0].prakriya for x in tree]
 
 
-def all_subantas(stem, linga, tags) -> List[Prakriya]:
-    tree = PrakriyaTree()
+def run_all_permutations_by_rerun(code, la, tags) -> List[Prakriya]:
+    """Like `run_all_permutations`, but re-derive each branch from scratch.
 
-    p = subanta(stem, linga, tags=tags.copy())
-    p_orig = p
-    tree.add_prakriya(p)
+    We keep this version to check the forking logic in `all_tinantas`.
+    """
+    dhatu = DHATUS[code]
+    return _rerun_all(
+        lambda options: tinanta(
+            dhatu.upadesha, code, la, tags=tags.copy(), options=options
+        )
+    )
 
-    next = tree.next_missing()
-    loop_counter = 0
-    while next:
-        loop_counter += 1
-        if loop_counter > 10:
-            tree.debug_print()
-            assert False, "infinite loop"
-        options = dict(next)
-        p = subanta(stem, linga, tags=tags.copy(), options=options)
-        assert p.options_seen
-        tree.add_prakriya(p)
-        next = tree.next_missing()
 
-    return [x[0].prakriya for x in tree]
+def all_subantas_by_rerun(stem, linga, tags) -> List[Prakriya]:
+    """Like `all_subantas`, but re-derive each branch from scratch."""
+    return _rerun_all(
+        lambda options: subanta(stem, linga, tags=tags.copy(), options=options)
+    )
+
+
+def all_subantas(stem, linga, tags) -> List[Prakriya]:
+    return ashtadhyayi.all_subantas(stem, linga, tags=tags.copy())